@@ -34,9 +34,22 @@ class Settings(BaseSettings):
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
     GROQ_TEMPERATURE: float = 0.7
     GROQ_MAX_TOKENS: int = 6000
+    GROQ_CONCURRENCY: int = 5  # Max in-flight Groq requests per worker
+    GROQ_HTTP2: bool = True
+    GROQ_RPM: int = 30  # Requests per minute budget shared by all Groq calls
+    GROQ_TPM: int = 12000  # Tokens per minute budget (prompt + completion)
+    
+    # LLM Response Cache (Redis optional - falls back to in-memory LRU)
+    REDIS_URL: str = ""
+    LLM_CACHE_TTL: int = 60 * 60 * 24 * 7  # 7 days
+    LLM_CACHE_MAX_ENTRIES: int = 1024
     
     # YouTube Settings
     YT_MAX_RESULTS: int = 15
+    YT_SEARCH_CACHE_TTL: int = 60 * 60  # 1 hour
+    # Resumable upload chunk: a multiple of 256 KB (only the last chunk may
+    # be shorter), or -1 to send the whole file in one request
+    YOUTUBE_UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
     
     # File Paths
     OUTPUT_DIR: Path = Path(__file__).parent.parent / "outputs"
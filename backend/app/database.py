@@ -7,7 +7,11 @@ from app.config import settings
 
 engine = create_engine(settings.DATABASE_URL, echo=False)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: sessions are request-scoped, so committed objects
+# stay usable without a reload SELECT on the next attribute access
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 Base = declarative_base()
 
@@ -6,9 +6,12 @@ configures middleware, and registers all routers.
 """
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 from app.routers import search, transcript, summary, quiz, pdf, auth
+from app.services import image_service, voice_service
+from app.services._groq_client import close_groq_client
 
 # Phase 2: Try importing recommendations (optional - requires faiss, sentence-transformers)
 PHASE2_ENABLED = False
@@ -79,6 +82,35 @@ if PHASE4_ENABLED and publish is not None:
     app.include_router(publish.router)
 
 
+@app.on_event("startup")
+async def startup():
+    """Open shared HTTP connection pools and warm models once per worker."""
+    image_service.get_http_client()
+    
+    # Loading the semantic cache unpickles its entries and rebuilds the index
+    from app.services.semantic_cache import get_semantic_cache
+    await run_in_threadpool(get_semantic_cache)
+    
+    if PHASE2_ENABLED:
+        from app.services.embeddings import warmup_embedding_model
+        await run_in_threadpool(warmup_embedding_model)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close shared HTTP connection pools and persist caches."""
+    await image_service.close_http_client()
+    await voice_service.close_http_client()
+    await close_groq_client()
+    
+    from app.services.semantic_cache import save_semantic_cache
+    save_semantic_cache()
+    
+    if PHASE2_ENABLED:
+        from app.services.vector_store import flush_vector_store
+        flush_vector_store()
+
+
 @app.get("/")
 def root():
     """Return API information and available endpoints."""
@@ -114,6 +146,18 @@ def root():
     }
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    """LLM response cache hit/miss counters."""
+    from app.services.llm_cache import get_llm_cache
+    from app.services.semantic_cache import semantic_cache_stats
+    
+    return {
+        **get_llm_cache().get_stats(),
+        "semantic": semantic_cache_stats(),
+    }
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint for monitoring systems."""
@@ -91,6 +91,8 @@ class User(Base):
     """User accounts for authentication."""
     
     __tablename__ = "users"
+    # Fetch server defaults (id, created_at) via RETURNING on INSERT
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -21,6 +21,9 @@ class VideoResult(BaseModel):
     description: str
     thumbnail_url: str
     published_at: str
+    view_count: Optional[int] = None
+    like_count: Optional[int] = None
+    duration: Optional[str] = None  # ISO 8601, e.g. "PT12M3S"
 
     class Config:
         from_attributes = True
@@ -80,6 +83,12 @@ class QuizRequest(BaseModel):
     num_questions: int = 10
 
 
+class QuizBatchRequest(BaseModel):
+    """Request to generate quizzes for several videos at once."""
+    video_ids: list[str]
+    num_questions: int = 10
+
+
 class QuizResponse(BaseModel):
     """AI-generated quiz with questions."""
     video_id: str
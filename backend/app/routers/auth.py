@@ -4,6 +4,7 @@ Handles login, signup, and Google OAuth endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
@@ -69,8 +70,9 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create user
-    user = create_user(
+    # Create user (password hashing is CPU-bound, keep it off the event loop)
+    user = await run_in_threadpool(
+        create_user,
         db=db,
         email=user_data.email,
         password=user_data.password,
@@ -91,7 +93,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login with email and password."""
     
-    user = authenticate_user(db, user_data.email, user_data.password)
+    user = await run_in_threadpool(authenticate_user, db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,7 +115,7 @@ async def login_form(
 ):
     """OAuth2 compatible login endpoint (for token URL)."""
     
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await run_in_threadpool(authenticate_user, db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,7 +1,8 @@
 """Content Generation Router - Phase 3 API endpoints for content creation."""
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from sqlalchemy.orm import Session
@@ -97,6 +98,21 @@ class VideoStatusResponse(BaseModel):
 
 # ============== Script Endpoints ==============
 
+def _get_script_source(video_id: str, db: Session):
+    """Return (title, summary, transcript) used to script an existing video."""
+    video = db.query(Video).filter(Video.video_id == video_id).first()
+    summary_obj = db.query(Summary).filter(Summary.video_id == video_id).first()
+    transcript_obj = db.query(Transcript).filter(Transcript.video_id == video_id).first()
+    
+    if not summary_obj and not transcript_obj:
+        raise HTTPException(404, "No content found for this video. Generate summary first.")
+    
+    title = video.title if video else f"Video {video_id}"
+    summary = summary_obj.summary_text if summary_obj else ""
+    transcript = transcript_obj.content if transcript_obj else ""
+    return title, summary, transcript
+
+
 @router.post("/script/from-video", response_model=ScriptResponse)
 async def generate_script_from_video(
     request: ScriptRequest,
@@ -106,21 +122,11 @@ async def generate_script_from_video(
     if not request.video_id:
         raise HTTPException(400, "video_id is required")
     
-    # Get video data
-    video = db.query(Video).filter(Video.video_id == request.video_id).first()
-    summary_obj = db.query(Summary).filter(Summary.video_id == request.video_id).first()
-    transcript_obj = db.query(Transcript).filter(Transcript.video_id == request.video_id).first()
-    
-    if not summary_obj and not transcript_obj:
-        raise HTTPException(404, "No content found for this video. Generate summary first.")
-    
-    title = video.title if video else f"Video {request.video_id}"
-    summary = summary_obj.summary_text if summary_obj else ""
-    transcript = transcript_obj.content if transcript_obj else ""
+    title, summary, transcript = _get_script_source(request.video_id, db)
     
     from app.services.script_generator import generate_video_script
     
-    result = generate_video_script(
+    result = await generate_video_script(
         title=title,
         summary=summary,
         transcript=transcript,
@@ -143,7 +149,7 @@ async def generate_custom_script(request: ScriptRequest):
     
     from app.services.script_generator import generate_custom_script
     
-    result = generate_custom_script(
+    result = await generate_custom_script(
         topic=request.topic,
         style=request.style,
         audience=request.audience,
@@ -158,6 +164,30 @@ async def generate_custom_script(request: ScriptRequest):
     )
 
 
+@router.post("/script/stream")
+async def stream_script(request: ScriptRequest, db: Session = Depends(get_db)):
+    """Stream a script as plain text while it is generated.
+    
+    Uses the video's content when video_id is given, otherwise the topic.
+    """
+    from app.services.script_generator import stream_video_script, stream_custom_script
+    
+    if request.video_id:
+        title, summary, transcript = _get_script_source(request.video_id, db)
+        chunks = stream_video_script(title, summary, transcript, request.duration)
+    elif request.topic:
+        chunks = stream_custom_script(
+            topic=request.topic,
+            style=request.style,
+            audience=request.audience,
+            duration=request.duration
+        )
+    else:
+        raise HTTPException(400, "video_id or topic is required")
+    
+    return StreamingResponse(chunks, media_type="text/plain")
+
+
 # ============== Slides Endpoints ==============
 
 @router.post("/slides", response_model=SlidesResponse)
@@ -177,7 +207,10 @@ async def generate_slides(
     
     from app.services.slides_generator import generate_presentation
     
-    result = generate_presentation(
+    # Building the deck is CPU-bound python-pptx work; keep it off the event loop
+    db.close()
+    result = await run_in_threadpool(
+        generate_presentation,
         title=title,
         summary=summary_obj.summary_text,
         key_topics=key_topics,
@@ -329,7 +362,7 @@ async def download_voice(filename: str):
     
     return FileResponse(
         str(filepath),
-        media_type="audio/mpeg",
+        media_type="audio/wav" if filepath.suffix == ".wav" else "audio/mpeg",
         filename=filename
     )
 
@@ -395,7 +428,7 @@ async def generate_video(
     transcript_text = transcript_obj.content if transcript_obj else ""
     
     # Generate script from content
-    script_result = generate_video_script(
+    script_result = await generate_video_script(
         title=title,
         summary=summary_text,
         transcript=transcript_text,
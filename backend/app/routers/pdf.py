@@ -1,27 +1,35 @@
 """PDF Router - Generate downloadable study notes as PDF files."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from urllib.parse import quote
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.schemas import PDFRequest, PDFResponse
 from app.models.db_models import Summary, Quiz, Video
-from app.services.pdf_generator import generate_pdf
+from app.services.pdf_generator import build_pdf, pdf_file_name, prune_stale_pdfs, save_pdf
 from app.config import settings
 
 router = APIRouter(prefix="/api/pdf", tags=["PDF"])
 
 
-@router.post("/", response_model=PDFResponse)
-def create_pdf(req: PDFRequest, db: Session = Depends(get_db)):
-    """Generate a PDF with summary notes and quiz for a video."""
+def _content_disposition(file_name: str) -> str:
+    """Attachment header as FileResponse builds it (RFC 5987 for non-ASCII titles)."""
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{file_name}"'
+
+
+def _load_pdf_inputs(req: PDFRequest, db: Session):
+    """Return (title, summary_text, key_topics, questions) for the requested PDF."""
     video = db.query(Video).filter(Video.video_id == req.video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found in database.")
 
-    title = video.title
-
     summary_text = ""
     key_topics = []
     if req.include_summary:
@@ -44,8 +52,48 @@ def create_pdf(req: PDFRequest, db: Session = Depends(get_db)):
             )
         questions = quiz.questions
 
+    return video.title, summary_text, key_topics, questions
+
+
+@router.post("/", response_model=PDFResponse)
+async def create_pdf(
+    req: PDFRequest,
+    background_tasks: BackgroundTasks,
+    inline: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Generate a PDF with summary notes and quiz for a video.
+    
+    With ?inline=true the PDF is streamed back directly instead of being
+    saved for a later download.
+    """
+    title, summary_text, key_topics, questions = await run_in_threadpool(
+        _load_pdf_inputs, req, db
+    )
+    # Release the pooled connection; nothing below touches the database
+    db.close()
+
+    file_name = pdf_file_name(req.video_id, title, summary_text, key_topics, questions)
+    file_path = settings.PDF_DIR / file_name
+    if file_path.exists():
+        # Same content was rendered before - skip the ReportLab build
+        if inline:
+            return FileResponse(
+                path=str(file_path),
+                filename=file_name,
+                media_type="application/pdf",
+            )
+        return PDFResponse(
+            video_id=req.video_id,
+            title=title,
+            file_name=file_name,
+            download_url=f"/api/pdf/download/{file_name}",
+        )
+
     try:
-        file_name = generate_pdf(
+        # ReportLab layout is CPU-bound; keep it off the event loop
+        buf = await run_in_threadpool(
+            build_pdf,
             video_id=req.video_id,
             title=title,
             summary_text=summary_text,
@@ -58,6 +106,16 @@ def create_pdf(req: PDFRequest, db: Session = Depends(get_db)):
             detail=f"PDF generation failed: {str(e)}"
         )
 
+    if inline:
+        return Response(
+            content=buf.getvalue(),
+            media_type="application/pdf",
+            headers={"Content-Disposition": _content_disposition(file_name)},
+        )
+
+    await save_pdf(file_name, buf)
+    background_tasks.add_task(prune_stale_pdfs, req.video_id, file_name)
+
     return PDFResponse(
         video_id=req.video_id,
         title=title,
@@ -1,6 +1,9 @@
 """Publishing Router - Phase 4 API endpoints for YouTube publishing."""
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -23,6 +26,11 @@ class MetadataRequest(BaseModel):
     title_hint: Optional[str] = None
 
 
+class MetadataBatchRequest(BaseModel):
+    """Request to generate metadata for several videos."""
+    video_ids: List[str]
+
+
 class MetadataResponse(BaseModel):
     """Generated metadata response."""
     success: bool
@@ -163,7 +171,7 @@ async def generate_metadata(
     if not content:
         raise HTTPException(400, "Either video_id or content is required")
     
-    result = generate_video_metadata(content, title_hint)
+    result = await generate_video_metadata(content, title_hint)
     
     return MetadataResponse(**result)
 
@@ -188,7 +196,7 @@ async def generate_title_variations(
     if not content:
         raise HTTPException(400, "Either video_id or content is required")
     
-    return generate_title_variations(content)
+    return await generate_title_variations(content)
 
 
 @router.post("/metadata/description")
@@ -212,7 +220,7 @@ async def generate_description(
     if not content:
         raise HTTPException(400, "Either video_id or content is required")
     
-    return generate_description(title, content)
+    return await generate_description(title, content)
 
 
 @router.post("/metadata/seo-check")
@@ -237,7 +245,64 @@ async def generate_thumbnail_text(request: MetadataRequest, db: Session = Depend
         else:
             raise HTTPException(404, "No content found")
     
-    return generate_thumbnail_text(content)
+    return await generate_thumbnail_text(content)
+
+
+@router.post("/metadata/package")
+async def generate_metadata_package(request: MetadataRequest, db: Session = Depends(get_db)):
+    """Generate metadata, titles, description, tags and thumbnail text concurrently."""
+    from app.services.metadata_generator import generate_full_package
+    
+    content = request.content
+    title_hint = request.title_hint
+    
+    if request.video_id and not content:
+        summary = db.query(Summary).filter(Summary.video_id == request.video_id).first()
+        if summary:
+            content = summary.summary_text
+        else:
+            raise HTTPException(404, "No content found")
+        
+        if not title_hint:
+            video = db.query(Video).filter(Video.video_id == request.video_id).first()
+            title_hint = video.title if video else None
+    
+    if not content:
+        raise HTTPException(400, "Either video_id or content is required")
+    
+    return await generate_full_package(content, title_hint)
+
+
+@router.post("/metadata/batch")
+async def generate_metadata_batch(request: MetadataBatchRequest, db: Session = Depends(get_db)):
+    """Generate metadata for several videos, packing them into shared LLM calls."""
+    from app.services.metadata_generator import generate_video_metadata_batch
+    
+    video_ids = list(dict.fromkeys(request.video_ids))
+    titles = {v.video_id: v.title for v in db.query(Video).filter(Video.video_id.in_(video_ids))}
+    summaries = {
+        s.video_id: s.summary_text
+        for s in db.query(Summary).filter(Summary.video_id.in_(video_ids))
+    }
+    transcripts = {
+        t.video_id: t.content[:3000]
+        for t in db.query(Transcript).filter(Transcript.video_id.in_(video_ids))
+        if t.video_id not in summaries
+    }
+    
+    items = []
+    results = {}
+    for vid in video_ids:
+        content = summaries.get(vid) or transcripts.get(vid)
+        if not content:
+            results[vid] = {"success": False, "error": "No content found for video. Generate summary first."}
+            continue
+        items.append({"id": vid, "content": content, "title_hint": titles.get(vid)})
+    
+    db.close()  # Release the pooled connection before the LLM calls
+    results.update(await generate_video_metadata_batch(items))
+    
+    return {vid: results[vid] for vid in video_ids}
 
 
 # ============== Upload Endpoints ==============
@@ -265,7 +330,7 @@ async def get_my_videos(max_results: int = Query(default=25, le=50)):
     """Get list of user's uploaded videos."""
     from app.services.youtube_upload import get_my_videos
     
-    return get_my_videos(max_results)
+    return await run_in_threadpool(get_my_videos, max_results)
 
 
 @router.put("/videos/{video_id}")
@@ -327,48 +392,60 @@ async def generate_and_upload(
     
     title = video.title if video else f"Video {request.video_id}"
     
-    # Step 1: Generate script from content
-    script_result = generate_video_script(
-        title=title,
-        summary=summary.summary_text,
-        transcript=transcript.content if transcript else "",
-        duration=10
-    )
-    
-    # Step 2: Generate complete video with all features
-    video_result = await generate_complete_video(
-        script=script_result["script"],
-        title=title,
-        voice_id=request.voice_id,
-        include_bgm=request.include_bgm,
-        include_captions=True
-    )
-    
-    if not video_result["success"]:
-        raise HTTPException(500, f"Video generation failed: {video_result['error']}")
-    
-    # Step 3: Generate metadata
+    # Metadata depends only on the summary, so generate it while the
+    # script and video are being produced
+    metadata_task = None
     if request.auto_generate_metadata:
-        metadata = generate_video_metadata(
+        metadata_task = asyncio.create_task(generate_video_metadata(
             content=summary.summary_text,
             title_hint=title
+        ))
+    
+    try:
+        # Step 1: Generate script from content
+        script_result = await generate_video_script(
+            title=title,
+            summary=summary.summary_text,
+            transcript=transcript.content if transcript else "",
+            duration=10
+        )
+        
+        # Step 2: Generate complete video with all features
+        video_result = await generate_complete_video(
+            script=script_result["script"],
+            title=title,
+            voice_id=request.voice_id,
+            include_bgm=request.include_bgm,
+            include_captions=True
         )
         
-        if not metadata.get("success"):
-            # Fallback to basic metadata
+        if not video_result["success"]:
+            raise HTTPException(500, f"Video generation failed: {video_result['error']}")
+        
+        # Step 3: Collect metadata
+        if metadata_task:
+            metadata = await metadata_task
+        
+            if not metadata.get("success"):
+                # Fallback to basic metadata
+                metadata = {
+                    "title": title[:100],
+                    "description": summary.summary_text[:500],
+                    "tags": [],
+                    "category_id": "27"
+                }
+        else:
             metadata = {
                 "title": title[:100],
                 "description": summary.summary_text[:500],
                 "tags": [],
                 "category_id": "27"
             }
-    else:
-        metadata = {
-            "title": title[:100],
-            "description": summary.summary_text[:500],
-            "tags": [],
-            "category_id": "27"
-        }
+    finally:
+        # Don't leave metadata generation running (and spending Groq quota)
+        # if an earlier step failed or the request was cancelled
+        if metadata_task and not metadata_task.done():
+            metadata_task.cancel()
     
     # Step 4: Upload to YouTube
     upload_result = await upload_video(
@@ -1,45 +1,75 @@
 """Quiz router - AI-generated quiz questions from video content."""
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.schemas import QuizRequest, QuizResponse
+from app.database import SessionLocal, get_db
+from app.models.schemas import QuizBatchRequest, QuizRequest, QuizResponse
 from app.models.db_models import Quiz, Transcript, Video
-from app.services.quiz import generate_quiz
+from app.services.quiz import generate_quiz, generate_quiz_batch
 
 router = APIRouter(prefix="/api/quiz", tags=["Quiz"])
 
 
+def _load_quiz_inputs(video_id: str, db: Session):
+    """Return (existing_quiz, title, transcript_text) for a video."""
+    existing = db.query(Quiz).filter(Quiz.video_id == video_id).first()
+    video = db.query(Video).filter(Video.video_id == video_id).first()
+    if existing:
+        return existing, video.title if video else "Unknown", None
+
+    # Verify transcript exists
+    transcript = db.query(Transcript).filter(Transcript.video_id == video_id).first()
+    if not transcript:
+        raise HTTPException(
+            status_code=400,
+            detail="Transcript not found. Please fetch the transcript first.",
+        )
+
+    return None, video.title if video else "Untitled Video", transcript.content
+
+
+def _store_quizzes(quizzes: dict):
+    """Persist generated quizzes ({video_id: questions}) using a short-lived session."""
+    db = SessionLocal()
+    try:
+        stored = {
+            q.video_id
+            for q in db.query(Quiz.video_id).filter(Quiz.video_id.in_(list(quizzes)))
+        }
+        for video_id, questions in quizzes.items():
+            if video_id not in stored:
+                db.add(Quiz(
+                    video_id=video_id,
+                    questions=questions,
+                    total_questions=len(questions),
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
 @router.post("/", response_model=QuizResponse)
-def create_quiz(req: QuizRequest, db: Session = Depends(get_db)):
+async def create_quiz(req: QuizRequest, db: Session = Depends(get_db)):
     """Generate a quiz for a video using its transcript."""
     
     # Check if quiz already exists
-    existing = db.query(Quiz).filter(Quiz.video_id == req.video_id).first()
+    existing, title, transcript = await run_in_threadpool(_load_quiz_inputs, req.video_id, db)
     if existing:
-        video = db.query(Video).filter(Video.video_id == req.video_id).first()
         return QuizResponse(
             video_id=existing.video_id,
-            title=video.title if video else "Unknown",
+            title=title,
             total_questions=existing.total_questions,
             questions=existing.questions,
         )
 
-    # Verify transcript exists
-    transcript = db.query(Transcript).filter(Transcript.video_id == req.video_id).first()
-    if not transcript:
-        raise HTTPException(
-            status_code=400,
-            detail="Transcript not found. Please fetch the transcript first.",
-        )
-
-    video = db.query(Video).filter(Video.video_id == req.video_id).first()
-    title = video.title if video else "Untitled Video"
+    # Release the pooled connection while waiting on the LLM
+    db.close()
 
     # Generate quiz with AI
     try:
-        questions = generate_quiz(title, transcript.content, req.num_questions)
+        questions = await generate_quiz(title, transcript, req.num_questions)
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -47,13 +77,7 @@ def create_quiz(req: QuizRequest, db: Session = Depends(get_db)):
         )
 
     # Save to database
-    quiz = Quiz(
-        video_id=req.video_id,
-        questions=questions,
-        total_questions=len(questions),
-    )
-    db.add(quiz)
-    db.commit()
+    await run_in_threadpool(_store_quizzes, {req.video_id: questions})
 
     return QuizResponse(
         video_id=req.video_id,
@@ -63,6 +87,65 @@ def create_quiz(req: QuizRequest, db: Session = Depends(get_db)):
     )
 
 
+def _load_batch_inputs(video_ids: list, db: Session):
+    """Return ({video_id: questions} for existing quizzes, titles, transcripts)."""
+    quizzes = {
+        q.video_id: q.questions
+        for q in db.query(Quiz).filter(Quiz.video_id.in_(video_ids))
+    }
+    titles = {
+        v.video_id: v.title
+        for v in db.query(Video).filter(Video.video_id.in_(video_ids))
+    }
+    transcripts = {
+        t.video_id: t.content
+        for t in db.query(Transcript).filter(Transcript.video_id.in_(video_ids))
+    }
+    return quizzes, titles, transcripts
+
+
+@router.post("/batch", response_model=list[QuizResponse])
+async def create_quiz_batch(req: QuizBatchRequest, db: Session = Depends(get_db)):
+    """Generate quizzes for several videos, sharing Groq requests between them."""
+    video_ids = list(dict.fromkeys(req.video_ids))
+    quizzes, titles, transcripts = await run_in_threadpool(_load_batch_inputs, video_ids, db)
+    # Release the pooled connection while waiting on the LLM
+    db.close()
+
+    missing = [vid for vid in video_ids if vid not in quizzes and vid not in transcripts]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Transcript not found for: {', '.join(missing)}. Please fetch the transcripts first.",
+        )
+
+    items = [
+        {"id": vid, "title": titles.get(vid) or "Untitled Video", "transcript": transcripts[vid]}
+        for vid in video_ids if vid not in quizzes
+    ]
+    if items:
+        try:
+            generated = await generate_quiz_batch(items, req.num_questions)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Quiz generation failed: {str(e)}"
+            )
+
+        await run_in_threadpool(_store_quizzes, generated)
+        quizzes.update(generated)
+
+    return [
+        QuizResponse(
+            video_id=vid,
+            title=titles.get(vid) or "Unknown",
+            total_questions=len(quizzes[vid]),
+            questions=quizzes[vid],
+        )
+        for vid in video_ids if vid in quizzes
+    ]
+
+
 @router.get("/{video_id}", response_model=QuizResponse)
 def get_quiz(video_id: str, db: Session = Depends(get_db)):
     """Get a previously generated quiz."""
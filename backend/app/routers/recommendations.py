@@ -9,7 +9,11 @@ import numpy as np
 from app.database import get_db
 from app.models.db_models import Video, Summary, Transcript
 from app.services.vector_store import get_vector_store
-from app.services.embeddings import generate_embedding, create_video_text, compute_similarity
+from app.services.embeddings import (
+    generate_embedding,
+    generate_embeddings_batch,
+    create_video_text,
+)
 from app.services.youtube_search import search_videos
 
 
@@ -223,7 +227,7 @@ async def index_all_videos():
         # Get videos with transcripts (transcript = actual content)
         videos = db.query(Video).join(Transcript).all()
         
-        indexed = 0
+        items = []
         skipped = 0
         
         for video in videos:
@@ -243,24 +247,18 @@ async def index_all_videos():
             if summary:
                 summary_text = str(summary.summary_text or "")
             
-            text = create_video_text(
-                str(video.title),
-                str(video.description or ""),
-                summary_text,
-                transcript_text  # Include transcript!
-            )
-            embedding = generate_embedding(text)
-            
-            store.add_video(
-                video_id=vid_id,
-                title=str(video.title),
-                embedding=embedding,
-                description=str(video.description or ""),
-                summary=summary_text,
-                thumbnail_url=str(video.thumbnail_url or ""),
-                channel_name=str(video.channel_name or ""),
-            )
-            indexed += 1
+            items.append({
+                "video_id": vid_id,
+                "title": str(video.title),
+                "description": str(video.description or ""),
+                "summary": summary_text,
+                "transcript": transcript_text,  # Include transcript!
+                "thumbnail_url": str(video.thumbnail_url or ""),
+                "channel_name": str(video.channel_name or ""),
+            })
+        
+        # One batched embedding pass, one index add and one write to disk
+        indexed = store.batch_add_videos(items)
         
         return {
             "indexed": indexed,
@@ -330,7 +328,7 @@ async def get_global_recommendations(
     search_query = _extract_search_query(title, content)
     
     # Search YouTube globally
-    youtube_results = search_videos(search_query, max_results=20)
+    youtube_results = await search_videos(search_query, max_results=20)
     
     if not youtube_results:
         return GlobalRecommendationsResponse(
@@ -340,30 +338,21 @@ async def get_global_recommendations(
             total_searched=0
         )
     
-    # Generate embeddings for YouTube results and compare
-    ranked_results = []
+    # Skip the same video
+    candidates = [yt for yt in youtube_results if yt["video_id"] != video_id]
     
-    for yt_video in youtube_results:
-        # Skip the same video
-        if yt_video["video_id"] == video_id:
-            continue
-        
-        # Create embedding from YouTube video metadata
-        yt_text = create_video_text(
-            yt_video["title"],
-            yt_video["description"],
-            "",  # No summary available
-            ""   # No transcript available
-        )
-        yt_embedding = generate_embedding(yt_text)
-        
-        # Compute similarity
-        similarity = compute_similarity(source_embedding, yt_embedding)
-        
-        ranked_results.append({
-            **yt_video,
-            "similarity_score": float(similarity)
-        })
+    # Embed all YouTube results in one batch from their metadata
+    # (no summary or transcript available) and compare
+    yt_embeddings = generate_embeddings_batch([
+        create_video_text(yt_video["title"], yt_video["description"], "", "")
+        for yt_video in candidates
+    ])
+    similarities = yt_embeddings @ source_embedding
+    
+    ranked_results = [
+        {**yt_video, "similarity_score": float(similarity)}
+        for yt_video, similarity in zip(candidates, similarities)
+    ]
     
     # Sort by similarity (highest first)
     ranked_results.sort(key=lambda x: x["similarity_score"], reverse=True)
@@ -413,7 +402,7 @@ async def get_recommendations_from_script(
     search_query = _extract_search_query("", script)
     
     # Search YouTube
-    youtube_results = search_videos(search_query, max_results=20)
+    youtube_results = await search_videos(search_query, max_results=20)
     
     if not youtube_results:
         return GlobalRecommendationsResponse(
@@ -423,22 +412,17 @@ async def get_recommendations_from_script(
             total_searched=0
         )
     
-    # Rank by embedding similarity
-    ranked_results = []
+    # Rank by embedding similarity, embedding all results in one batch
+    yt_embeddings = generate_embeddings_batch([
+        create_video_text(yt_video["title"], yt_video["description"], "", "")
+        for yt_video in youtube_results
+    ])
+    similarities = yt_embeddings @ script_embedding
     
-    for yt_video in youtube_results:
-        yt_text = create_video_text(
-            yt_video["title"],
-            yt_video["description"],
-            "", ""
-        )
-        yt_embedding = generate_embedding(yt_text)
-        similarity = compute_similarity(script_embedding, yt_embedding)
-        
-        ranked_results.append({
-            **yt_video,
-            "similarity_score": float(similarity)
-        })
+    ranked_results = [
+        {**yt_video, "similarity_score": float(similarity)}
+        for yt_video, similarity in zip(youtube_results, similarities)
+    ]
     
     ranked_results.sort(key=lambda x: x["similarity_score"], reverse=True)
     top_results = ranked_results[:k]
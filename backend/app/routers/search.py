@@ -1,6 +1,7 @@
 """Search router for YouTube video search endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -11,16 +12,9 @@ from app.services.youtube_search import search_videos
 router = APIRouter(prefix="/api/search", tags=["Search"])
 
 
-@router.post("/", response_model=SearchResponse)
-def search_youtube(req: SearchRequest, db: Session = Depends(get_db)):
-    """Search YouTube videos and save results to database."""
-    try:
-        results = search_videos(req.query, req.max_results)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"YouTube search failed: {str(e)}")
-
+def _save_search_results(query: str, results: list[dict], db: Session):
     history = SearchHistory(
-        query=req.query,
+        query=query,
         results_count=len(results),
         results_data=results,
     )
@@ -40,6 +34,17 @@ def search_youtube(req: SearchRequest, db: Session = Depends(get_db)):
 
     db.commit()
 
+
+@router.post("/", response_model=SearchResponse)
+async def search_youtube(req: SearchRequest, db: Session = Depends(get_db)):
+    """Search YouTube videos and save results to database."""
+    try:
+        results = await search_videos(req.query, req.max_results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"YouTube search failed: {str(e)}")
+
+    await run_in_threadpool(_save_search_results, req.query, results, db)
+
     return SearchResponse(
         query=req.query,
         total_results=len(results),
@@ -1,45 +1,90 @@
 """Summary router - AI-powered video summarization with Groq LLM."""
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.schemas import SummaryRequest, SummaryResponse
 from app.models.db_models import Summary, Transcript, Video
-from app.services.summary import generate_summary
+from app.services.summary import (
+    extract_key_topics,
+    generate_summary,
+    stream_summary,
+)
 
 router = APIRouter(prefix="/api/summary", tags=["Summary"])
 
+# Strong references so pending save tasks aren't garbage-collected mid-flight
+_background_tasks = set()
+
+
+def _load_summary_inputs(video_id: str, db: Session):
+    """Return (existing_summary, title, transcript_text) for a video."""
+    existing = db.query(Summary).filter(Summary.video_id == video_id).first()
+    video = db.query(Video).filter(Video.video_id == video_id).first()
+    if existing:
+        return existing, video.title if video else "Unknown", None
+
+    # Verify transcript exists
+    transcript = db.query(Transcript).filter(Transcript.video_id == video_id).first()
+    if not transcript:
+        raise HTTPException(
+            status_code=400,
+            detail="Transcript not found. Please fetch the transcript first.",
+        )
+
+    return None, video.title if video else "Untitled Video", transcript.content
+
+
+def _store_summary(video_id: str, summary_text: str, key_topics: list):
+    """Persist a generated summary using its own short-lived session."""
+    db = SessionLocal()
+    try:
+        if db.query(Summary).filter(Summary.video_id == video_id).first():
+            return
+        db.add(Summary(
+            video_id=video_id,
+            summary_text=summary_text,
+            key_topics=key_topics,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def save_summary(video_id: str, summary_text: str, topics_task: asyncio.Task):
+    """Wait for the key topics of a streamed summary and save it."""
+    try:
+        key_topics = await topics_task
+        await run_in_threadpool(_store_summary, video_id, summary_text, key_topics)
+    except Exception as e:
+        print(f"Failed to save streamed summary for {video_id}: {e}")
+
 
 @router.post("/", response_model=SummaryResponse)
-def create_summary(req: SummaryRequest, db: Session = Depends(get_db)):
+async def create_summary(req: SummaryRequest, db: Session = Depends(get_db)):
     """Generate AI summary for a video. Requires transcript to exist first."""
     
     # Check if summary already exists (idempotency)
-    existing = db.query(Summary).filter(Summary.video_id == req.video_id).first()
+    existing, title, transcript = await run_in_threadpool(_load_summary_inputs, req.video_id, db)
     if existing:
-        video = db.query(Video).filter(Video.video_id == req.video_id).first()
         return SummaryResponse(
             video_id=existing.video_id,
-            title=video.title if video else "Unknown",
+            title=title,
             summary_text=existing.summary_text,
             key_topics=existing.key_topics or [],
         )
 
-    # Verify transcript exists
-    transcript = db.query(Transcript).filter(Transcript.video_id == req.video_id).first()
-    if not transcript:
-        raise HTTPException(
-            status_code=400,
-            detail="Transcript not found. Please fetch the transcript first.",
-        )
-
-    video = db.query(Video).filter(Video.video_id == req.video_id).first()
-    title = video.title if video else "Untitled Video"
+    # Release the pooled connection while waiting on the LLM
+    db.close()
 
     # Generate summary via AI service
     try:
-        result = generate_summary(title, transcript.content)
+        result = await generate_summary(title, transcript)
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -47,13 +92,9 @@ def create_summary(req: SummaryRequest, db: Session = Depends(get_db)):
         )
 
     # Save to database
-    summary = Summary(
-        video_id=req.video_id,
-        summary_text=result["summary_text"],
-        key_topics=result["key_topics"],
+    await run_in_threadpool(
+        _store_summary, req.video_id, result["summary_text"], result["key_topics"]
     )
-    db.add(summary)
-    db.commit()
 
     return SummaryResponse(
         video_id=req.video_id,
@@ -63,6 +104,39 @@ def create_summary(req: SummaryRequest, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/stream")
+async def create_summary_stream(req: SummaryRequest, db: Session = Depends(get_db)):
+    """Stream the summary Markdown as it is generated; it is saved once complete."""
+    existing, title, transcript = await run_in_threadpool(_load_summary_inputs, req.video_id, db)
+    db.close()
+
+    if existing:
+        summary_text = existing.summary_text
+
+        async def stored():
+            yield summary_text
+
+        return StreamingResponse(stored(), media_type="text/markdown")
+
+    async def tokens():
+        # Key topics only need the transcript, so that call runs while the summary streams
+        topics_task = asyncio.create_task(extract_key_topics(transcript))
+        parts = []
+        try:
+            async for delta in stream_summary(title, transcript):
+                parts.append(delta)
+                yield delta
+        except BaseException:
+            topics_task.cancel()  # Client went away or the stream failed
+            raise
+
+        task = asyncio.create_task(save_summary(req.video_id, "".join(parts), topics_task))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    return StreamingResponse(tokens(), media_type="text/markdown")
+
+
 @router.get("/{video_id}", response_model=SummaryResponse)
 def get_summary(video_id: str, db: Session = Depends(get_db)):
     """Get a previously generated summary from the database."""
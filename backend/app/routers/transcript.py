@@ -3,11 +3,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.database import get_db
 from app.models.schemas import TranscriptRequest, TranscriptResponse
 from app.models.db_models import Transcript, Video, Summary
-from app.services.transcript import get_transcript
+from app.services.transcript import count_words, get_transcript
 
 # Phase 2: Auto-index for recommendations
 try:
@@ -75,7 +76,7 @@ def fetch_transcript(req: TranscriptRequest, db: Session = Depends(get_db)):
             video_id=existing.video_id,
             language=existing.language,
             content=existing.content,
-            word_count=len(existing.content.split()),
+            word_count=count_words(existing.content),
         )
 
     try:
@@ -83,30 +84,38 @@ def fetch_transcript(req: TranscriptRequest, db: Session = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    try:
-        transcript = Transcript(
+    # Single INSERT ... ON CONFLICT DO NOTHING instead of INSERT + IntegrityError retry
+    stmt = (
+        pg_insert(Transcript)
+        .values(
             video_id=result["video_id"],
             language=result["language"],
             content=result["content"],
         )
-        db.add(transcript)
+        .on_conflict_do_nothing(index_elements=["video_id"])
+        .returning(Transcript.id)
+    )
+    try:
+        inserted_id = db.execute(stmt).scalar()
         db.commit()
-        db.refresh(transcript)
-        
-        # Auto-index for recommendations (Phase 2)
-        auto_index_video(result["video_id"], result["content"], db)
-        
     except IntegrityError:
-        # Race condition: another request inserted it first, rollback and fetch existing
+        # e.g. the video row doesn't exist yet (foreign key)
         db.rollback()
+        return TranscriptResponse(**result)
+
+    if inserted_id is None:
+        # Race condition: another request inserted it first, fetch existing
         existing = db.query(Transcript).filter(Transcript.video_id == req.video_id).first()
         if existing:
             return TranscriptResponse(
                 video_id=existing.video_id,
                 language=existing.language,
                 content=existing.content,
-                word_count=len(existing.content.split()),
+                word_count=count_words(existing.content),
             )
+    else:
+        # Auto-index for recommendations (Phase 2)
+        auto_index_video(result["video_id"], result["content"], db)
 
     return TranscriptResponse(**result)
 
@@ -126,5 +135,5 @@ def get_stored_transcript(video_id: str, db: Session = Depends(get_db)):
         video_id=existing.video_id,
         language=existing.language,
         content=existing.content,
-        word_count=len(existing.content.split()),
+        word_count=count_words(existing.content),
     )
@@ -0,0 +1,107 @@
+"""Shared Groq client - one AsyncGroq over a pooled HTTP/2 connection."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from aiolimiter import AsyncLimiter
+from groq import AsyncGroq
+
+from app.config import settings
+from app.services._llm_retry import with_backoff
+
+
+# Keep-alive TLS sessions (and HTTP/2 multiplexing) are reused across every
+# LLM call in the process instead of each service module owning a client
+_http_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=settings.GROQ_HTTP2,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        retries=2,  # Connect-level (DNS/TCP) failures retry below the app layer
+    ),
+    timeout=60.0,
+)
+
+aclient = AsyncGroq(api_key=settings.GROQ_API_KEY, http_client=_http_client)
+
+
+class TokenBucket:
+    """
+    Tokens-per-minute budget refilled continuously.
+    
+    Callers pre-charge an estimate before a request and reconcile with the
+    actual usage afterwards, so over-estimates are handed back to the bucket.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: int) -> int:
+        """Wait until `amount` tokens are available and take them (FIFO)."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return amount
+
+    def reconcile(self, charged: int, used: int):
+        """Return (or take) the difference between the estimate and real usage."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + charged - used)
+
+
+# One budget per process shared by every service, so parallel calls are
+# paced just under Groq's limits instead of tripping 429s and backing off
+request_limiter = AsyncLimiter(settings.GROQ_RPM, 60)
+token_limiter = TokenBucket(settings.GROQ_TPM)
+
+
+def estimate_tokens(messages: list, max_tokens: int) -> int:
+    """Rough request cost: ~4 chars per prompt token plus the full output budget."""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+@asynccontextmanager
+async def rate_limited(estimated_tokens: int):
+    """Hold one request slot and pre-charge `estimated_tokens` of the TPM budget."""
+    async with request_limiter:
+        charged = await token_limiter.acquire(estimated_tokens)
+        yield charged
+
+
+async def _create(client, **kwargs):
+    estimate = estimate_tokens(kwargs["messages"], kwargs.get("max_tokens", 0))
+    async with rate_limited(estimate) as charged:
+        response = await client.chat.completions.create(**kwargs)
+    usage = getattr(response, "usage", None)  # Not available on streams
+    if usage is not None:
+        token_limiter.reconcile(charged, usage.total_tokens)
+    return response
+
+
+async def chat_completion(client=aclient, **kwargs):
+    """
+    Rate-limited chat.completions.create with retries.
+    
+    Each retry attempt waits for its own request slot and token budget.
+    """
+    return await with_backoff(_create, client, **kwargs)
+
+
+async def close_groq_client():
+    """Close the pooled connections."""
+    await aclient.close()
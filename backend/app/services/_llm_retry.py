@@ -0,0 +1,75 @@
+"""Retry helpers for Groq calls - exponential backoff with jitter."""
+
+from typing import Optional
+
+from groq import APIConnectionError, InternalServerError, RateLimitError
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+
+MAX_ATTEMPTS = 5
+WAIT_INITIAL = 1.0
+WAIT_MAX = 30.0
+
+# 429s, dropped connections/timeouts and transient 5xx are worth retrying
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+_exponential_wait = wait_exponential_jitter(initial=WAIT_INITIAL, max=WAIT_MAX)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Read the Retry-After header (seconds) from a Groq API error, if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait(retry_state) -> float:
+    """Exponential jitter, but never sooner than the server asked for."""
+    wait = _exponential_wait(retry_state)
+    retry_after = _retry_after(retry_state.outcome.exception())
+    if retry_after:
+        wait = min(max(wait, retry_after), WAIT_MAX)
+    return wait
+
+
+def _log_retry(retry_state):
+    exc = retry_state.outcome.exception()
+    print(
+        f"Groq call failed (attempt {retry_state.attempt_number}/{MAX_ATTEMPTS}): "
+        f"{type(exc).__name__}; retry-after={_retry_after(exc)}; "
+        f"sleeping {retry_state.next_action.sleep:.1f}s"
+    )
+
+
+def _retry_kwargs() -> dict:
+    return dict(
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        wait=_wait,
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
+
+
+def call_with_backoff(fn, *args, **kwargs):
+    """Call a sync Groq function, retrying transient failures."""
+    for attempt in Retrying(**_retry_kwargs()):
+        with attempt:
+            return fn(*args, **kwargs)
+
+
+async def with_backoff(fn, *args, **kwargs):
+    """Await an async Groq function, retrying transient failures."""
+    async for attempt in AsyncRetrying(**_retry_kwargs()):
+        with attempt:
+            return await fn(*args, **kwargs)
@@ -0,0 +1,76 @@
+"""Token-aware truncation for LLM prompts."""
+
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+# cl100k_base is not the Llama 3 tokenizer but tracks its counts closely
+# enough for input budgeting
+ENCODING_NAME = "cl100k_base"
+CHARS_PER_TOKEN = 4  # Fallback ratio when tiktoken is unavailable
+
+# Cut points tried in order by truncate_at_boundary, searched only within the
+# last BOUNDARY_WINDOW of the truncated text so little content is dropped
+_BOUNDARY_PATTERNS = (
+    (re.compile(r"[.!?](?=\s)"), 1),  # sentence end (keep the punctuation)
+    (re.compile(r"\n\s*\n"), 0),     # paragraph break
+    (re.compile(r"\s"), 0),           # any word boundary
+)
+BOUNDARY_WINDOW = 0.2
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:  # First use downloads the BPE file
+        print(f"tiktoken encoding unavailable, truncating by characters: {e}")
+        return None
+
+
+@lru_cache(maxsize=32)
+def _encode(text: str) -> tuple:
+    """Token ids for text; cached so a transcript shared by several prompts is encoded once."""
+    return tuple(_get_encoding().encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of `text` that fits in `max_tokens` tokens."""
+    if len(text) <= max_tokens:  # Every token covers at least one character
+        return text
+
+    if _get_encoding() is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+    tokens = _encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _get_encoding().decode(tokens[:max_tokens])
+
+
+def truncate_at_boundary(text: str, max_tokens: int) -> str:
+    """
+    Like truncate_tokens, but end on a sentence, paragraph or word boundary.
+    
+    Falls back to the plain token cut if no boundary is close to the end.
+    """
+    cut = truncate_tokens(text, max_tokens)
+    if len(cut) == len(text):
+        return text
+    
+    window_start = int(len(cut) * (1 - BOUNDARY_WINDOW))
+    for pattern, keep in _BOUNDARY_PATTERNS:
+        last = None
+        for last in pattern.finditer(cut, window_start):
+            pass
+        if last is not None:
+            return cut[:last.start() + keep]
+    return cut
@@ -6,7 +6,8 @@ Handles JWT tokens, password hashing, and Google OAuth
 from datetime import datetime, timedelta
 from typing import Optional
 import httpx
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
@@ -16,9 +17,21 @@ from app.config import settings
 from app.database import get_db
 from app.models.db_models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id for new hashes; existing bcrypt hashes still verify and are
+# transparently upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+# Built once at import - decode_token runs on every authenticated request
+_JWT_KEY = settings.JWT_SECRET_KEY.encode()
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -32,14 +45,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.JWT_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
 def decode_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
@@ -60,7 +73,6 @@ def create_user(db: Session, email: str, password: str = None, **kwargs) -> User
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
@@ -68,8 +80,15 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email)
     if not user or not user.hashed_password:
         return None
-    if not verify_password(password, user.hashed_password):
+    
+    valid, new_hash = pwd_context.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    
+    # Rehash legacy bcrypt (or outdated argon2 params) with current settings
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 
@@ -131,7 +150,6 @@ def create_or_update_google_user(db: Session, google_user_info: dict) -> User:
         user.full_name = google_user_info.get("name")
         user.avatar_url = google_user_info.get("picture")
         db.commit()
-        db.refresh(user)
         return user
     
     # Check if user exists by email
@@ -142,7 +160,6 @@ def create_or_update_google_user(db: Session, google_user_info: dict) -> User:
         user.avatar_url = google_user_info.get("picture", user.avatar_url)
         user.auth_provider = "google"
         db.commit()
-        db.refresh(user)
         return user
     
     # Create new user
@@ -1,13 +1,16 @@
 """Embeddings service - converts text to vector representations."""
 
+import os
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import torch
 from typing import List, Union
 
 
 _embedding_model = None
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384
+EMBEDDING_BATCH_SIZE = 64
 
 
 def get_embedding_model() -> SentenceTransformer:
@@ -22,6 +25,27 @@ def get_embedding_model() -> SentenceTransformer:
     return _embedding_model
 
 
+def _physical_cores() -> int:
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        return max(1, (os.cpu_count() or 2) // 2)
+
+
+def warmup_embedding_model():
+    """Load the model and prime Torch kernels before the first request."""
+    # Default thread pools oversubscribe cores when uvicorn runs several workers
+    torch.set_num_threads(_physical_cores())
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Can only be set before any inter-op parallel work has started
+    
+    model = get_embedding_model()
+    model.encode(["warmup"] * 4, batch_size=4, show_progress_bar=False)
+
+
 def generate_embedding(text: Union[str, List[str]]) -> np.ndarray:
     """
     Convert text(s) to embedding vector(s).
@@ -44,6 +68,33 @@ def generate_embedding(text: Union[str, List[str]]) -> np.ndarray:
     return embedding
 
 
+def generate_embeddings_batch(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """
+    Embed many texts with one encode call.
+    
+    Args:
+        texts: Strings to embed
+        batch_size: Texts per forward pass
+    
+    Returns:
+        float32 np.ndarray of shape (N, 384), rows in input order
+    """
+    if not texts:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+    
+    model = get_embedding_model()
+    
+    embeddings = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    
+    return np.asarray(embeddings, dtype=np.float32)
+
+
 def compute_similarity(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
     """
     Compute cosine similarity between two embeddings.
@@ -82,11 +133,11 @@ def create_video_text(title: str, description: str = "", summary: str = "", tran
     # This is the KEY content that makes recommendations relevant
     if transcript:
         # Use meaningful portion of transcript for semantic understanding
-        clean_transcript = transcript.replace('\n', ' ').strip()[:800]
+        clean_transcript = transcript[:800].replace('\n', ' ').strip()
         parts.append(clean_transcript)
     elif description:
         # Fallback to description if no transcript
-        clean_desc = description.replace('\n', ' ')[:300]
+        clean_desc = description[:300].replace('\n', ' ')
         parts.append(clean_desc)
     
     return " | ".join(parts)
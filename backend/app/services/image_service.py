@@ -1,11 +1,59 @@
 """Image Service - Fetch relevant images from Unsplash API."""
 
+import re
 import httpx
+from collections import Counter
 from typing import List, Optional
 from app.config import settings
 
 UNSPLASH_API_URL = "https://api.unsplash.com"
 
+# Common words to skip when extracting image search keywords
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
+    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
+    'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'under', 'again', 'further', 'then', 'once', 'here',
+    'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if', 'or',
+    'because', 'until', 'while', 'this', 'that', 'these', 'those', 'what',
+    'which', 'who', 'whom', 'its', 'your', 'their', 'our', 'my', 'his', 'her',
+})
+
+_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client (Singleton pattern).
+    
+    Reusing one pooled client keeps TCP/TLS connections to Unsplash alive
+    between calls, and HTTP/2 lets concurrent requests share a connection.
+    """
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            http2=True,
+        )
+    
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 async def search_images(
     query: str,
@@ -28,46 +76,45 @@ async def search_images(
         # Return placeholder images if no API key
         return get_placeholder_images(query, count)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{UNSPLASH_API_URL}/search/photos",
-            params={
-                "query": query,
-                "per_page": min(count, 30),
-                "orientation": orientation,
+    client = get_http_client()
+    response = await client.get(
+        f"{UNSPLASH_API_URL}/search/photos",
+        params={
+            "query": query,
+            "per_page": min(count, 30),
+            "orientation": orientation,
+        },
+        headers={
+            "Authorization": f"Client-ID {api_key}"
+        }
+    )
+    
+    if response.status_code != 200:
+        return get_placeholder_images(query, count)
+    
+    data = response.json()
+    
+    images = []
+    for photo in data.get("results", []):
+        images.append({
+            "id": photo["id"],
+            "description": photo.get("description") or photo.get("alt_description") or query,
+            "urls": {
+                "full": photo["urls"]["full"],
+                "regular": photo["urls"]["regular"],
+                "small": photo["urls"]["small"],
+                "thumb": photo["urls"]["thumb"],
             },
-            headers={
-                "Authorization": f"Client-ID {api_key}"
+            "author": {
+                "name": photo["user"]["name"],
+                "username": photo["user"]["username"],
+                "profile_url": photo["user"]["links"]["html"],
             },
-            timeout=10.0
-        )
-        
-        if response.status_code != 200:
-            return get_placeholder_images(query, count)
-        
-        data = response.json()
-        
-        images = []
-        for photo in data.get("results", []):
-            images.append({
-                "id": photo["id"],
-                "description": photo.get("description") or photo.get("alt_description") or query,
-                "urls": {
-                    "full": photo["urls"]["full"],
-                    "regular": photo["urls"]["regular"],
-                    "small": photo["urls"]["small"],
-                    "thumb": photo["urls"]["thumb"],
-                },
-                "author": {
-                    "name": photo["user"]["name"],
-                    "username": photo["user"]["username"],
-                    "profile_url": photo["user"]["links"]["html"],
-                },
-                "download_url": photo["links"]["download"],
-                "attribution": f"Photo by {photo['user']['name']} on Unsplash",
-            })
-        
-        return images
+            "download_url": photo["links"]["download"],
+            "attribution": f"Photo by {photo['user']['name']} on Unsplash",
+        })
+    
+    return images
 
 
 async def get_random_images(
@@ -87,44 +134,43 @@ async def get_random_images(
     if topics:
         params["topics"] = ",".join(topics)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{UNSPLASH_API_URL}/photos/random",
-            params=params,
-            headers={
-                "Authorization": f"Client-ID {api_key}"
+    client = get_http_client()
+    response = await client.get(
+        f"{UNSPLASH_API_URL}/photos/random",
+        params=params,
+        headers={
+            "Authorization": f"Client-ID {api_key}"
+        }
+    )
+    
+    if response.status_code != 200:
+        return get_placeholder_images(query or "abstract", count)
+    
+    photos = response.json()
+    if not isinstance(photos, list):
+        photos = [photos]
+    
+    images = []
+    for photo in photos:
+        images.append({
+            "id": photo["id"],
+            "description": photo.get("description") or photo.get("alt_description") or "",
+            "urls": {
+                "full": photo["urls"]["full"],
+                "regular": photo["urls"]["regular"],
+                "small": photo["urls"]["small"],
+                "thumb": photo["urls"]["thumb"],
             },
-            timeout=10.0
-        )
-        
-        if response.status_code != 200:
-            return get_placeholder_images(query or "abstract", count)
-        
-        photos = response.json()
-        if not isinstance(photos, list):
-            photos = [photos]
-        
-        images = []
-        for photo in photos:
-            images.append({
-                "id": photo["id"],
-                "description": photo.get("description") or photo.get("alt_description") or "",
-                "urls": {
-                    "full": photo["urls"]["full"],
-                    "regular": photo["urls"]["regular"],
-                    "small": photo["urls"]["small"],
-                    "thumb": photo["urls"]["thumb"],
-                },
-                "author": {
-                    "name": photo["user"]["name"],
-                    "username": photo["user"]["username"],
-                    "profile_url": photo["user"]["links"]["html"],
-                },
-                "download_url": photo["links"]["download"],
-                "attribution": f"Photo by {photo['user']['name']} on Unsplash",
-            })
-        
-        return images
+            "author": {
+                "name": photo["user"]["name"],
+                "username": photo["user"]["username"],
+                "profile_url": photo["user"]["links"]["html"],
+            },
+            "download_url": photo["links"]["download"],
+            "attribution": f"Photo by {photo['user']['name']} on Unsplash",
+        })
+    
+    return images
 
 
 def get_placeholder_images(query: str, count: int) -> List[dict]:
@@ -158,12 +204,12 @@ def get_placeholder_images(query: str, count: int) -> List[dict]:
 async def download_image(url: str, save_path: str) -> bool:
     """Download an image to a local path."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=30.0, follow_redirects=True)
-            if response.status_code == 200:
-                with open(save_path, 'wb') as f:
-                    f.write(response.content)
-                return True
+        client = get_http_client()
+        response = await client.get(url, timeout=30.0, follow_redirects=True)
+        if response.status_code == 200:
+            with open(save_path, 'wb') as f:
+                f.write(response.content)
+            return True
     except Exception as e:
         print(f"Failed to download image: {e}")
     return False
@@ -174,31 +220,5 @@ def extract_keywords_for_images(summary: str, max_keywords: int = 5) -> List[str
     
     This is a simple extraction - could be enhanced with NLP.
     """
-    # Common words to skip
-    stopwords = {
-        'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-        'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
-        'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
-        'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
-        'below', 'between', 'under', 'again', 'further', 'then', 'once', 'here',
-        'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few', 'more',
-        'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
-        'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if', 'or',
-        'because', 'until', 'while', 'this', 'that', 'these', 'those', 'what',
-        'which', 'who', 'whom', 'its', 'your', 'their', 'our', 'my', 'his', 'her',
-    }
-    
-    # Extract words, filter, and count
-    import re
-    words = re.findall(r'\b[a-zA-Z]{4,}\b', summary.lower())
-    word_counts = {}
-    
-    for word in words:
-        if word not in stopwords:
-            word_counts[word] = word_counts.get(word, 0) + 1
-    
-    # Sort by frequency and return top keywords
-    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-    
-    return [word for word, count in sorted_words[:max_keywords]]
+    words = (w for w in _WORD_RE.findall(summary.lower()) if w not in STOPWORDS)
+    return [word for word, _ in Counter(words).most_common(max_keywords)]
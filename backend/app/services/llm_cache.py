@@ -0,0 +1,278 @@
+"""LLM Cache - exact-match response cache for Groq chat completions."""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.services._groq_client import chat_completion
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# Calls above this temperature are meant to vary, so they skip the cache
+# unless the caller opts in explicitly
+CACHEABLE_MAX_TEMPERATURE = 0.5
+KEY_PREFIX = "llm:"
+
+# cache key -> task for requests already on the wire ("singleflight"): an
+# identical request arriving before the first completes awaits its result
+# instead of issuing a second Groq call
+_inflight: dict = {}
+
+
+class LLMCache:
+    """
+    Response cache keyed on the full request payload.
+
+    Uses Redis (SETEX with TTL) when REDIS_URL is configured, otherwise an
+    in-process LRU dict capped at `max_entries`.
+    """
+
+    def __init__(self, redis_url: str = "", ttl: int = 86400, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis.ping()
+                print("LLM cache using Redis")
+            except Exception as e:
+                print(f"Redis unavailable, using in-memory LLM cache: {e}")
+                self._redis = None
+
+    @staticmethod
+    def cache_key(payload: dict) -> str:
+        """SHA256 of the canonical JSON form of the request payload."""
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return KEY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = None
+
+        if self._redis is not None:
+            try:
+                cached = self._redis.get(key)
+                if cached is not None:
+                    value = json.loads(cached)
+            except Exception as e:
+                print(f"LLM cache read failed: {e}")
+        else:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    expires_at, cached = entry
+                    if expires_at > time.monotonic():
+                        self._memory.move_to_end(key)
+                        value = cached
+                    else:
+                        del self._memory[key]
+
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: str):
+        if self._redis is not None:
+            try:
+                self._redis.setex(key, self.ttl, json.dumps(value))
+            except Exception as e:
+                print(f"LLM cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers; Redis round trips run in a worker thread."""
+        if self._redis is not None:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    async def aset(self, key: str, value: str):
+        """set() for async callers; Redis round trips run in a worker thread."""
+        if self._redis is not None:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    def get_stats(self) -> dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            "backend": "redis" if self._redis is not None else "memory",
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+            "entries": len(self._memory) if self._redis is None else None,
+        }
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the LLM cache (Singleton pattern)."""
+    global _llm_cache
+
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            redis_url=settings.REDIS_URL,
+            ttl=settings.LLM_CACHE_TTL,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        )
+
+    return _llm_cache
+
+
+async def _lookup(messages, temperature, max_tokens, model, cache, kwargs):
+    """Return (model, cache key or None, cached content or None)."""
+    model = model or settings.GROQ_MODEL
+    if cache is None:
+        cache = temperature <= CACHEABLE_MAX_TEMPERATURE
+    if not cache:
+        return model, None, None
+
+    llm_cache = get_llm_cache()
+    key = llm_cache.cache_key({
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **kwargs,
+    })
+    return model, key, await llm_cache.aget(key)
+
+
+async def cached_chat(
+    aclient,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    model: Optional[str] = None,
+    cache: Optional[bool] = None,
+    **kwargs
+) -> str:
+    """
+    Run a Groq chat completion and return the message content.
+
+    Identical requests are served from the cache without a network call.
+    By default only low-temperature calls are cached; pass cache=True for
+    calls whose output should be reused even at higher temperatures.
+    Concurrent identical cacheable requests share a single Groq call.
+    A response cut off at max_tokens is retried once with double the budget.
+    """
+    model, key, cached = await _lookup(messages, temperature, max_tokens, model, cache, kwargs)
+    if cached is not None:
+        return cached
+    if key is None:
+        return await _complete(aclient, key, model, messages, temperature, max_tokens, kwargs)
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _complete(aclient, key, model, messages, temperature, max_tokens, kwargs)
+        )
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller's cancellation doesn't fail the others
+    return await asyncio.shield(task)
+
+
+async def _complete(aclient, key, model, messages, temperature, max_tokens, kwargs) -> str:
+    response = await chat_completion(
+        aclient,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **kwargs
+    )
+    # Output budgets are kept tight; only a response that actually hit the
+    # cap pays for a second call at twice the budget
+    if response.choices[0].finish_reason == "length":
+        print(f"Groq response truncated at max_tokens={max_tokens}, retrying with {max_tokens * 2}")
+        response = await chat_completion(
+            aclient,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens * 2,
+            **kwargs
+        )
+    content = response.choices[0].message.content
+
+    if key and content and response.choices[0].finish_reason != "length":
+        await get_llm_cache().aset(key, content)
+
+    return content
+
+
+async def stream_cached_chat(
+    aclient,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    model: Optional[str] = None,
+    cache: Optional[bool] = None,
+    outcome: Optional[dict] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of cached_chat that yields content deltas.
+
+    A cache hit is yielded as a single chunk; on a miss the full text is
+    cached only once the stream completes, and not at all if it was cut off
+    at max_tokens. If `outcome` is given, outcome["finish_reason"] is set
+    when the stream ends so callers can apply the same rule.
+    """
+    if outcome is None:
+        outcome = {}
+    model, key, cached = await _lookup(messages, temperature, max_tokens, model, cache, kwargs)
+    if cached is not None:
+        outcome["finish_reason"] = "stop"
+        yield cached
+        return
+
+    stream = await chat_completion(
+        aclient,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        **kwargs
+    )
+    parts = []
+    finish_reason = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+        delta = choice.delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    outcome["finish_reason"] = finish_reason
+
+    if finish_reason == "length":
+        print(f"Groq stream truncated at max_tokens={max_tokens}, not caching")
+    elif key and parts:
+        await get_llm_cache().aset(key, "".join(parts))
@@ -1,57 +1,123 @@
 """Metadata Generator Service - LLM-powered YouTube metadata generation."""
 
-from groq import Groq
 from typing import List, Optional
+import asyncio
 import json
 import re
 
 from app.config import settings
-
-client = Groq(api_key=settings.GROQ_API_KEY)
-
-
-METADATA_PROMPT = """You are a YouTube SEO expert. Generate optimized metadata for a video.
-
-VIDEO SCRIPT/CONTENT:
-{content}
-
-Generate the following in JSON format:
+from app.services._groq_client import aclient
+from app.services._tokens import truncate_tokens
+from app.services.llm_cache import cached_chat
+from app.services.semantic_cache import get_semantic_cache
+
+# Words ignored by the keyword fallback in generate_tags_from_content
+_STOPWORDS = frozenset((
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'shall',
+    'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
+    'as', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'under', 'again', 'further', 'then', 'once',
+    'and', 'but', 'if', 'or', 'because', 'until', 'while', 'this',
+    'that', 'these', 'those', 'it', 'its', 'they', 'them', 'their',
+))
+
+# Input budget for video content in metadata prompts
+METADATA_INPUT_TOKENS = 1500
+
+# Whitespace-delimited words longer than 3 chars, matched lazily in C so the
+# keyword fallback stops scanning as soon as it has enough tags
+_LONG_WORD_RE = re.compile(r"\S{4,}")
+
+# Bounds concurrent in-flight Groq requests across all metadata calls
+_groq_semaphore = asyncio.Semaphore(settings.GROQ_CONCURRENCY)
+
+
+async def _chat(**kwargs) -> str:
+    """Rate-bounded, cached Groq chat call returning stripped content."""
+    async with _groq_semaphore:
+        content = await cached_chat(aclient, **kwargs)
+    return (content or "").strip()
+
+
+# One prompt serves every structured field; only the requested sub-schemas
+# are included so output tokens stay minimal for subset requests
+BUNDLE_FIELD_SCHEMAS = {
+    "metadata": """    "metadata": {
+        "title": "Catchy, SEO-optimized title (max 60 chars, include main keyword)",
+        "description": "Detailed description with keywords, timestamps, and call-to-action (500-1000 chars)",
+        "tags": ["list", "of", "relevant", "tags", "max", "15", "tags"],
+        "category": "Best YouTube category from: Education, Science & Technology, Entertainment, Howto & Style, People & Blogs",
+        "hashtags": ["#hashtag1", "#hashtag2", "#hashtag3"]
+    }""",
+    "title_variations": """    "title_variations": ["5 alternative titles, each catchy, SEO-optimized and under 60 chars - some question-based, some listicle-style, some emotional hooks"]""",
+    "tags": """    "tags": ["{max_tags} relevant YouTube tags"]""",
+    "thumbnail": """    "thumbnail": {
+        "main_text": "Bold, short text (2-4 words max)",
+        "subtext": "Optional smaller text",
+        "emoji": "1-2 relevant emojis",
+        "color_scheme": "suggested colors",
+        "alternatives": ["alt1", "alt2", "alt3"]
+    }""",
+}
+
+# Output budget per field (JSON mode, no fences), sized to the largest valid
+# output; cached_chat retries at double the budget if a response hits the cap
+BUNDLE_FIELD_TOKENS = {
+    "metadata": 700,
+    "title_variations": 300,
+    "tags": 200,
+    "thumbnail": 250,
+}
+
+# Prompt layout: the system message holds only static text (instructions and
+# the schema for the requested fields) so it stays a byte-identical, cacheable
+# prefix; content and title hints go in the user message after it.
+BUNDLE_PROMPT = """You are a YouTube SEO expert. Generate the following for the video in the user message, in a single JSON object:
 {{
-    "title": "Catchy, SEO-optimized title (max 60 chars, include main keyword)",
-    "description": "Detailed description with keywords, timestamps, and call-to-action (500-1000 chars)",
-    "tags": ["list", "of", "relevant", "tags", "max", "15", "tags"],
-    "category": "Best YouTube category from: Education, Science & Technology, Entertainment, Howto & Style, People & Blogs",
-    "hashtags": ["#hashtag1", "#hashtag2", "#hashtag3"]
+{schema}
 }}
 
 Guidelines:
-- Title: Include main keyword early, be catchy and specific
+- Titles: Include main keyword early, be catchy and specific
 - Description: Start with hook, include keywords naturally, add call-to-action
-- Tags: Mix broad and specific keywords (5-15 tags)
+- Tags: Mix broad and specific keywords
 - Include relevant emoji in title/description where appropriate
 
 Return ONLY valid JSON, no extra text.
 """
 
 
-TITLE_VARIATIONS_PROMPT = """Generate 5 alternative video titles for this content.
-The titles should be catchy, SEO-optimized, and under 60 characters each.
-
-CONTENT SUMMARY:
-{content}
+# Several videos per request: one metadata object per video, keyed by its ID
+METADATA_BATCH_PROMPT = """You are a YouTube SEO expert. For EACH video in the user message, generate metadata in a single JSON object keyed by the video's ID:
+{
+    "videos": {
+        "<video id>": {
+            "title": "Catchy, SEO-optimized title (max 60 chars, include main keyword)",
+            "description": "Detailed description with keywords, timestamps, and call-to-action (500-1000 chars)",
+            "tags": ["list", "of", "relevant", "tags", "max", "15", "tags"],
+            "category": "Best YouTube category from: Education, Science & Technology, Entertainment, Howto & Style, People & Blogs",
+            "hashtags": ["#hashtag1", "#hashtag2", "#hashtag3"]
+        }
+    }
+}
 
-Return as JSON array:
-["Title 1", "Title 2", "Title 3", "Title 4", "Title 5"]
+Guidelines:
+- Titles: Include main keyword early, be catchy and specific
+- Description: Start with hook, include keywords naturally, add call-to-action
+- Tags: Mix broad and specific keywords
+- Include relevant emoji in title/description where appropriate
 
-Make titles diverse - some question-based, some listicle-style, some emotional hooks.
-Return ONLY valid JSON array, no extra text.
+Return ONLY valid JSON, no extra text.
 """
 
+# Video contents are grouped into one request up to this many characters
+METADATA_BATCH_CHARS = 12000
 
-DESCRIPTION_TEMPLATE = """Generate an optimized YouTube description for this video.
 
-VIDEO TITLE: {title}
-VIDEO CONTENT: {content}
+DESCRIPTION_TEMPLATE = """You are a YouTube content creator expert.
+Generate an optimized YouTube description for the video in the user message.
 
 Create a description with these sections:
 1. HOOK (First 2 lines - most important, appears in search)
@@ -66,58 +132,75 @@ Target length: 500-1500 characters.
 """
 
 
-def generate_video_metadata(
+def _clean_metadata(metadata: dict) -> dict:
+    """Clamp LLM metadata fields to YouTube limits and add the category ID."""
+    cleaned = {
+        "title": str(metadata.get("title", "Untitled Video"))[:100],
+        "description": str(metadata.get("description", ""))[:5000],
+        "tags": metadata.get("tags", [])[:15],
+        "category": str(metadata.get("category", "Education")),
+        "hashtags": metadata.get("hashtags", [])[:5],
+    }
+    # Map category to ID
+    cleaned["category_id"] = get_category_id(cleaned["category"])
+    return cleaned
+
+
+async def generate_bundle(
     content: str,
-    title_hint: Optional[str] = None
+    fields: Optional[List[str]] = None,
+    title_hint: Optional[str] = None,
+    max_tags: int = 15
 ) -> dict:
     """
-    Generate complete YouTube metadata using LLM.
+    Generate several structured metadata fields with one Groq call.
+    
+    The content is sent (and tokenized) once instead of once per field.
     
     Args:
         content: Video script or summary content
+        fields: Subset of metadata, title_variations, tags, thumbnail (default: all)
         title_hint: Optional title suggestion
+        max_tags: Number of tags to request for the tags field
     
     Returns:
-        dict with title, description, tags, category, hashtags
+        dict with success and one key per requested field
     """
+    fields = [f for f in BUNDLE_FIELD_SCHEMAS if f in (fields or BUNDLE_FIELD_SCHEMAS)]
+    
     try:
-        prompt = METADATA_PROMPT.format(content=content[:3000])
+        schema = ",\n".join(BUNDLE_FIELD_SCHEMAS[f] for f in fields)
+        schema = schema.replace("{max_tags}", str(max_tags))
         
+        user_content = f"VIDEO SCRIPT/CONTENT:\n{truncate_tokens(content, METADATA_INPUT_TOKENS)}"
         if title_hint:
-            prompt += f"\n\nSuggested topic: {title_hint}"
+            user_content += f"\n\nSuggested topic: {title_hint}"
         
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
+        result_text = await _chat(
             messages=[
-                {"role": "system", "content": "You are a YouTube SEO expert. Return only valid JSON."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": BUNDLE_PROMPT.format(schema=schema)},
+                {"role": "user", "content": user_content}
             ],
             temperature=0.7,
-            max_tokens=1500,
+            max_tokens=sum(BUNDLE_FIELD_TOKENS[f] for f in fields),
+            response_format={"type": "json_object"},
+            # Title variations are meant to differ between requests
+            cache="title_variations" not in fields,
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        # Clean up response
-        result_text = result_text.replace("```json", "").replace("```", "").strip()
-        
-        # Parse JSON
-        metadata = json.loads(result_text)
+        raw = json.loads(result_text)
+        bundle = {"success": True}
         
-        # Validate and clean
-        metadata = {
-            "title": str(metadata.get("title", "Untitled Video"))[:100],
-            "description": str(metadata.get("description", ""))[:5000],
-            "tags": metadata.get("tags", [])[:15],
-            "category": str(metadata.get("category", "Education")),
-            "hashtags": metadata.get("hashtags", [])[:5],
-            "success": True
-        }
-        
-        # Map category to ID
-        metadata["category_id"] = get_category_id(metadata["category"])
+        if "metadata" in fields:
+            bundle["metadata"] = _clean_metadata(raw.get("metadata", {}))
+        if "title_variations" in fields:
+            bundle["title_variations"] = raw.get("title_variations", [])[:5]
+        if "tags" in fields:
+            bundle["tags"] = raw.get("tags", [])[:max_tags]
+        if "thumbnail" in fields:
+            bundle["thumbnail"] = raw.get("thumbnail", {})
         
-        return metadata
+        return bundle
         
     except json.JSONDecodeError as e:
         return {
@@ -132,58 +215,156 @@ def generate_video_metadata(
         }
 
 
-def generate_title_variations(content: str) -> dict:
-    """Generate multiple title options for A/B testing."""
+async def generate_video_metadata(
+    content: str,
+    title_hint: Optional[str] = None
+) -> dict:
+    """
+    Generate complete YouTube metadata using LLM.
+    
+    Args:
+        content: Video script or summary content
+        title_hint: Optional title suggestion
+    
+    Returns:
+        dict with title, description, tags, category, hashtags
+    """
+    sem_cache = get_semantic_cache()
+    if sem_cache:
+        # Embedding is CPU-bound; keep it off the event loop
+        cached, cache_key = await asyncio.to_thread(
+            sem_cache.get,
+            truncate_tokens(content, METADATA_INPUT_TOKENS),
+            {"fn": "metadata", "title_hint": title_hint},
+        )
+        if cached is not None:
+            return cached
+    
+    bundle = await generate_bundle(content, ["metadata"], title_hint)
+    if not bundle["success"]:
+        return bundle
+    
+    metadata = {**bundle["metadata"], "success": True}
+    if sem_cache:
+        await asyncio.to_thread(sem_cache.put, cache_key, metadata)
+    
+    return metadata
+
+
+async def _metadata_group(group: List[dict]) -> dict:
+    blocks = []
+    for item in group:
+        block = f"=== VIDEO ID: {item['id']} ===\nVIDEO SCRIPT/CONTENT:\n{item['content']}"
+        if item.get("title_hint"):
+            block += f"\nSuggested topic: {item['title_hint']}"
+        blocks.append(block)
+    
     try:
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
+        result_text = await _chat(
             messages=[
-                {"role": "system", "content": "Return only valid JSON array."},
-                {"role": "user", "content": TITLE_VARIATIONS_PROMPT.format(content=content[:2000])}
+                {"role": "system", "content": METADATA_BATCH_PROMPT},
+                {"role": "user", "content": "\n\n".join(blocks)}
             ],
-            temperature=0.9,
-            max_tokens=500,
+            temperature=0.7,
+            max_tokens=BUNDLE_FIELD_TOKENS["metadata"] * len(group),
+            response_format={"type": "json_object"},
         )
-        
-        result_text = response.choices[0].message.content.strip()
-        result_text = result_text.replace("```json", "").replace("```", "").strip()
-        
-        titles = json.loads(result_text)
-        
-        return {
-            "success": True,
-            "titles": titles[:5]
-        }
-        
+        videos = json.loads(result_text).get("videos", {})
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+        print(f"Batch metadata generation failed: {e}")
+        videos = {}
+    
+    return {
+        item["id"]: (
+            {**_clean_metadata(videos[item["id"]]), "success": True}
+            if isinstance(videos.get(item["id"]), dict)
+            else {"success": False, "error": "No metadata returned for this video"}
+        )
+        for item in group
+    }
+
+
+async def generate_video_metadata_batch(items: List[dict]) -> dict:
+    """
+    Generate YouTube metadata for several videos, sharing Groq requests.
+    
+    Short contents are packed together into one call (up to
+    METADATA_BATCH_CHARS), so the instructions and schema are sent once
+    per group instead of once per video.
+    
+    Args:
+        items: List of {"id", "content", "title_hint"} dicts
+    
+    Returns:
+        dict mapping video id -> metadata dict (with success flag)
+    """
+    results = {}
+    pending = []
+    sem_cache = get_semantic_cache()
+    
+    for item in items:
+        content = truncate_tokens(item["content"], METADATA_INPUT_TOKENS)
+        cache_key = None
+        if sem_cache:
+            cached, cache_key = await asyncio.to_thread(
+                sem_cache.get, content, {"fn": "metadata", "title_hint": item.get("title_hint")}
+            )
+            if cached is not None:
+                results[item["id"]] = cached
+                continue
+        pending.append({**item, "content": content, "cache_key": cache_key})
+    
+    groups, current, size = [], [], 0
+    for item in pending:
+        if current and size + len(item["content"]) > METADATA_BATCH_CHARS:
+            groups.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += len(item["content"])
+    if current:
+        groups.append(current)
+    
+    new_entries = []
+    for group, metadata in zip(groups, await asyncio.gather(*(_metadata_group(g) for g in groups))):
+        results.update(metadata)
+        for item in group:
+            if metadata[item["id"]]["success"]:
+                new_entries.append((item["cache_key"], metadata[item["id"]]))
+    if sem_cache:
+        await asyncio.to_thread(sem_cache.put_many, new_entries)
+    
+    return results
+
+
+async def generate_title_variations(content: str) -> dict:
+    """Generate multiple title options for A/B testing."""
+    bundle = await generate_bundle(content, ["title_variations"])
+    if not bundle["success"]:
+        return bundle
+    
+    return {
+        "success": True,
+        "titles": bundle["title_variations"]
+    }
 
 
-def generate_description(
+async def generate_description(
     title: str,
     content: str,
-    include_timestamps: bool = True
+    include_timestamps: bool = True,
+    max_tokens: int = 900
 ) -> dict:
     """Generate an optimized YouTube description."""
     try:
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
+        description = await _chat(
             messages=[
-                {"role": "system", "content": "You are a YouTube content creator expert."},
-                {"role": "user", "content": DESCRIPTION_TEMPLATE.format(
-                    title=title,
-                    content=content[:3000]
-                )}
+                {"role": "system", "content": DESCRIPTION_TEMPLATE},
+                {"role": "user", "content": f"VIDEO TITLE: {title}\nVIDEO CONTENT: {truncate_tokens(content, METADATA_INPUT_TOKENS)}"}
             ],
             temperature=0.7,
-            max_tokens=1000,
+            max_tokens=max_tokens,
         )
         
-        description = response.choices[0].message.content.strip()
-        
         return {
             "success": True,
             "description": description[:5000]
@@ -196,41 +377,28 @@ def generate_description(
         }
 
 
-def generate_tags_from_content(content: str, max_tags: int = 15) -> List[str]:
+async def generate_tags_from_content(content: str, max_tags: int = 15) -> List[str]:
     """Extract relevant tags from content using LLM."""
     try:
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "Extract keywords as JSON array. Return ONLY the array."},
-                {"role": "user", "content": f"Extract {max_tags} relevant YouTube tags from this content:\n\n{content[:2000]}"}
-            ],
-            temperature=0.5,
-            max_tokens=300,
-        )
-        
-        result = response.choices[0].message.content.strip()
-        result = result.replace("```json", "").replace("```", "").strip()
-        
-        tags = json.loads(result)
-        return tags[:max_tags]
+        bundle = await generate_bundle(content, ["tags"], max_tags=max_tags)
+        if not bundle["success"] or not bundle["tags"]:
+            raise ValueError(bundle.get("error", "No tags returned"))
+        return bundle["tags"]
         
     except:
         # Fallback: simple keyword extraction
-        words = content.lower().split()
-        # Filter common words and get unique keywords
-        stopwords = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 
-                     'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                     'would', 'could', 'should', 'may', 'might', 'must', 'shall',
-                     'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by', 'from',
-                     'as', 'into', 'through', 'during', 'before', 'after', 'above',
-                     'below', 'between', 'under', 'again', 'further', 'then', 'once',
-                     'and', 'but', 'if', 'or', 'because', 'until', 'while', 'this',
-                     'that', 'these', 'those', 'it', 'its', 'they', 'them', 'their'}
-        
-        keywords = [w for w in words if len(w) > 3 and w not in stopwords and w.isalpha()]
-        unique_keywords = list(dict.fromkeys(keywords))
-        return unique_keywords[:max_tags]
+        # Ordered dedup in one pass, stopping once enough tags are found
+        unique_keywords = {}
+        for match in _LONG_WORD_RE.finditer(content):
+            w = match.group()
+            if not w.isalpha():
+                continue
+            w = w.lower()
+            if w not in _STOPWORDS:
+                unique_keywords[w] = None
+                if len(unique_keywords) >= max_tags:
+                    break
+        return list(unique_keywords)
 
 
 def get_category_id(category_name: str) -> str:
@@ -295,42 +463,49 @@ def optimize_for_seo(title: str, description: str) -> dict:
     }
 
 
-def generate_thumbnail_text(content: str) -> dict:
+async def generate_thumbnail_text(content: str) -> dict:
     """Generate text suggestions for video thumbnail."""
-    try:
-        response = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a YouTube thumbnail designer."},
-                {"role": "user", "content": f"""Generate thumbnail text options for this video content:
-
-{content[:1000]}
+    bundle = await generate_bundle(content, ["thumbnail"])
+    if not bundle["success"]:
+        return bundle
+    
+    return {
+        "success": True,
+        **bundle["thumbnail"]
+    }
 
-Return JSON with:
-{{
-    "main_text": "Bold, short text (2-4 words max)",
-    "subtext": "Optional smaller text",
-    "emoji": "1-2 relevant emojis",
-    "color_scheme": "suggested colors",
-    "alternatives": ["alt1", "alt2", "alt3"]
-}}
 
-Return ONLY valid JSON."""}
-            ],
-            temperature=0.8,
-            max_tokens=400,
-        )
-        
-        result = response.choices[0].message.content.strip()
-        result = result.replace("```json", "").replace("```", "").strip()
-        
-        return {
-            "success": True,
-            **json.loads(result)
-        }
-        
-    except Exception as e:
+async def generate_full_package(content: str, title_hint: Optional[str] = None) -> dict:
+    """
+    Generate metadata, titles, description, tags and thumbnail text for one video.
+    
+    The structured fields come from a single bundled call that runs
+    concurrently with the free-text description.
+    A failing call is reported under its keys instead of failing the package.
+    """
+    bundle, description = await asyncio.gather(
+        generate_bundle(content, title_hint=title_hint),
+        generate_description(title_hint or "", content),
+        return_exceptions=True,
+    )
+    
+    if isinstance(description, Exception):
+        description = {"success": False, "error": str(description)}
+    if isinstance(bundle, Exception):
+        bundle = {"success": False, "error": str(bundle)}
+    if not bundle["success"]:
         return {
-            "success": False,
-            "error": str(e)
+            "metadata": bundle,
+            "titles": bundle,
+            "description": description,
+            "tags": [],
+            "thumbnail": bundle,
         }
+    
+    return {
+        "metadata": {**bundle["metadata"], "success": True},
+        "titles": {"success": True, "titles": bundle["title_variations"]},
+        "description": description,
+        "tags": bundle["tags"],
+        "thumbnail": {"success": True, **bundle["thumbnail"]},
+    }
@@ -1,6 +1,14 @@
 """PDF generator service for creating study notes using ReportLab."""
 
+import functools
+import hashlib
+import io
+import os
 import re
+import uuid
+
+import aiofiles
+import orjson
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
@@ -13,9 +21,19 @@ from reportlab.lib.enums import TA_CENTER
 
 from app.config import settings
 
+# Precompiled once; _clean_markdown runs for every summary paragraph
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+_HEADING_RE = re.compile(r"^#{1,4}\s*", re.MULTILINE)
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\s-]")
+
 
+@functools.lru_cache(maxsize=1)
 def _get_styles():
-    """Create and return custom paragraph styles for the PDF."""
+    """Create and return custom paragraph styles for the PDF.
+    
+    Built once per process; document builds only read the stylesheet.
+    """
     styles = getSampleStyleSheet()
 
     styles.add(ParagraphStyle(
@@ -75,18 +93,26 @@ def _get_styles():
         fontName="Helvetica-BoldOblique",
     ))
 
+    styles.add(ParagraphStyle(
+        "Footer",
+        parent=styles["BodyText"],
+        fontSize=8,
+        textColor=HexColor("#999999"),
+        alignment=TA_CENTER,
+    ))
+
     return styles
 
 
 def _clean_markdown(text: str) -> str:
     """Convert basic Markdown to ReportLab-compatible markup."""
-    text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
-    text = re.sub(r"\*(.+?)\*", r"<i>\1</i>", text)
-    text = re.sub(r"^#{1,4}\s*", "", text, flags=re.MULTILINE)
+    text = _BOLD_RE.sub(r"<b>\1</b>", text)
+    text = _ITALIC_RE.sub(r"<i>\1</i>", text)
+    text = _HEADING_RE.sub("", text)
     return text
 
 
-def generate_pdf(
+def pdf_file_name(
     video_id: str,
     title: str,
     summary_text: str,
@@ -94,18 +120,41 @@ def generate_pdf(
     questions: list[dict],
 ) -> str:
     """
-    Generate a PDF with summary notes and quiz.
+    Build the on-disk filename for a video's PDF.
     
-    Returns the filename of the generated PDF.
+    Includes a BLAKE2b hash of the content, so an existing file with the
+    same name can be reused instead of rebuilt, and edited content never
+    overwrites an older PDF.
     """
-    # Create safe filename
-    safe_title = re.sub(r"[^\w\s-]", "", title)[:60].strip()
-    file_name = f"{safe_title}_{video_id}.pdf"
-    file_path = settings.PDF_DIR / file_name
+    h = hashlib.blake2b(digest_size=5)
+    h.update(title.encode())
+    h.update(b"\x00")
+    h.update(summary_text.encode())
+    h.update(b"\x00")
+    h.update("\x00".join(str(t) for t in key_topics).encode())
+    h.update(orjson.dumps(questions))
+
+    safe_title = _UNSAFE_FILENAME_RE.sub("", title)[:60].strip()
+    return f"{safe_title}_{video_id}_{h.hexdigest()}.pdf"
+
+
+def build_pdf(
+    video_id: str,
+    title: str,
+    summary_text: str,
+    key_topics: list[str],
+    questions: list[dict],
+) -> io.BytesIO:
+    """
+    Render a PDF with summary notes and quiz into memory.
+    
+    Returns a BytesIO positioned at the start of the document.
+    """
+    buf = io.BytesIO()
 
     # Create document template
     doc = SimpleDocTemplate(
-        str(file_path),
+        buf,
         pagesize=A4,
         leftMargin=20 * mm,
         rightMargin=20 * mm,
@@ -137,17 +186,29 @@ def generate_pdf(
 
     # Summary section
     story.append(Paragraph("Detailed Summary", styles["SectionHeading"]))
+    # Consecutive prose lines share one Paragraph (joined with <br/>), so
+    # layout and markdown cleanup run per group rather than per line
+    prose = []
+
+    def flush_prose():
+        if prose:
+            # Clean before joining: the inline regexes never span "\n"
+            cleaned = _clean_markdown("\n".join(prose)).replace("\n", "<br/>")
+            story.append(Paragraph(cleaned, styles["BodyText2"]))
+            prose.clear()
+
     for paragraph in summary_text.split("\n"):
         paragraph = paragraph.strip()
         if not paragraph:
+            flush_prose()
             story.append(Spacer(1, 4))
-            continue
-        cleaned = _clean_markdown(paragraph)
-        if paragraph.startswith("- ") or paragraph.startswith("* "):
-            cleaned = cleaned.lstrip("- *")
+        elif paragraph.startswith("- ") or paragraph.startswith("* "):
+            flush_prose()
+            cleaned = _clean_markdown(paragraph).lstrip("- *")
             story.append(Paragraph(f"• {cleaned}", styles["BodyText2"]))
         else:
-            story.append(Paragraph(cleaned, styles["BodyText2"]))
+            prose.append(paragraph)
+    flush_prose()
     story.append(Spacer(1, 10))
     story.append(HRFlowable(width="100%", thickness=1, color=HexColor("#e94560")))
     story.append(Spacer(1, 10))
@@ -179,9 +240,74 @@ def generate_pdf(
     story.append(HRFlowable(width="100%", thickness=0.5, color=HexColor("#cccccc")))
     story.append(Paragraph(
         "Generated by TubeMentor AI | All Copyrights are reserved to original content creators 2026",
-        ParagraphStyle("Footer", parent=styles["BodyText"], fontSize=8,
-                        textColor=HexColor("#999999"), alignment=TA_CENTER),
+        styles["Footer"],
     ))
 
     doc.build(story)
+    buf.seek(0)
+    return buf
+
+
+def _tmp_path(file_name: str):
+    """Unique temp name in PDF_DIR; not *.pdf, so it is never served or reused."""
+    return settings.PDF_DIR / f"{file_name}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+async def save_pdf(file_name: str, buf: io.BytesIO):
+    """
+    Write a rendered PDF to the PDF directory without blocking the event loop.
+    
+    Written to a temp file and renamed into place, so a concurrent request
+    for the same content (or a crash mid-write) never sees a partial PDF.
+    """
+    tmp_path = _tmp_path(file_name)
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(buf.getvalue())
+        os.replace(tmp_path, settings.PDF_DIR / file_name)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def prune_stale_pdfs(video_id: str, keep: str):
+    """Delete older content-hash variants of a video's PDF, keeping `keep`."""
+    for path in settings.PDF_DIR.glob(f"*_{video_id}_*.pdf"):
+        if path.name != keep:
+            try:
+                path.unlink()
+            except OSError as e:
+                print(f"Could not remove stale PDF {path.name}: {e}")
+
+
+def generate_pdf(
+    video_id: str,
+    title: str,
+    summary_text: str,
+    key_topics: list[str],
+    questions: list[dict],
+    inline: bool = False,
+):
+    """
+    Generate a PDF with summary notes and quiz.
+    
+    Returns the filename of the generated PDF, or the in-memory PDF
+    (BytesIO) without touching disk when inline=True.
+    """
+    file_name = pdf_file_name(video_id, title, summary_text, key_topics, questions)
+    file_path = settings.PDF_DIR / file_name
+    if not inline and file_path.exists():
+        return file_name
+
+    buf = build_pdf(video_id, title, summary_text, key_topics, questions)
+    if inline:
+        return buf
+
+    tmp_path = _tmp_path(file_name)
+    try:
+        tmp_path.write_bytes(buf.getvalue())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     return file_name
@@ -1,68 +1,196 @@
 """Quiz service for generating MCQ questions from video transcripts using Groq LLM."""
 
-import json
-from groq import Groq
-from app.config import settings
+import asyncio
+import io
+import orjson
+from app.services._groq_client import aclient
+from app.services._tokens import truncate_tokens
+from app.services.llm_cache import cached_chat
+from app.services.semantic_cache import get_semantic_cache
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
+# Prompt layout: QUIZ_PROMPT is sent verbatim as the system message so its
+# tokens form an identical prefix on every call (reusable from the provider's
+# prompt cache). Per-request values belong in QUIZ_INPUT, never in QUIZ_PROMPT.
 QUIZ_PROMPT = """You are an expert quiz creator for educational content.
-Based on the following video transcript titled "{title}", generate exactly {num_questions} multiple-choice quiz questions.
+For each video transcript in the user message, generate exactly the requested number of multiple-choice quiz questions.
 
-Each question MUST test understanding of the concepts discussed in the video.
+Each question MUST test understanding of the concepts discussed in that video.
 
-Return your response as a valid JSON array with this exact structure:
-[
-  {{
-    "question": "The question text?",
-    "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
-    "correct_answer": "A) Option 1",
-    "explanation": "Brief explanation of why this is correct."
-  }}
-]
+Return your response as a valid JSON object with this exact structure, keyed by each video's ID:
+{
+  "quizzes": {
+    "<video id>": [
+      {
+        "question": "The question text?",
+        "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
+        "correct_answer": "A) Option 1",
+        "explanation": "Brief explanation of why this is correct."
+      }
+    ]
+  }
+}
 
 Rules:
 - Each question must have exactly 4 options (A, B, C, D)
 - Questions should range from easy to challenging
 - Explanations should be clear and educational
-- Return ONLY the JSON array, no other text
+- Return ONLY the JSON object, no other text
 - add images to understand better like flow chart and diagrams if needed
+"""
+
+QUIZ_INPUT = """NUMBER OF QUESTIONS PER VIDEO: {num_questions}
+
+{videos}"""
+
+QUIZ_VIDEO_BLOCK = """=== VIDEO ID: {video_id} ===
+TITLE: {title}
 TRANSCRIPT:
 {transcript}
 """
 
+# Per-video transcript budget
+QUIZ_INPUT_TOKENS = 6000
 
-def generate_quiz(title: str, transcript: str, num_questions: int = 5) -> list[dict]:
-    """Generate quiz questions from a video transcript using Groq."""
-    response = client.chat.completions.create(
-        model=settings.GROQ_MODEL,
+# Output budget per question (question, 4 options, answer, explanation)
+QUIZ_TOKENS_PER_QUESTION = 150
+
+# Transcripts are grouped into one request up to this many characters
+# (a single longer transcript is sent on its own)
+QUIZ_BATCH_CHARS = 12000
+
+
+def _parse_quizzes(raw: str, video_ids: list[str]) -> dict:
+    """
+    Parse the {"quizzes": {id: [...]}} object returned in JSON mode.
+    
+    Uses orjson (C parser). If the response was cut off by max_tokens,
+    ijson recovers every question that was completed before the cut.
+    """
+    try:
+        quizzes = orjson.loads(raw)["quizzes"]
+        if isinstance(quizzes, dict):
+            return quizzes
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        pass
+
+    if not IJSON_AVAILABLE or not raw:
+        return {}
+
+    quizzes = {}
+    for video_id in video_ids:
+        questions = []
+        try:
+            for question in ijson.items(io.BytesIO(raw.encode()), f"quizzes.{video_id}.item"):
+                questions.append(question)
+        except ijson.JSONError:
+            pass  # Truncated tail - keep the complete questions parsed so far
+        if questions:
+            quizzes[video_id] = questions
+    return quizzes
+
+
+def _group_by_length(items: list[dict], limit: int) -> list[list[dict]]:
+    """Split items into consecutive groups whose transcripts total <= limit chars."""
+    groups, current, size = [], [], 0
+    for item in items:
+        length = len(item["transcript"])
+        if current and size + length > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += length
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _quiz_group(group: list[dict], num_questions: int) -> dict:
+    videos = "\n".join(
+        QUIZ_VIDEO_BLOCK.format(
+            video_id=item["id"],
+            title=item["title"],
+            transcript=item["transcript"],
+        )
+        for item in group
+    )
+    raw = await cached_chat(
+        aclient,
         messages=[
-            {
-                "role": "system", 
-                "content": "You are a quiz generator. Return only valid JSON."
-            },
-            {
-                "role": "user", 
-                "content": QUIZ_PROMPT.format(
-                    title=title,
-                    num_questions=num_questions,
-                    transcript=transcript[:15000],
-                )
-            },
+            {"role": "system", "content": QUIZ_PROMPT},
+            {"role": "user", "content": QUIZ_INPUT.format(
+                num_questions=num_questions,
+                videos=videos,
+            )},
         ],
         temperature=0.6,
-        max_tokens=settings.GROQ_MAX_TOKENS,
+        max_tokens=QUIZ_TOKENS_PER_QUESTION * num_questions * len(group),
+        response_format={"type": "json_object"},
+        cache=True,  # Regenerating for the same transcripts reuses the quizzes
     )
+    return _parse_quizzes(raw, [item["id"] for item in group])
 
-    raw = response.choices[0].message.content.strip()
 
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[1]
-        raw = raw.rsplit("```", 1)[0]
+async def generate_quiz_batch(items: list[dict], num_questions: int = 5) -> dict:
+    """
+    Generate quizzes for several videos, sharing Groq requests between them.
+    
+    Args:
+        items: List of {"id", "title", "transcript"} dicts
+        num_questions: Questions per video
+    
+    Returns:
+        dict mapping video id -> list of questions (ids that failed are absent)
+    """
+    results = {}
+    pending = []
+    sem_cache = get_semantic_cache()
 
-    try:
-        questions = json.loads(raw)
-    except json.JSONDecodeError:
+    for item in items:
+        transcript = truncate_tokens(item["transcript"], QUIZ_INPUT_TOKENS)
+        cache_key = None
+        # Near-duplicate transcripts (whitespace/truncation/minor edits) reuse a cached quiz
+        if sem_cache:
+            cached, cache_key = await asyncio.to_thread(
+                sem_cache.get,
+                transcript,
+                {"fn": "quiz", "title": item["title"], "num_questions": num_questions},
+            )
+            if cached is not None:
+                results[item["id"]] = cached
+                continue
+        pending.append({**item, "transcript": transcript, "cache_key": cache_key})
+
+    groups = _group_by_length(pending, QUIZ_BATCH_CHARS)
+    group_results = await asyncio.gather(
+        *(_quiz_group(group, num_questions) for group in groups)
+    )
+
+    new_entries = []
+    for group, quizzes in zip(groups, group_results):
+        for item in group:
+            questions = quizzes.get(item["id"])
+            if questions:
+                results[item["id"]] = questions
+                new_entries.append((item["cache_key"], questions))
+    if sem_cache:
+        await asyncio.to_thread(sem_cache.put_many, new_entries)
+
+    return results
+
+
+async def generate_quiz(title: str, transcript: str, num_questions: int = 5) -> list[dict]:
+    """Generate quiz questions from a video transcript using Groq."""
+    results = await generate_quiz_batch(
+        [{"id": "video", "title": title, "transcript": transcript}],
+        num_questions,
+    )
+    if not results.get("video"):
         raise ValueError("Failed to parse quiz questions from LLM response.")
 
-    return questions
+    return results["video"]
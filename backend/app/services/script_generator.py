@@ -1,21 +1,20 @@
 """Script Generator Service - Create educational scripts using Groq LLM."""
 
-from groq import Groq
-from app.config import settings
-from typing import Optional
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
+from app.services._groq_client import aclient
+from app.services._tokens import truncate_tokens
+from app.services.llm_cache import stream_cached_chat
+from app.services.semantic_cache import get_semantic_cache
 
-client = Groq(api_key=settings.GROQ_API_KEY)
 
+# Transcript budget for the video script prompt
+SCRIPT_INPUT_TOKENS = 4000
 
+# The *_PROMPT templates are static system messages (a stable, cacheable
+# prompt prefix); title/summary/topic/duration go in the *_INPUT user message.
 VIDEO_SCRIPT_PROMPT = """You are an expert educational video script writer.
-Based on the following video summary and transcript, create a professional video script that can be used to recreate or explain this content.
-
-VIDEO TITLE: {title}
-SUMMARY:
-{summary}
-
-TRANSCRIPT EXCERPT:
-{transcript}
+Based on the video summary and transcript in the user message, create a professional video script that can be used to recreate or explain this content.
 
 Create a complete video script with the following structure:
 
@@ -38,16 +37,21 @@ Create a complete video script with the following structure:
 - Timing suggestions
 
 Make the script engaging, educational, and suitable for a YouTube video.
-Target duration: {duration} minutes.
+Match the target duration given in the user message.
 """
 
-CUSTOM_SCRIPT_PROMPT = """You are an expert educational video script writer.
-Create a professional video script on the following topic:
+VIDEO_SCRIPT_INPUT = """VIDEO TITLE: {title}
+TARGET DURATION: {duration} minutes
 
-TOPIC: {topic}
-STYLE: {style}
-TARGET AUDIENCE: {audience}
-DURATION: {duration} minutes
+SUMMARY:
+{summary}
+
+TRANSCRIPT EXCERPT:
+{transcript}
+"""
+
+CUSTOM_SCRIPT_PROMPT = """You are an expert educational video script writer.
+Create a professional video script on the topic given in the user message, in its style, for its audience and duration.
 
 Create a complete video script with the following structure:
 
@@ -72,58 +76,94 @@ Create a complete video script with the following structure:
 Make the script engaging, educational, and professionally structured.
 """
 
+CUSTOM_SCRIPT_INPUT = """TOPIC: {topic}
+STYLE: {style}
+TARGET AUDIENCE: {audience}
+DURATION: {duration} minutes
+"""
+
 
-def generate_video_script(
+async def _collect_script(stream: AsyncIterator[str]) -> Tuple[str, dict]:
+    """
+    Join a streamed script, tallying words as the deltas arrive.
+    
+    Returns the script and its word count / spoken duration estimate
+    (~150 words per minute).
+    """
+    parts = []
+    word_count = 0
+    in_word = False  # Previous delta ended mid-word
+    async for delta in stream:
+        if not delta:
+            continue
+        parts.append(delta)
+        word_count += len(delta.split())
+        if in_word and not delta[0].isspace():
+            word_count -= 1  # A word split across two deltas
+        in_word = not delta[-1].isspace()
+    
+    return "".join(parts), {
+        "word_count": word_count,
+        "estimated_duration_minutes": word_count // 150,
+    }
+
+
+async def stream_video_script(
     title: str,
     summary: str,
     transcript: str,
     duration: int = 10
-) -> dict:
-    """Generate a video script from existing content."""
+) -> AsyncIterator[str]:
+    """Yield a video script for existing content as Groq generates it."""
+    
+    sem_cache = get_semantic_cache()
+    if sem_cache:
+        cached, cache_key = await asyncio.to_thread(
+            sem_cache.get,
+            f"{summary}\n{truncate_tokens(transcript, SCRIPT_INPUT_TOKENS)}",
+            {"fn": "video_script", "title": title, "duration": duration},
+        )
+        if cached is not None:
+            yield cached
+            return
     
-    response = client.chat.completions.create(
-        model=settings.GROQ_MODEL,
+    parts = []
+    outcome = {}
+    async for delta in stream_cached_chat(
+        aclient,
         messages=[
-            {"role": "system", "content": "You are a professional video script writer."},
-            {"role": "user", "content": VIDEO_SCRIPT_PROMPT.format(
+            {"role": "system", "content": VIDEO_SCRIPT_PROMPT},
+            {"role": "user", "content": VIDEO_SCRIPT_INPUT.format(
                 title=title,
                 summary=summary,
-                transcript=transcript[:10000],
+                transcript=truncate_tokens(transcript, SCRIPT_INPUT_TOKENS),
                 duration=duration
             )},
         ],
         temperature=0.7,
         max_tokens=4000,
-    )
-    
-    script_content = response.choices[0].message.content
+        cache=True,  # Scripts for the same video are reused by video/publish pipelines
+        outcome=outcome,
+    ):
+        parts.append(delta)
+        yield delta
     
-    # Estimate word count and duration
-    word_count = len(script_content.split())
-    estimated_duration = word_count // 150  # ~150 words per minute for speaking
-    
-    return {
-        "title": title,
-        "script": script_content,
-        "word_count": word_count,
-        "estimated_duration_minutes": estimated_duration,
-        "target_duration": duration,
-    }
+    if sem_cache and parts and outcome.get("finish_reason") != "length":
+        await asyncio.to_thread(sem_cache.put, cache_key, "".join(parts))
 
 
-def generate_custom_script(
+async def stream_custom_script(
     topic: str,
     style: str = "educational",
     audience: str = "general",
     duration: int = 10
-) -> dict:
-    """Generate a custom script from scratch on any topic."""
-    
-    response = client.chat.completions.create(
-        model=settings.GROQ_MODEL,
+) -> AsyncIterator[str]:
+    """Yield a custom script on any topic as Groq generates it."""
+    async for delta in stream_cached_chat(
+        aclient,
         messages=[
-            {"role": "system", "content": "You are a professional video script writer."},
-            {"role": "user", "content": CUSTOM_SCRIPT_PROMPT.format(
+            {"role": "system", "content": CUSTOM_SCRIPT_PROMPT},
+            {"role": "user", "content": CUSTOM_SCRIPT_INPUT.format(
                 topic=topic,
                 style=style,
                 audience=audience,
@@ -132,17 +172,45 @@ def generate_custom_script(
         ],
         temperature=0.8,
         max_tokens=4000,
+    ):
+        yield delta
+
+
+async def generate_video_script(
+    title: str,
+    summary: str,
+    transcript: str,
+    duration: int = 10
+) -> dict:
+    """Generate a video script from existing content."""
+    script_content, stats = await _collect_script(
+        stream_video_script(title, summary, transcript, duration)
     )
     
-    script_content = response.choices[0].message.content
-    word_count = len(script_content.split())
+    return {
+        "title": title,
+        "script": script_content,
+        **stats,
+        "target_duration": duration,
+    }
+
+
+async def generate_custom_script(
+    topic: str,
+    style: str = "educational",
+    audience: str = "general",
+    duration: int = 10
+) -> dict:
+    """Generate a custom script from scratch on any topic."""
+    script_content, stats = await _collect_script(
+        stream_custom_script(topic, style, audience, duration)
+    )
     
     return {
         "topic": topic,
         "style": style,
         "audience": audience,
         "script": script_content,
-        "word_count": word_count,
-        "estimated_duration_minutes": word_count // 150,
+        **stats,
         "target_duration": duration,
     }
@@ -0,0 +1,176 @@
+"""Semantic Cache - reuse LLM responses for near-duplicate inputs."""
+
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+try:
+    import faiss
+    from app.services.embeddings import generate_embedding, EMBEDDING_DIMENSION
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+
+SIMILARITY_THRESHOLD = 0.92
+MAX_ENTRIES = 10000
+SEARCH_K = 8  # Neighbours checked for a matching scope
+# IndexIDMap2.remove_ids is O(n), so eviction frees this many slots at once
+EVICT_BATCH = 256
+
+# all-MiniLM-L6-v2 only reads ~256 tokens, so long inputs are embedded as the
+# mean of windows spread across the text rather than just the opening
+WINDOW_CHARS = 1000
+MAX_WINDOWS = 8
+
+CACHE_PATH = settings.OUTPUT_DIR / "semantic_cache.pkl"
+
+
+def _scope_hash(scope: dict) -> str:
+    """Hash the non-content parameters that must match exactly."""
+    raw = json.dumps(scope, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SemanticCache:
+    """
+    FAISS inner-product index over normalized text embeddings.
+
+    Each entry holds a response plus the scope (function name and exact
+    parameters) it was generated for. A lookup hits when an entry in the same
+    scope has cosine similarity >= SIMILARITY_THRESHOLD. Oldest-used entries
+    are evicted beyond MAX_ENTRIES.
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH):
+        self.cache_path = cache_path
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # id -> (scope_hash, response, fp16 vector), in LRU order
+        self._entries = OrderedDict()
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(EMBEDDING_DIMENSION))
+        self._load()
+
+    def embed(self, text: str) -> np.ndarray:
+        step = max(WINDOW_CHARS, len(text) // MAX_WINDOWS)
+        windows = [text[i:i + WINDOW_CHARS] for i in range(0, len(text), step)][:MAX_WINDOWS]
+        vectors = generate_embedding(windows or [""])
+        vec = vectors.mean(axis=0)
+        vec /= (np.linalg.norm(vec) or 1.0)
+        return vec.astype(np.float32)
+
+    def get(self, text: str, scope: dict) -> Tuple[Optional[Any], tuple]:
+        """
+        Look up a cached response.
+
+        Returns:
+            (response or None, key) - pass key to put() after a miss
+        """
+        vec = self.embed(text)
+        scope_key = _scope_hash(scope)
+
+        with self._lock:
+            if self.index.ntotal > 0:
+                k = min(SEARCH_K, self.index.ntotal)
+                scores, ids = self.index.search(vec.reshape(1, -1), k)
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if score < SIMILARITY_THRESHOLD:
+                        break
+                    entry = self._entries.get(int(entry_id))
+                    if entry and entry[0] == scope_key:
+                        self._entries.move_to_end(int(entry_id))
+                        self.stats["hits"] += 1
+                        return entry[1], (vec, scope_key)
+
+            self.stats["misses"] += 1
+        return None, (vec, scope_key)
+
+    def put(self, key: tuple, response: Any):
+        self.put_many([(key, response)])
+
+    def put_many(self, items: list):
+        """Store several (key, response) pairs with one index add and at most one eviction."""
+        if not items:
+            return
+
+        with self._lock:
+            ids = np.arange(self._next_id, self._next_id + len(items), dtype=np.int64)
+            self._next_id += len(items)
+            vectors = np.stack([key[0] for key, _ in items])
+            self.index.add_with_ids(vectors, ids)
+            for entry_id, ((vec, scope_key), response) in zip(ids.tolist(), items):
+                self._entries[entry_id] = (scope_key, response, vec.astype(np.float16))
+
+            if len(self._entries) > MAX_ENTRIES:
+                evict = min(len(self._entries), len(self._entries) - MAX_ENTRIES + EVICT_BATCH)
+                old_ids = [self._entries.popitem(last=False)[0] for _ in range(evict)]
+                self.index.remove_ids(np.array(old_ids, dtype=np.int64))
+
+    def save(self):
+        """Persist entries so the cache survives restarts."""
+        with self._lock:
+            data = {"next_id": self._next_id, "entries": list(self._entries.items())}
+        try:
+            with open(self.cache_path, "wb") as f:
+                pickle.dump(data, f)
+        except Exception as e:
+            print(f"Failed to save semantic cache: {e}")
+
+    def _load(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"Failed to load semantic cache: {e}")
+            return
+
+        self._next_id = data["next_id"]
+        self._entries = OrderedDict(data["entries"])
+        if self._entries:
+            ids = np.fromiter(self._entries.keys(), dtype=np.int64)
+            vectors = np.stack([entry[2] for entry in self._entries.values()]).astype(np.float32)
+            self.index.add_with_ids(vectors, ids)
+        print(f"Loaded semantic cache: {len(self._entries)} entries")
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self._entries), **self.stats}
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Get or create the semantic cache (Singleton pattern). None if faiss is missing.
+
+    Creating it loads the saved entries and rebuilds the index; app startup
+    does that in a worker thread so request handlers only get the instance.
+    """
+    global _semantic_cache
+
+    if _semantic_cache is None and SEMANTIC_CACHE_AVAILABLE:
+        _semantic_cache = SemanticCache()
+
+    return _semantic_cache
+
+
+def semantic_cache_stats() -> Optional[dict]:
+    """Stats for the cache, or None if it hasn't been created in this process."""
+    return _semantic_cache.get_stats() if _semantic_cache is not None else None
+
+
+def save_semantic_cache():
+    """Persist the cache if it was used in this process."""
+    if _semantic_cache is not None:
+        _semantic_cache.save()
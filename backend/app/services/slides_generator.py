@@ -7,6 +7,7 @@ from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
 from pathlib import Path
 from typing import List, Optional
+import copy
 import re
 
 from app.config import settings
@@ -16,6 +17,42 @@ SLIDES_DIR = settings.OUTPUT_DIR / "slides"
 SLIDES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# One pass over the whole summary; the named group says which kind of line
+# matched (tried in this order, like the original startswith chain)
+_SLIDE_LINE_RE = re.compile(
+    r"^[ \t]*(?:"
+    r"#{1,2} (?P<header>.*)"
+    r"|(?P<bold>\*\*(?:\*?|.*\*\*))"
+    r"|[-*•] (?P<bullet>.*)"
+    r"|[1-9]\.(?P<numbered>.*)"
+    r")[ \t\r]*$",
+    re.MULTILINE,
+)
+
+
+# Geometry and font sizes are constant; convert to EMU once at import
+# rather than on every slide
+_SLIDE_WIDTH = Inches(10)
+_SLIDE_HEIGHT = Inches(7.5)
+_HEADER_HEIGHT = Inches(1.2)
+_BLANK_LAYOUT = 6  # Index of the blank layout in the default template
+
+# (left, top, width, height) of each text box
+_GEOM = {
+    "title_slide_title": (Inches(0.5), Inches(2.5), Inches(9), Inches(1.5)),
+    "title_slide_subtitle": (Inches(0.5), Inches(4.2), Inches(9), Inches(1)),
+    "content_title": (Inches(0.5), Inches(0.3), Inches(8.5), Inches(0.8)),
+    "content_body": (Inches(0.7), Inches(1.5), Inches(8.6), Inches(5)),
+    "slide_number": (Inches(9), Inches(6.8), Inches(0.8), Inches(0.3)),
+    "section_number": (Inches(0.5), Inches(2), Inches(9), Inches(1)),
+    "section_title": (Inches(0.5), Inches(2.8), Inches(9), Inches(1.5)),
+    "conclusion_title": (Inches(0.5), Inches(0.5), Inches(9), Inches(1)),
+    "conclusion_body": (Inches(0.7), Inches(1.8), Inches(8.6), Inches(4.5)),
+}
+
+_PT = {size: Pt(size) for size in (6, 12, 16, 18, 20, 22, 24, 32, 36, 40, 44)}
+
+
 # Color scheme
 COLORS = {
     "primary": RgbColor(139, 92, 246),      # Purple (brand color)
@@ -27,41 +64,67 @@ COLORS = {
 }
 
 
-def create_title_slide(prs: Presentation, title: str, subtitle: str = ""):
-    """Create a title slide."""
-    slide_layout = prs.slide_layouts[6]  # Blank layout
-    slide = prs.slides.add_slide(slide_layout)
+# Background shapes are identical on every slide of a kind, so they are built
+# with add_shape once and then cloned as XML onto later slides
+_BACKGROUND_TEMPLATES = {}
+
+
+def _add_slide(prs: Presentation, kind: str):
+    """Add a blank slide carrying the background shapes for `kind`."""
+    slide = prs.slides.add_slide(prs.slide_layouts[_BLANK_LAYOUT])
+    key = (kind, prs.slide_width, prs.slide_height)
+    
+    template = _BACKGROUND_TEMPLATES.get(key)
+    if template is not None:
+        for element in template:
+            slide.shapes._spTree.append(copy.deepcopy(element))
+        return slide
     
     # Background
     background = slide.shapes.add_shape(
         MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height
     )
     background.fill.solid()
-    background.fill.fore_color.rgb = COLORS["background"]
+    background.fill.fore_color.rgb = COLORS["secondary" if kind == "section" else "background"]
     background.line.fill.background()
+    shapes = [background]
+    
+    # Header bar
+    if kind == "content":
+        header = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, _HEADER_HEIGHT
+        )
+        header.fill.solid()
+        header.fill.fore_color.rgb = COLORS["secondary"]
+        header.line.fill.background()
+        shapes.append(header)
+    
+    _BACKGROUND_TEMPLATES[key] = [copy.deepcopy(shape._element) for shape in shapes]
+    return slide
+
+
+def create_title_slide(prs: Presentation, title: str, subtitle: str = ""):
+    """Create a title slide."""
+    slide = _add_slide(prs, "plain")
     
     # Title
-    title_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(2.5), Inches(9), Inches(1.5)
-    )
+    title_box = slide.shapes.add_textbox(*_GEOM["title_slide_title"])
     tf = title_box.text_frame
     tf.word_wrap = True
     p = tf.paragraphs[0]
     p.text = title
-    p.font.size = Pt(44)
+    p.font.size = _PT[44]
     p.font.bold = True
     p.font.color.rgb = COLORS["text"]
     p.alignment = PP_ALIGN.CENTER
     
     # Subtitle
     if subtitle:
-        subtitle_box = slide.shapes.add_textbox(
-            Inches(0.5), Inches(4.2), Inches(9), Inches(1)
-        )
+        subtitle_box = slide.shapes.add_textbox(*_GEOM["title_slide_subtitle"])
         tf = subtitle_box.text_frame
         p = tf.paragraphs[0]
         p.text = subtitle
-        p.font.size = Pt(24)
+        p.font.size = _PT[24]
         p.font.color.rgb = COLORS["muted"]
         p.alignment = PP_ALIGN.CENTER
     
@@ -75,40 +138,19 @@ def create_content_slide(
     slide_number: int = None
 ):
     """Create a content slide with bullet points."""
-    slide_layout = prs.slide_layouts[6]  # Blank
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Background
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = COLORS["background"]
-    background.line.fill.background()
-    
-    # Header bar
-    header = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(1.2)
-    )
-    header.fill.solid()
-    header.fill.fore_color.rgb = COLORS["secondary"]
-    header.line.fill.background()
+    slide = _add_slide(prs, "content")
     
     # Title
-    title_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(0.3), Inches(8.5), Inches(0.8)
-    )
+    title_box = slide.shapes.add_textbox(*_GEOM["content_title"])
     tf = title_box.text_frame
     p = tf.paragraphs[0]
     p.text = title
-    p.font.size = Pt(32)
+    p.font.size = _PT[32]
     p.font.bold = True
     p.font.color.rgb = COLORS["text"]
     
     # Bullet points
-    content_box = slide.shapes.add_textbox(
-        Inches(0.7), Inches(1.5), Inches(8.6), Inches(5)
-    )
+    content_box = slide.shapes.add_textbox(*_GEOM["content_body"])
     tf = content_box.text_frame
     tf.word_wrap = True
     
@@ -118,20 +160,18 @@ def create_content_slide(
         else:
             p = tf.add_paragraph()
         p.text = f"• {point}"
-        p.font.size = Pt(20)
+        p.font.size = _PT[20]
         p.font.color.rgb = COLORS["text"]
-        p.space_before = Pt(12)
-        p.space_after = Pt(6)
+        p.space_before = _PT[12]
+        p.space_after = _PT[6]
     
     # Slide number
     if slide_number:
-        num_box = slide.shapes.add_textbox(
-            Inches(9), Inches(6.8), Inches(0.8), Inches(0.3)
-        )
+        num_box = slide.shapes.add_textbox(*_GEOM["slide_number"])
         tf = num_box.text_frame
         p = tf.paragraphs[0]
         p.text = str(slide_number)
-        p.font.size = Pt(12)
+        p.font.size = _PT[12]
         p.font.color.rgb = COLORS["muted"]
         p.alignment = PP_ALIGN.RIGHT
     
@@ -140,36 +180,23 @@ def create_content_slide(
 
 def create_section_slide(prs: Presentation, section_title: str, section_number: int):
     """Create a section divider slide."""
-    slide_layout = prs.slide_layouts[6]
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Background
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = COLORS["secondary"]
-    background.line.fill.background()
+    slide = _add_slide(prs, "section")
     
     # Section number
-    num_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(2), Inches(9), Inches(1)
-    )
+    num_box = slide.shapes.add_textbox(*_GEOM["section_number"])
     tf = num_box.text_frame
     p = tf.paragraphs[0]
     p.text = f"SECTION {section_number}"
-    p.font.size = Pt(18)
+    p.font.size = _PT[18]
     p.font.color.rgb = COLORS["primary"]
     p.alignment = PP_ALIGN.CENTER
     
     # Title
-    title_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(2.8), Inches(9), Inches(1.5)
-    )
+    title_box = slide.shapes.add_textbox(*_GEOM["section_title"])
     tf = title_box.text_frame
     p = tf.paragraphs[0]
     p.text = section_title
-    p.font.size = Pt(40)
+    p.font.size = _PT[40]
     p.font.bold = True
     p.font.color.rgb = COLORS["text"]
     p.alignment = PP_ALIGN.CENTER
@@ -179,33 +206,20 @@ def create_section_slide(prs: Presentation, section_title: str, section_number:
 
 def create_conclusion_slide(prs: Presentation, key_takeaways: List[str]):
     """Create a conclusion/takeaways slide."""
-    slide_layout = prs.slide_layouts[6]
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Background
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = COLORS["background"]
-    background.line.fill.background()
+    slide = _add_slide(prs, "plain")
     
     # Title
-    title_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(0.5), Inches(9), Inches(1)
-    )
+    title_box = slide.shapes.add_textbox(*_GEOM["conclusion_title"])
     tf = title_box.text_frame
     p = tf.paragraphs[0]
     p.text = "Key Takeaways"
-    p.font.size = Pt(36)
+    p.font.size = _PT[36]
     p.font.bold = True
     p.font.color.rgb = COLORS["primary"]
     p.alignment = PP_ALIGN.CENTER
     
     # Takeaways
-    content_box = slide.shapes.add_textbox(
-        Inches(0.7), Inches(1.8), Inches(8.6), Inches(4.5)
-    )
+    content_box = slide.shapes.add_textbox(*_GEOM["conclusion_body"])
     tf = content_box.text_frame
     tf.word_wrap = True
     
@@ -215,9 +229,9 @@ def create_conclusion_slide(prs: Presentation, key_takeaways: List[str]):
         else:
             p = tf.add_paragraph()
         p.text = f"✓ {point}"
-        p.font.size = Pt(22)
+        p.font.size = _PT[22]
         p.font.color.rgb = COLORS["text"]
-        p.space_before = Pt(16)
+        p.space_before = _PT[16]
     
     return slide
 
@@ -227,29 +241,21 @@ def parse_summary_to_slides(summary_text: str) -> dict:
     sections = []
     current_section = {"title": "", "points": []}
     
-    lines = summary_text.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    for match in _SLIDE_LINE_RE.finditer(summary_text):
+        kind = match.lastgroup
+        text = match.group(kind).strip()
         
-        # Check for headers (## or ** wrapped)
-        if line.startswith('## ') or line.startswith('# '):
+        # Headers (# / ## or ** wrapped) start a new section
+        if kind == "header" or kind == "bold":
+            if kind == "header" and not text:
+                continue
+            title = text if kind == "header" else text.strip('*').strip()
             if current_section["title"] and current_section["points"]:
                 sections.append(current_section)
-            current_section = {"title": line.lstrip('#').strip(), "points": []}
-        elif line.startswith('**') and line.endswith('**'):
-            if current_section["title"] and current_section["points"]:
-                sections.append(current_section)
-            current_section = {"title": line.strip('*').strip(), "points": []}
-        elif line.startswith('- ') or line.startswith('* ') or line.startswith('• '):
-            point = line.lstrip('-*• ').strip()
-            if point and len(point) > 3:
-                current_section["points"].append(point)
-        elif line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-            point = re.sub(r'^\d+\.\s*', '', line).strip()
-            if point and len(point) > 3:
+            current_section = {"title": title, "points": []}
+        else:
+            point = text.lstrip('-*• ').strip() if kind == "bullet" else text
+            if len(point) > 3:
                 current_section["points"].append(point)
     
     # Add last section
@@ -268,8 +274,8 @@ def generate_presentation(
     """Generate a PowerPoint presentation from a video summary."""
     
     prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
+    prs.slide_width = _SLIDE_WIDTH
+    prs.slide_height = _SLIDE_HEIGHT
     
     # Parse summary into sections
     sections = parse_summary_to_slides(summary)
@@ -322,8 +328,8 @@ def generate_custom_presentation(
     slides_content: List of {"title": str, "points": List[str]}
     """
     prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
+    prs.slide_width = _SLIDE_WIDTH
+    prs.slide_height = _SLIDE_HEIGHT
     
     # Title slide
     create_title_slide(prs, title, "Created with TubeMentor AI")
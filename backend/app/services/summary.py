@@ -1,10 +1,20 @@
 """Summary service - AI-powered video summarization using Groq LLM."""
 
+import asyncio
+import hashlib
 import json
-from groq import Groq
+import re
+from typing import AsyncIterator, Optional
+from groq import BadRequestError
 from app.config import settings
+from app.services._groq_client import chat_completion
+from app.services._tokens import truncate_at_boundary
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
 
 SUMMARY_PROMPT = """You are an expert educational content summarizer.
 Given the following transcript of a YouTube video titled "{title}", create a comprehensive summary.
@@ -21,6 +31,38 @@ TRANSCRIPT:
 {transcript}
 """
 
+# Summary and key topics in one JSON-mode request (the two-call path below is
+# the fallback when the JSON comes back malformed)
+COMBINED_PROMPT = """You are an expert educational content summarizer.
+Given the transcript of the YouTube video in the user message, return a JSON object with exactly these keys:
+{
+  "summary_markdown": "A comprehensive summary in clean Markdown",
+  "key_topics": ["Topic 1", "Topic 2", "Topic 3"]
+}
+
+summary_markdown MUST include:
+1. **Overview** - A brief 2-3 sentence overview of the entire video.
+2. **Key Topics** - A bullet list of the main topics/concepts covered.
+3. **Detailed Notes** - A detailed breakdown of each topic with key points explained clearly.
+4. **Key Takeaways** - The most important things to remember.
+5. **Examples** - Include relevant examples to illustrate concepts.
+
+key_topics is just the key topic names as strings.
+Return ONLY the JSON object, nothing else.
+"""
+
+COMBINED_INPUT = """VIDEO TITLE: {title}
+
+TRANSCRIPT:
+{transcript}
+"""
+
+# Markdown code fence around a JSON answer, at the start or end of the text
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*\n?|\n?\s*```\s*$")
+# Fallback for a topics array that isn't valid JSON
+_TOPICS_LIST_RE = re.compile(r"\[.*?\]", re.S)
+_TOPICS_RE = re.compile(r'"([^"]+)"')
+
 KEY_TOPICS_PROMPT = """From the following video transcript, extract just the key topic names as a JSON array of strings.
 Return ONLY the JSON array, nothing else.
 Example: ["Topic 1", "Topic 2", "Topic 3"]
@@ -30,48 +72,157 @@ TRANSCRIPT:
 """
 
 
-def generate_summary(title: str, transcript: str) -> dict:
-    """Generate a structured summary from a video transcript using Groq."""
-    
-    # Generate main summary
-    summary_response = client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "You are a helpful educational assistant."},
-            {"role": "user", "content": SUMMARY_PROMPT.format(
-                title=title, 
-                transcript=transcript[:15000]
-            )},
-        ],
-        temperature=settings.GROQ_TEMPERATURE,
-        max_tokens=settings.GROQ_MAX_TOKENS,
-    )
-    summary_text = summary_response.choices[0].message.content
+def _summary_messages(title: str, transcript: str) -> list:
+    return [
+        {"role": "system", "content": "You are a helpful educational assistant."},
+        {"role": "user", "content": SUMMARY_PROMPT.format(
+            title=title, 
+            transcript=truncate_at_boundary(transcript, 6000)
+        )},
+    ]
+
+
+def _topics_messages(transcript: str) -> list:
+    return [
+        {"role": "system", "content": "You extract key topics as a JSON array."},
+        {"role": "user", "content": KEY_TOPICS_PROMPT.format(
+            transcript=truncate_at_boundary(transcript, 4000)
+        )},
+    ]
+
+
+def _combined_messages(title: str, transcript: str) -> list:
+    return [
+        {"role": "system", "content": COMBINED_PROMPT},
+        {"role": "user", "content": COMBINED_INPUT.format(
+            title=title,
+            transcript=truncate_at_boundary(transcript, 6000)
+        )},
+    ]
+
+
+def _parse_topics(topics_raw: str) -> list:
+    """Parse topics JSON with fallback."""
+    topics_raw = _FENCE_RE.sub("", topics_raw).strip()
+    try:
+        return json.loads(topics_raw)
+    except json.JSONDecodeError:
+        # Pull the quoted strings out of the first [...] block, ignoring any
+        # prose the model wrapped around it
+        match = _TOPICS_LIST_RE.search(topics_raw)
+        return _TOPICS_RE.findall(match.group(0)) if match else []
+
 
-    # Extract key topics
-    topics_response = client.chat.completions.create(
+async def extract_key_topics(transcript: str) -> list:
+    """Extract key topic names from a transcript as a list."""
+    topics_response = await chat_completion(
         model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "You extract key topics as a JSON array."},
-            {"role": "user", "content": KEY_TOPICS_PROMPT.format(
-                transcript=transcript[:10000]
-            )},
-        ],
+        messages=_topics_messages(transcript),
         temperature=0.3,
         max_tokens=500,
     )
-    topics_raw = topics_response.choices[0].message.content.strip()
+    return _parse_topics(topics_response.choices[0].message.content.strip())
+
+
+_summary_cache = None
+
+
+def get_summary_cache():
+    """Get or create the on-disk summary cache (Singleton pattern). None without diskcache."""
+    global _summary_cache
+    
+    if _summary_cache is None and DISKCACHE_AVAILABLE:
+        _summary_cache = diskcache.Cache(str(settings.OUTPUT_DIR / "summary_cache"))
+    
+    return _summary_cache
+
+
+def _summary_cache_key(title: str, transcript: str) -> str:
+    """Model plus a BLAKE2b digest of the prompt inputs."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode())
+    digest.update(b"\0")
+    digest.update(transcript.encode())
+    return f"{settings.GROQ_MODEL}:{digest.hexdigest()}"
+
 
-    # Parse topics JSON with fallback
+async def generate_summary(title: str, transcript: str) -> dict:
+    """
+    Generate a structured summary and key topics.
+    
+    Results are cached on disk per (model, title, transcript), so a repeat
+    request for the same transcript skips Groq entirely.
+    """
+    cache = get_summary_cache()
+    key = _summary_cache_key(title, transcript)
+    # diskcache does SQLite and file I/O, so it stays off the event loop
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+    
+    result = await _generate_summary_combined(title, transcript)
+    if result is None:
+        result = await _generate_summary_two_calls(title, transcript)
+    
+    if cache is not None:
+        await asyncio.to_thread(cache.set, key, result)
+    return result
+
+
+async def _generate_summary_combined(title: str, transcript: str) -> Optional[dict]:
+    """Summary and key topics in a single JSON-mode call; None if the JSON is unusable."""
     try:
-        key_topics = json.loads(topics_raw)
-    except json.JSONDecodeError:
-        key_topics = [
-            t.strip().strip('"') 
-            for t in topics_raw.strip("[]").split(",")
-        ]
+        response = await chat_completion(
+            model=settings.GROQ_MODEL,
+            messages=_combined_messages(title, transcript),
+            temperature=settings.GROQ_TEMPERATURE,
+            max_tokens=settings.GROQ_MAX_TOKENS,
+            response_format={"type": "json_object"},
+        )
+        data = json.loads(response.choices[0].message.content)
+        summary_text = data["summary_markdown"]
+        key_topics = data["key_topics"]
+        if isinstance(summary_text, str) and summary_text.strip() and isinstance(key_topics, list):
+            return {"summary_text": summary_text, "key_topics": key_topics}
+        print("Combined summary response missing fields, falling back to two calls")
+    except (BadRequestError, json.JSONDecodeError, KeyError, TypeError) as e:
+        # BadRequestError: Groq rejects JSON-mode output that fails validation
+        print(f"Combined summary call failed ({e}), falling back to two calls")
+    
+    return None
+
+
+async def _generate_summary_two_calls(title: str, transcript: str) -> dict:
+    """Summary and key topics as separate LLM calls, run concurrently."""
+    summary_response, key_topics = await asyncio.gather(
+        chat_completion(
+            model=settings.GROQ_MODEL,
+            messages=_summary_messages(title, transcript),
+            temperature=settings.GROQ_TEMPERATURE,
+            max_tokens=settings.GROQ_MAX_TOKENS,
+        ),
+        extract_key_topics(transcript),
+    )
 
     return {
-        "summary_text": summary_text,
+        "summary_text": summary_response.choices[0].message.content,
         "key_topics": key_topics,
     }
+
+
+async def stream_summary(title: str, transcript: str) -> AsyncIterator[str]:
+    """Yield summary Markdown tokens as Groq produces them."""
+    stream = await chat_completion(
+        model=settings.GROQ_MODEL,
+        messages=_summary_messages(title, transcript),
+        temperature=settings.GROQ_TEMPERATURE,
+        max_tokens=settings.GROQ_MAX_TOKENS,
+        stream=True,
+    )
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
@@ -1,15 +1,32 @@
 """Transcript extraction service for YouTube videos."""
 
+import re
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     TranscriptsDisabled,
     NoTranscriptFound,
     VideoUnavailable,
-    TranscriptsDisabled,
-    # NoTranscriptAvailable,
 )
 
 
+# Runs of whitespace (same set str.split() uses), collapsed to one space
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# One client per process; it holds the HTTP session reused across fetches
+_API = YouTubeTranscriptApi()
+
+
+def count_words(text: str) -> int:
+    """
+    Word count for whitespace-normalized text (as stored by get_transcript).
+    
+    str.count is a single C-level scan, unlike split() which allocates a
+    list of every word. Older rows with irregular whitespace get a close estimate.
+    """
+    return text.count(" ") + 1 if text else 0
+
+
 def get_transcript(video_id: str, language: str = "en") -> dict:
     """
     Fetch the transcript of a YouTube video.
@@ -25,15 +42,13 @@ def get_transcript(video_id: str, language: str = "en") -> dict:
         ValueError: If transcript is unavailable.
     """
     try:
-        ytt_api = YouTubeTranscriptApi()
-        
         # Try requested language first, then fallback to any available
         try:
-            fetched = ytt_api.fetch(video_id, languages=[language])
+            fetched = _API.fetch(video_id, languages=[language])
             actual_language = language
         except Exception:
             # Fallback: get list of available transcripts and use first one
-            transcript_list = ytt_api.list(video_id)
+            transcript_list = _API.list(video_id)
             available = list(transcript_list)
             if not available:
                 raise ValueError(f"No transcripts available for video {video_id}")
@@ -43,13 +58,17 @@ def get_transcript(video_id: str, language: str = "en") -> dict:
             fetched = first_transcript.fetch()
             actual_language = first_transcript.language_code
         
-        full_text = " ".join([entry.text for entry in fetched])
+        # Normalize whitespace (caption lines contain '\n') once at ingestion;
+        # one regex pass instead of split() materializing every word as a str.
+        # str.join turns any iterable into a list before sizing the result, so
+        # a list comprehension is cheaper here than a generator
+        full_text = _WHITESPACE_RE.sub(" ", " ".join([entry.text for entry in fetched])).strip()
 
         return {
             "video_id": video_id,
             "language": actual_language,
             "content": full_text,
-            "word_count": len(full_text.split()),
+            "word_count": count_words(full_text),
         }
 
     except TranscriptsDisabled:
@@ -62,11 +81,6 @@ def get_transcript(video_id: str, language: str = "en") -> dict:
             f"No transcript found in the requested language. "
             f"Try a different video or check if captions are available."
         )
-    except NoTranscriptAvailable:
-        raise ValueError(
-            f"No transcript available for this video. "
-            f"The video may not have any captions."
-        )
     except VideoUnavailable:
         raise ValueError(
             f"Video is unavailable. It may be private, deleted, or region-restricted."
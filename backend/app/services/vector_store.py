@@ -2,47 +2,234 @@
 
 import faiss
 import numpy as np
+import orjson
 import pickle
+import threading
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
-from app.services.embeddings import generate_embedding, EMBEDDING_DIMENSION
+from app.services.embeddings import (
+    generate_embedding,
+    generate_embeddings_batch,
+    EMBEDDING_DIMENSION,
+    _physical_cores,
+)
 
 
 INDEX_DIR = Path(__file__).parent.parent / "outputs" / "faiss_index"
 INDEX_FILE = INDEX_DIR / "video_index.faiss"
-METADATA_FILE = INDEX_DIR / "video_metadata.pkl"
+METADATA_FILE = INDEX_DIR / "video_metadata.json"
+LEGACY_METADATA_FILE = INDEX_DIR / "video_metadata.pkl"  # Read once, replaced on next flush
+
+# Changes are written by a background flush at most this many seconds after
+# the first unsaved one, so a burst of adds costs a single index write
+FLUSH_DELAY = 30.0
+
+# Exact IndexFlatIP search is linear in corpus size. Past IVFSQ_TRAIN_THRESHOLD
+# the store migrates to an IVF index with int8 scalar-quantized vectors (384
+# bytes per video instead of 1536, only NPROBE of NLIST lists scanned); past
+# IVFPQ_TRAIN_THRESHOLD to IndexIVFPQ (48-byte PQ codes). Both IVF tiers keep
+# remove_ids/add_with_ids, which graph indexes such as HNSW do not support.
+IVFSQ_TRAIN_THRESHOLD = 1000
+IVFSQ_NLIST = 16
+IVFSQ_NPROBE = 4
+
+IVFPQ_TRAIN_THRESHOLD = 10000
+IVFPQ_NLIST = 256
+IVFPQ_M = 48  # sub-quantizers; EMBEDDING_DIMENSION must be divisible by this
+IVFPQ_NBITS = 8
+IVFPQ_NPROBE = 16
+
+
+def _configure_faiss():
+    """Pin FAISS's OpenMP pool and log which SIMD build was loaded."""
+    # Physical cores, matching the Torch pool, so the two don't oversubscribe
+    faiss.omp_set_num_threads(_physical_cores())
+    options = faiss.get_compile_options()
+    if "AVX2" not in options and "AVX512" not in options:
+        print(f"FAISS loaded without AVX2/AVX-512 kernels ({options.strip() or 'generic'})")
+    else:
+        print(f"FAISS compile options: {options.strip()}")
+
+
+def _as_f32(a: np.ndarray) -> np.ndarray:
+    """C-contiguous float32 view of `a`, copying only when it isn't one already."""
+    if a.dtype == np.float32 and a.flags.c_contiguous:
+        return a
+    return np.ascontiguousarray(a, dtype=np.float32)
+
+
+def _build_flat_index() -> faiss.Index:
+    """Exact inner-product index addressed by stable int64 ids."""
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(EMBEDDING_DIMENSION))
+
+
+def _fill_ivf_index(index: faiss.IndexIVF, vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+    """Train an IVF index on the given vectors and add them under their ids."""
+    index.train(vectors)
+    # Hashtable direct map keeps reconstruct(id) working with arbitrary ids
+    index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    index.add_with_ids(vectors, ids)
+    index.nprobe = _ivf_nprobe(index)
+    return index
+
+
+def _ivf_nprobe(index: faiss.IndexIVF) -> int:
+    return IVFPQ_NPROBE if isinstance(index, faiss.IndexIVFPQ) else IVFSQ_NPROBE
+
+
+def _build_ivfsq_index(vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+    quantizer = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+    index = faiss.IndexIVFScalarQuantizer(
+        quantizer, EMBEDDING_DIMENSION, IVFSQ_NLIST,
+        faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT,
+    )
+    return _fill_ivf_index(index, vectors, ids)
+
+
+def _build_ivfpq_index(vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+    quantizer = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+    index = faiss.IndexIVFPQ(
+        quantizer, EMBEDDING_DIMENSION, IVFPQ_NLIST, IVFPQ_M, IVFPQ_NBITS,
+        faiss.METRIC_INNER_PRODUCT,
+    )
+    return _fill_ivf_index(index, vectors, ids)
 
 
 class VideoVectorStore:
-    """Vector database for video embeddings using FAISS IndexFlatIP."""
+    """Vector database for video embeddings (IndexFlatIP, IVF-SQ8 then IVF-PQ at scale)."""
     
     def __init__(self):
         """Initialize vector store, loading existing index or creating new one."""
         INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        _configure_faiss()
         
-        if INDEX_FILE.exists() and METADATA_FILE.exists():
+        if INDEX_FILE.exists() and (METADATA_FILE.exists() or LEGACY_METADATA_FILE.exists()):
             self._load_index()
         else:
-            self.index = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+            self.index = _build_flat_index()
             self.video_ids: List[str] = []
             self.metadata: Dict[str, dict] = {}
+            self.faiss_ids: Dict[str, int] = {}  # video_id -> int64 id in the index
+            self._next_id = 0
+        
+        self._id_to_video = {fid: vid for vid, fid in self.faiss_ids.items()}
+        # Position of each video in video_ids; rebuilt on load, not persisted
+        self._id_to_pos = {vid: i for i, vid in enumerate(self.video_ids)}
+        self._dirty = False  # In-memory changes not yet written by flush()
+        self._lock = threading.RLock()  # Guards changes against a background flush
+        self._flush_timer: Optional[threading.Timer] = None
     
     def _load_index(self):
         """Load index and metadata from disk."""
         self.index = faiss.read_index(str(INDEX_FILE))
-        with open(METADATA_FILE, 'rb') as f:
-            data = pickle.load(f)
-            self.video_ids = data['video_ids']
-            self.metadata = data['metadata']
+        if METADATA_FILE.exists():
+            data = orjson.loads(METADATA_FILE.read_bytes())
+        else:
+            with open(LEGACY_METADATA_FILE, 'rb') as f:
+                data = pickle.load(f)
+        self.video_ids = data['video_ids']
+        self.metadata = data['metadata']
+        
+        if 'faiss_ids' in data:
+            self.faiss_ids = data['faiss_ids']
+            self._next_id = data['next_id']
+        else:
+            # Older stores addressed vectors by position in video_ids
+            self.faiss_ids = {vid: i for i, vid in enumerate(self.video_ids)}
+            self._next_id = len(self.video_ids)
+            if isinstance(self.index, faiss.IndexFlat):
+                vectors = self.index.reconstruct_n(0, self.index.ntotal)
+                self.index = _build_flat_index()
+                self.index.add_with_ids(vectors, np.arange(len(vectors), dtype='int64'))
+        
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = _ivf_nprobe(self.index)
+            self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
     
     def _save_index(self):
         """Save index and metadata to disk."""
         faiss.write_index(self.index, str(INDEX_FILE))
-        with open(METADATA_FILE, 'wb') as f:
-            pickle.dump({
-                'video_ids': self.video_ids,
-                'metadata': self.metadata,
-            }, f)
+        METADATA_FILE.write_bytes(orjson.dumps({
+            'video_ids': self.video_ids,
+            'metadata': self.metadata,
+            'faiss_ids': self.faiss_ids,
+            'next_id': self._next_id,
+        }))
+    
+    def flush(self):
+        """Write the index and metadata to disk if anything changed since the last flush."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._dirty:
+                self._save_index()
+                self._dirty = False
+    
+    def _mark_dirty(self):
+        """Record an unsaved change and schedule a background flush. Caller holds the lock."""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self._flush_in_background)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Background vector store flush failed: {e}")
+    
+    def _add_vectors(self, video_ids: List[str], embeddings: np.ndarray, metadata: List[dict]):
+        """Add a (k, D) block of vectors in one call and record their videos."""
+        with self._lock:
+            faiss_ids = np.arange(self._next_id, self._next_id + len(video_ids), dtype='int64')
+            self._next_id += len(video_ids)
+            self.index.add_with_ids(_as_f32(embeddings), faiss_ids)
+            
+            for video_id, faiss_id, meta in zip(video_ids, faiss_ids.tolist(), metadata):
+                self.faiss_ids[video_id] = faiss_id
+                self._id_to_video[faiss_id] = video_id
+                self._id_to_pos[video_id] = len(self.video_ids)
+                self.video_ids.append(video_id)
+                self.metadata[video_id] = meta
+            self._mark_dirty()
+            
+            self._maybe_upgrade_index()
+    
+    def _maybe_upgrade_index(self):
+        """Rebuild into the next index tier once the corpus crosses its threshold."""
+        ntotal = self.index.ntotal
+        if isinstance(self.index, faiss.IndexIDMap2) and ntotal >= IVFSQ_TRAIN_THRESHOLD:
+            build = _build_ivfsq_index
+        elif (
+            # IndexIVFFlat: middle tier written by earlier versions
+            isinstance(self.index, (faiss.IndexIVFScalarQuantizer, faiss.IndexIVFFlat))
+            and ntotal >= IVFPQ_TRAIN_THRESHOLD
+        ):
+            build = _build_ivfpq_index
+        else:
+            return
+        
+        ids = np.fromiter(self.faiss_ids.values(), dtype='int64', count=len(self.faiss_ids))
+        vectors = self.index.reconstruct_batch(ids)
+        self.index = build(vectors, ids)
+    
+    @staticmethod
+    def _video_metadata(
+        title: str,
+        description: str = "",
+        summary: str = "",
+        thumbnail_url: str = "",
+        channel_name: str = "",
+    ) -> dict:
+        return {
+            'title': title,
+            'description': description[:500] if description else "",
+            'summary': summary[:500] if summary else "",
+            'thumbnail_url': thumbnail_url,
+            'channel_name': channel_name,
+        }
     
     def add_video(
         self,
@@ -55,7 +242,11 @@ class VideoVectorStore:
         thumbnail_url: str = "",
         channel_name: str = "",
     ) -> bool:
-        """Add a video to the vector store. Returns False if already exists."""
+        """
+        Add a video to the vector store. Returns False if already exists.
+        
+        Changes are written by the background flush (or an explicit flush()).
+        """
         if video_id in self.metadata:
             return False
         
@@ -67,19 +258,64 @@ class VideoVectorStore:
         if embedding.ndim == 1:
             embedding = embedding.reshape(1, -1)
         
-        self.index.add(embedding.astype('float32'))
+        self._add_vectors(
+            [video_id],
+            embedding,
+            [self._video_metadata(title, description, summary, thumbnail_url, channel_name)],
+        )
+        return True
+    
+    def batch_add_videos(self, items: List[dict]) -> int:
+        """
+        Add many videos with one batched embedding call, one index add and one flush.
         
-        self.video_ids.append(video_id)
-        self.metadata[video_id] = {
-            'title': title,
-            'description': description[:500] if description else "",
-            'summary': summary[:500] if summary else "",
-            'thumbnail_url': thumbnail_url,
-            'channel_name': channel_name,
-        }
+        Args:
+            items: dicts with add_video's keyword arguments (video_id and title required)
         
-        self._save_index()
-        return True
+        Returns:
+            Number of videos added (ones already indexed are skipped)
+        """
+        from app.services.embeddings import create_video_text
+        
+        new_items = {}
+        for item in items:
+            if item['video_id'] not in self.metadata:
+                new_items.setdefault(item['video_id'], item)
+        if not new_items:
+            return 0
+        
+        items = list(new_items.values())
+        embeddings = [item.get('embedding') for item in items]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            texts = [
+                create_video_text(
+                    items[i]['title'],
+                    items[i].get('description', ""),
+                    items[i].get('summary', ""),
+                    items[i].get('transcript', ""),
+                )
+                for i in missing
+            ]
+            for i, embedding in zip(missing, generate_embeddings_batch(texts)):
+                embeddings[i] = embedding
+        
+        self._add_vectors(
+            [item['video_id'] for item in items],
+            np.stack([np.asarray(embedding).reshape(-1) for embedding in embeddings]),
+            [
+                self._video_metadata(
+                    item['title'],
+                    item.get('description', ""),
+                    item.get('summary', ""),
+                    item.get('thumbnail_url', ""),
+                    item.get('channel_name', ""),
+                )
+                for item in items
+            ],
+        )
+        self.flush()
+        return len(items)
     
     def search_similar(
         self,
@@ -90,7 +326,8 @@ class VideoVectorStore:
         exclude_video_ids: List[str] = None,
     ) -> List[Tuple[str, float, dict]]:
         """Find videos similar to query text, video, or embedding."""
-        if self.index.ntotal == 0:
+        ntotal = self.index.ntotal
+        if ntotal == 0:
             return []
         
         if embedding is not None:
@@ -98,27 +335,26 @@ class VideoVectorStore:
         elif query is not None:
             query_embedding = generate_embedding(query)
         elif video_id is not None:
-            if video_id not in self.video_ids:
+            if video_id not in self.faiss_ids:
                 raise ValueError(f"Video {video_id} not in index")
-            idx = self.video_ids.index(video_id)
-            query_embedding = self.index.reconstruct(idx)
+            query_embedding = self.index.reconstruct(self.faiss_ids[video_id])
         else:
             raise ValueError("Must provide query, video_id, or embedding")
         
         if query_embedding.ndim == 1:
             query_embedding = query_embedding.reshape(1, -1)
         
-        search_k = min(k + len(exclude_video_ids or []) + 1, self.index.ntotal)
-        distances, indices = self.index.search(query_embedding.astype('float32'), search_k)
+        exclude_set = set(exclude_video_ids or ())
+        search_k = min(k + len(exclude_set) + 1, ntotal)
+        distances, indices = self.index.search(_as_f32(query_embedding), search_k)
         
         results = []
-        exclude_set = set(exclude_video_ids or [])
         
         for dist, idx in zip(distances[0], indices[0]):
             if idx == -1:
                 continue
             
-            vid = self.video_ids[idx]
+            vid = self._id_to_video[int(idx)]
             if vid in exclude_set:
                 continue
             
@@ -142,28 +378,25 @@ class VideoVectorStore:
         return self.metadata.get(video_id)
     
     def remove_video(self, video_id: str) -> bool:
-        """Remove a video from the index. Rebuilds entire index."""
-        if video_id not in self.video_ids:
-            return False
-        
-        idx = self.video_ids.index(video_id)
-        self.video_ids.pop(idx)
-        del self.metadata[video_id]
-        
-        if self.video_ids:
-            all_embeddings = []
-            for i in range(self.index.ntotal):
-                if i != idx:
-                    all_embeddings.append(self.index.reconstruct(i))
+        """Remove a video from the index by its id (no rebuild)."""
+        with self._lock:
+            if video_id not in self.faiss_ids:
+                return False
             
-            self.index = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
-            if all_embeddings:
-                self.index.add(np.array(all_embeddings).astype('float32'))
-        else:
-            self.index = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
-        
-        self._save_index()
-        return True
+            faiss_id = self.faiss_ids.pop(video_id)
+            del self._id_to_video[faiss_id]
+            # O(1) removal: move the last video into the freed slot
+            pos = self._id_to_pos.pop(video_id)
+            last = self.video_ids.pop()
+            if last != video_id:
+                self.video_ids[pos] = last
+                self._id_to_pos[last] = pos
+            del self.metadata[video_id]
+            
+            self.index.remove_ids(faiss.IDSelectorArray(np.array([faiss_id], dtype='int64')))
+            
+            self._mark_dirty()
+            return True
 
 
 _vector_store: Optional[VideoVectorStore] = None
@@ -175,3 +408,9 @@ def get_vector_store() -> VideoVectorStore:
     if _vector_store is None:
         _vector_store = VideoVectorStore()
     return _vector_store
+
+
+def flush_vector_store():
+    """Persist pending changes if the store was used in this process."""
+    if _vector_store is not None:
+        _vector_store.flush()
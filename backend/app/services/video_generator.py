@@ -2,9 +2,20 @@
 
 from pathlib import Path
 from typing import List, Optional, Dict
+import asyncio
+import hashlib
+import os
 import uuid
 import re
+import shutil
 import subprocess
+import tempfile
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+
+import numpy as np
 
 from app.config import settings
 
@@ -18,52 +29,241 @@ AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 BGM_DIR = settings.OUTPUT_DIR / "bgm"
 BGM_DIR.mkdir(parents=True, exist_ok=True)
 
+# Rasterized TextClip renders and text slide frames, keyed by a hash of
+# their arguments; least recently used files are pruned beyond the cap
+TEXT_CACHE_DIR = settings.OUTPUT_DIR / "textcache"
+TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+TEXT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+TEXT_CACHE_PRUNE_EVERY = 50  # New files between size checks
+
+# Encoded subscribe segments reused across videos; the key has no per-video
+# text, so there is one file per size/fps/encoder and no pruning is needed
+SEGMENT_CACHE_DIR = VIDEO_DIR / "_cache"
+SEGMENT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
 # Check if moviepy is available
 try:
     from moviepy import (
         ImageClip, TextClip, AudioFileClip, CompositeVideoClip,
-        concatenate_videoclips, ColorClip, CompositeAudioClip,
-        VideoFileClip, vfx, concatenate_audioclips
+        concatenate_videoclips, CompositeAudioClip,
+        VideoFileClip, vfx
     )
+    from moviepy.audio.AudioClip import AudioArrayClip
+    from PIL import Image
     MOVIEPY_AVAILABLE = True
 except ImportError:
     try:
         from moviepy.editor import (
             ImageClip, TextClip, AudioFileClip, CompositeVideoClip,
-            concatenate_videoclips, ColorClip, CompositeAudioClip,
-            VideoFileClip, vfx, concatenate_audioclips
+            concatenate_videoclips, CompositeAudioClip,
+            VideoFileClip, vfx
         )
+        from moviepy.audio.AudioClip import AudioArrayClip
+        from PIL import Image
         MOVIEPY_AVAILABLE = True
     except ImportError:
         MOVIEPY_AVAILABLE = False
 
 
-def check_moviepy() -> dict:
-    """Check if MoviePy and required dependencies are available."""
+# Hardware H.264 encoders in order of preference, with their rate control.
+# NVENC/QSV run motion estimation and DCT on fixed-function blocks and are
+# several times faster than libx264 at a similar bitrate.
+HW_ENCODERS = {
+    "h264_nvenc": ["-preset", "p4", "-tune", "hq", "-rc:v", "vbr", "-cq:v", "23"],
+    "h264_qsv": ["-preset", "veryfast"],
+    "h264_videotoolbox": ["-allow_sw", "0"],
+}
+SOFTWARE_ENCODER = "libx264"
+VIDEO_BITRATE = "5000k"
+
+_hw_encoder: Optional[str] = None
+_hw_encoder_probed = False
+
+
+def get_hw_encoder() -> Optional[str]:
+    """
+    Return the first hardware H.264 encoder that actually works here, or None.
+    
+    Probed once per process: an encoder can be listed by `ffmpeg -encoders`
+    without a usable GPU, so each candidate does a tiny test encode.
+    """
+    global _hw_encoder, _hw_encoder_probed
+    
+    if not _hw_encoder_probed:
+        _hw_encoder_probed = True
+        try:
+            listed = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-encoders'],
+                capture_output=True, text=True, timeout=5
+            ).stdout
+            for encoder in HW_ENCODERS:
+                if encoder not in listed:
+                    continue
+                result = subprocess.run(
+                    ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+                     '-f', 'lavfi', '-i', 'color=s=256x256:d=0.1',
+                     '-c:v', encoder, '-f', 'null', '-'],
+                    capture_output=True, timeout=15
+                )
+                if result.returncode == 0:
+                    _hw_encoder = encoder
+                    print(f"Using hardware video encoder: {encoder}")
+                    break
+        except Exception as e:
+            print(f"Hardware encoder probe failed: {e}")
+    
+    return _hw_encoder
+
+
+def _video_codec_args() -> List[str]:
+    """ffmpeg output options for H.264 video, preferring a hardware encoder."""
+    encoder = get_hw_encoder()
+    if encoder:
+        return ["-c:v", encoder, *HW_ENCODERS[encoder], "-b:v", VIDEO_BITRATE]
+    return _software_codec_args()
+
+
+def _software_codec_args() -> List[str]:
+    # -threads 0 lets libx264 use every core
+    return ["-c:v", SOFTWARE_ENCODER, "-preset", "veryfast", "-threads", "0", "-b:v", VIDEO_BITRATE]
+
+
+def _runs(program: str) -> bool:
+    """True if `program -version` exits cleanly; PATH lookup first so a missing tool costs no fork."""
+    executable = shutil.which(program)
+    if not executable:
+        return False
+    try:
+        result = subprocess.run([executable, '-version'], capture_output=True, timeout=5)
+        return result.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def _probe_dependencies() -> tuple:
+    """
+    Probe ffmpeg once per process; (key, value) pairs so it can be cached.
+    
+    ImageMagick is not probed: MoviePy 2's TextClip rasterizes with Pillow
+    in-process, so nothing here runs it.
+    """
     status = {
         "moviepy_available": MOVIEPY_AVAILABLE,
         "ffmpeg_available": False,
-        "imagemagick_available": False,
     }
     
-    if MOVIEPY_AVAILABLE:
-        try:
-            result = subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=5)
-            status["ffmpeg_available"] = result.returncode == 0
-        except:
-            pass
+    status["ffmpeg_available"] = _runs('ffmpeg')
+    if status["ffmpeg_available"]:
+        status["hw_encoder"] = get_hw_encoder()
+    
+    return tuple(status.items())
+
+
+def check_moviepy() -> dict:
+    """
+    Check if MoviePy and required dependencies are available.
+    
+    The subprocess probes run once per process, since status endpoints
+    call this on every request; restart the server after installing tools.
+    """
+    return dict(_probe_dependencies())
+
+
+# ============== Text Rendering ==============
+
+def _render_text_png(
+    text: str,
+    font_size: int,
+    color: str,
+    font: str,
+    stroke_color: Optional[str] = None,
+    stroke_width: int = 0,
+    width: Optional[int] = None,
+) -> str:
+    """
+    Rasterize text once with TextClip and keep it as an RGBA PNG.
+    
+    TextClip lays out and draws the text with Pillow on every call; the PNG is
+    keyed by a hash of the arguments, so repeated templates and captions
+    (also across restarts) are just loaded from disk.
+    """
+    path = _text_cache_path(text, font_size, color, font, stroke_color, stroke_width, width)
+    
+    if not _touch_cached(path):
+        kwargs = dict(text=text, font_size=font_size, color=color, font=font)
+        if stroke_color:
+            kwargs.update(stroke_color=stroke_color, stroke_width=stroke_width)
+        if width:
+            kwargs.update(size=(width, None), method='caption', text_align='center')
         
-        try:
-            result = subprocess.run(['magick', '-version'], capture_output=True, timeout=5)
-            status["imagemagick_available"] = result.returncode == 0
-        except:
+        clip = TextClip(**kwargs)
+        rgb = clip.get_frame(0).astype(np.uint8)
+        if clip.mask is not None:
+            alpha = (clip.mask.get_frame(0) * 255).astype(np.uint8)
+        else:
+            alpha = np.full(rgb.shape[:2], 255, dtype=np.uint8)
+        clip.close()
+        
+        _save_cached(Image.fromarray(np.dstack([rgb, alpha]), "RGBA"), path)
+    
+    return str(path)
+
+
+def _text_cache_path(*args) -> Path:
+    return TEXT_CACHE_DIR / f"{hashlib.sha1(repr(args).encode()).hexdigest()}.png"
+
+
+def _touch_cached(path: Path) -> bool:
+    """True if path is cached; marks it recently used (mtime, since atime is often off)."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+_text_cache_writes = 0
+
+
+def _save_cached(image: 'Image.Image', path: Path):
+    """Write a cache entry atomically (workers share the directory), pruning now and then."""
+    global _text_cache_writes
+    
+    tmp_path = path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+    
+    _text_cache_writes += 1
+    if _text_cache_writes % TEXT_CACHE_PRUNE_EVERY == 0:
+        _prune_text_cache()
+
+
+def _prune_text_cache():
+    """Delete least recently used cache files until the total fits TEXT_CACHE_MAX_BYTES."""
+    entries = []
+    with os.scandir(TEXT_CACHE_DIR) as it:
+        for entry in it:
             try:
-                result = subprocess.run(['convert', '-version'], capture_output=True, timeout=5)
-                status["imagemagick_available"] = result.returncode == 0
-            except:
-                pass
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
     
-    return status
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= TEXT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _text_clip(duration: float, **kwargs) -> 'ImageClip':
+    """ImageClip over the cached rendering of a TextClip with these arguments."""
+    return ImageClip(_render_text_png(**kwargs), transparent=True).with_duration(duration)
 
 
 # ============== Animation Functions ==============
@@ -90,43 +290,6 @@ def apply_fade_out(clip, duration: float = 0.5):
 
 # ============== Caption Generation ==============
 
-def create_caption_clip(
-    text: str,
-    duration: float,
-    size: tuple = (1920, 1080),
-    font_size: int = 48,
-    position: str = "bottom"
-) -> Optional['TextClip']:
-    """Create a caption text overlay."""
-    if not MOVIEPY_AVAILABLE:
-        return None
-    
-    try:
-        txt = TextClip(
-            text=text,
-            font_size=font_size,
-            color='white',
-            font='Arial-Bold',
-            stroke_color='black',
-            stroke_width=2,
-            size=(size[0] - 200, None),
-            method='caption',
-            text_align='center'
-        ).with_duration(duration)
-        
-        if position == "bottom":
-            txt = txt.with_position(('center', size[1] - 150))
-        elif position == "top":
-            txt = txt.with_position(('center', 50))
-        else:
-            txt = txt.with_position('center')
-        
-        return txt
-    except Exception as e:
-        print(f"Error creating caption: {e}")
-        return None
-
-
 def generate_captions_from_text(
     text: str,
     total_duration: float,
@@ -134,35 +297,53 @@ def generate_captions_from_text(
 ) -> List[dict]:
     """Generate timed captions from text."""
     words = text.split()
-    captions = []
-    
     total_words = len(words)
     time_per_word = total_duration / total_words if total_words > 0 else 0.5
     
-    current_time = 0
-    for i in range(0, len(words), words_per_caption):
-        chunk = words[i:i + words_per_caption]
-        caption_text = " ".join(chunk)
-        caption_duration = len(chunk) * time_per_word
-        
-        captions.append({
-            "text": caption_text,
-            "start": current_time,
-            "duration": caption_duration
-        })
-        current_time += caption_duration
+    # Chunk lengths -> durations -> start times as whole-array operations
+    chunk_starts = np.arange(0, total_words, words_per_caption)
+    durations = np.minimum(words_per_caption, total_words - chunk_starts) * time_per_word
+    starts = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
     
-    return captions
+    return [
+        {
+            "text": " ".join(words[i:i + words_per_caption]),
+            "start": start,
+            "duration": duration,
+        }
+        for i, start, duration in zip(chunk_starts.tolist(), starts.tolist(), durations.tolist())
+    ]
 
 
 # ============== Background Music ==============
 
+BGM_FPS = 44100
+
+_bgm_path: Optional[str] = None
+
+
 def get_default_bgm_path() -> Optional[str]:
-    """Get path to default background music file."""
-    bgm_files = list(BGM_DIR.glob("*.mp3")) + list(BGM_DIR.glob("*.wav"))
-    if bgm_files:
-        return str(bgm_files[0])
-    return None
+    """Get path to default background music file (cached once one is found)."""
+    global _bgm_path
+    
+    if _bgm_path is None or not Path(_bgm_path).exists():
+        bgm_files = list(BGM_DIR.glob("*.mp3")) + list(BGM_DIR.glob("*.wav"))
+        _bgm_path = str(bgm_files[0]) if bgm_files else None
+    
+    return _bgm_path
+
+
+@lru_cache(maxsize=2)
+def _load_bgm_samples(bgm_path: str, mtime: float) -> np.ndarray:
+    """Decode a BGM file once into a float32 (samples, channels) array."""
+    bgm = AudioFileClip(bgm_path)
+    try:
+        samples = bgm.to_soundarray(fps=BGM_FPS)
+    finally:
+        bgm.close()
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    return samples.astype(np.float32)
 
 
 def add_background_music(video_clip, bgm_path: str, volume: float = 0.15):
@@ -171,18 +352,13 @@ def add_background_music(video_clip, bgm_path: str, volume: float = 0.15):
         return video_clip
     
     try:
-        bgm = AudioFileClip(bgm_path)
-        
-        # Loop BGM if shorter than video
-        if bgm.duration < video_clip.duration:
-            loops_needed = int(video_clip.duration / bgm.duration) + 1
-            bgm = concatenate_audioclips([bgm] * loops_needed)
+        samples = _load_bgm_samples(bgm_path, Path(bgm_path).stat().st_mtime)
         
-        # Trim to video length
-        bgm = bgm.subclipped(0, video_clip.duration)
-        
-        # Lower BGM volume
-        bgm = bgm.with_volume_scaled(volume)
+        # Loop/trim the decoded samples to the video length and lower the
+        # volume - array copies instead of re-decoding and concatenating clips
+        target = int(round(video_clip.duration * BGM_FPS))
+        looped = np.resize(samples, (target, samples.shape[1])) * volume
+        bgm = AudioArrayClip(looped, fps=BGM_FPS)
         
         # Mix with existing audio
         if video_clip.audio:
@@ -198,6 +374,72 @@ def add_background_music(video_clip, bgm_path: str, volume: float = 0.15):
 
 # ============== Main Video Generation ==============
 
+# MoviePy composites every frame in NumPy, so clips are composed at 720p
+# (2.25x fewer pixels than 1080p) and upscaled once by ffmpeg at encode time
+COMPOSE_HEIGHT = 720
+
+
+def _px(value: int, size: tuple) -> int:
+    """Scale a pixel measurement designed for 1080p to the given frame size."""
+    return max(1, round(value * size[1] / 1080))
+
+
+def _solid_bg(size: tuple, color: tuple, duration: float) -> 'ImageClip':
+    """
+    Solid background as an ImageClip over one preallocated frame.
+    
+    ColorClip builds a fresh full-size array on every get_frame(t); the
+    ImageClip hands back the same array for every t.
+    """
+    frame = np.full((size[1], size[0], 3), color, dtype=np.uint8)
+    return ImageClip(frame, duration=duration)
+
+
+@lru_cache(maxsize=256)
+def _render_text_slide(
+    text: str,
+    size: tuple,
+    font_size: int,
+    bg_color: tuple,
+    text_color: str,
+) -> np.ndarray:
+    """
+    A text slide's frame: the cached text rendering composited onto the
+    background once with Pillow, instead of a CompositeVideoClip blending
+    the two layers again for every frame. The frame is kept in the text
+    cache too, so other workers and restarts load it instead of composing.
+    """
+    path = _text_cache_path("slide", text, size, font_size, bg_color, text_color)
+    if _touch_cached(path):
+        with Image.open(path) as cached:
+            array = np.asarray(cached.convert("RGB"))
+        array.setflags(write=False)
+        return array
+    
+    text_png = _render_text_png(
+        text=text,
+        font_size=_px(font_size, size),
+        color=text_color,
+        font='Arial-Bold',
+        width=size[0] - _px(100, size),
+    )
+    frame = Image.new("RGBA", size, (*bg_color, 255))
+    with Image.open(text_png) as txt:
+        txt = txt.convert("RGBA")
+        frame.paste(txt, ((size[0] - txt.width) // 2, (size[1] - txt.height) // 2), txt)
+    frame = frame.convert("RGB")
+    # Antialiased text of one color on a solid background has at most 256
+    # distinct colors, so a palette PNG stores it losslessly in ~half the bytes
+    if frame.getcolors(256) is not None:
+        _save_cached(frame.quantize(colors=256, method=Image.Quantize.MEDIANCUT), path)
+    else:
+        _save_cached(frame, path)
+    
+    array = np.asarray(frame)
+    array.setflags(write=False)  # Shared by every clip made from the cache
+    return array
+
+
 def create_animated_text_clip(
     text: str,
     duration: float = 5.0,
@@ -212,26 +454,17 @@ def create_animated_text_clip(
         return None
     
     try:
-        # Background
-        bg = ColorClip(size=size, color=bg_color, duration=duration)
-        
-        # Text overlay
-        txt = TextClip(
-            text=text,
-            font_size=font_size,
-            color=text_color,
-            font='Arial-Bold',
-            size=(size[0] - 100, None),
-            method='caption',
-            text_align='center'
-        ).with_position('center').with_duration(duration)
+        frame = _render_text_slide(text, tuple(size), font_size, tuple(bg_color), text_color)
+        clip = ImageClip(frame, duration=duration)
         
-        # Apply animations
+        # Apply animations: fading the finished frame from/to the background
+        # color gives the same pixels as fading the text over the background
         if animation == "fade":
-            txt = apply_fade_in(txt, 0.5)
-            txt = apply_fade_out(txt, 0.5)
+            clip = clip.with_effects([
+                vfx.FadeIn(0.5, initial_color=list(bg_color)),
+                vfx.FadeOut(0.5, final_color=list(bg_color)),
+            ])
         
-        clip = CompositeVideoClip([bg, txt])
         return clip
     except Exception as e:
         print(f"Error creating animated text clip: {e}")
@@ -248,33 +481,36 @@ def create_subscribe_clip(
     
     try:
         # Dark background
-        bg = ColorClip(size=size, color=(20, 20, 40), duration=duration)
+        bg = _solid_bg(size, (20, 20, 40), duration)
         
         # Main subscribe text
-        subscribe_text = TextClip(
+        subscribe_text = _text_clip(
+            duration,
             text="Like & Subscribe!",
-            font_size=80,
+            font_size=_px(80, size),
             color='#FF0000',
             font='Arial-Bold',
             stroke_color='white',
-            stroke_width=3
-        ).with_position(('center', size[1]//2 - 80)).with_duration(duration)
+            stroke_width=_px(3, size)
+        ).with_position(('center', size[1]//2 - _px(80, size)))
         
         # Bell notification text
-        bell_text = TextClip(
+        bell_text = _text_clip(
+            duration,
             text="Turn on notifications to never miss an update!",
-            font_size=40,
+            font_size=_px(40, size),
             color='white',
             font='Arial'
-        ).with_position(('center', size[1]//2 + 30)).with_duration(duration)
+        ).with_position(('center', size[1]//2 + _px(30, size)))
         
         # Thank you text
-        thanks_text = TextClip(
+        thanks_text = _text_clip(
+            duration,
             text="Thank you for watching!",
-            font_size=50,
+            font_size=_px(50, size),
             color='#00BFFF',
             font='Arial-Bold'
-        ).with_position(('center', size[1]//2 + 120)).with_duration(duration)
+        ).with_position(('center', size[1]//2 + _px(120, size)))
         
         # Apply animations
         subscribe_text = apply_fade_in(subscribe_text, 0.8)
@@ -290,49 +526,444 @@ def create_subscribe_clip(
         return None
 
 
-def create_intro_clip(
-    title: str,
-    duration: float = 6.0,
-    size: tuple = (1920, 1080)
-) -> Optional['CompositeVideoClip']:
-    """Create an animated intro clip with title."""
-    if not MOVIEPY_AVAILABLE:
-        return None
+# ============== Script Parsing ==============
+
+# "# Title" / "## Title", or a whole line in **bold**
+_HEADING_RE = re.compile(r"(##? )|\*\*.*\*\*$|\*\*\*?$")
+# Markdown markers and [stage directions] aren't read aloud
+_NARRATION_STRIP = str.maketrans('', '', '#*_')
+_BRACKET_RE = re.compile(r'\[.*?\]')
+
+
+# ============== FFmpeg Rendering ==============
+
+DRAWTEXT_FONT = "Arial"
+# drawtext doesn't wrap, so lines are wrapped up front assuming an average
+# glyph is about half the font size wide
+CHAR_WIDTH_RATIO = 0.5
+LINE_SPACING = 1.2
+
+SECTION_COLORS = [
+    (25, 35, 55),   # Dark blue
+    (35, 25, 45),   # Dark purple
+    (25, 45, 35),   # Dark green
+    (45, 35, 25),   # Dark orange/brown
+    (35, 35, 55),   # Blue-purple
+]
+
+# Segments are encoded by separate ffmpeg processes; beyond a few at once
+# they only contend for the same cores
+MAX_PARALLEL_SEGMENTS = 4
+# Hardware encoders cap concurrent sessions (low on consumer NVENC drivers),
+# and the probe only proved that one session works
+MAX_PARALLEL_HW_SEGMENTS = 2
+SEGMENT_LIST = "segments.txt"  # concat demuxer input, in the work directory
+
+
+def _ffmpeg_color(color) -> str:
+    """(r, g, b) tuple or '#RRGGBB' / color name -> ffmpeg color string."""
+    if isinstance(color, tuple):
+        return "0x{:02X}{:02X}{:02X}".format(*color)
+    return color.replace("#", "0x")
+
+
+def _wrap_lines(text: str, font_size: int, max_width: int) -> List[str]:
+    width = max(10, int(max_width / (font_size * CHAR_WIDTH_RATIO)))
+    return textwrap.wrap(text, width=width) or [""]
+
+
+class _FilterGraph:
+    """
+    Builds the ffmpeg filtergraphs for a video's segments.
     
-    try:
-        # Dark background
-        bg = ColorClip(size=size, color=(10, 15, 30), duration=duration)
+    Each segment is a color source with drawtext overlays. Captions are
+    timed against the whole video and drawn onto every segment they
+    overlap, so segments render independently and concatenate by stream copy.
+    """
+    
+    def __init__(self, workdir: Path, size: tuple, fps: int):
+        self.workdir = workdir
+        self.size = size
+        self.fps = fps
+        self.duration = 0.0
+        self.segments: List[dict] = []  # {"start", "duration", "filters"}
+        self._text_count = 0
+    
+    def _textfile(self, text: str) -> str:
+        # Text is read from files named relative to ffmpeg's working
+        # directory, so neither the text nor the path needs escaping
+        name = f"t{self._text_count}.txt"
+        self._text_count += 1
+        (self.workdir / name).write_text(text, encoding="utf-8")
+        return name
+    
+    def drawtext(
+        self,
+        text: str,
+        font_size: int,
+        color,
+        top: Optional[int] = None,
+        max_width: Optional[int] = None,
+        border: Optional[tuple] = None,
+        start: float = 0.0,
+        end: Optional[float] = None,
+        fade_in: float = 0.0,
+        fade_out: float = 0.0,
+    ) -> List[str]:
+        """
+        drawtext filters for `text`, one per wrapped line, centered horizontally.
         
-        # Title text
-        title_clip = TextClip(
-            text=title,
-            font_size=70,
-            color='white',
-            font='Arial-Bold',
-            size=(size[0] - 200, None),
-            method='caption',
-            text_align='center'
-        ).with_position('center').with_duration(duration)
-        
-        title_clip = apply_fade_in(title_clip, 1.0)
-        
-        # Subtitle
-        subtitle = TextClip(
-            text="Let's Learn Together!",
-            font_size=35,
-            color='#00D4FF',
-            font='Arial'
-        ).with_position(('center', size[1]//2 + 100)).with_duration(duration - 1).with_start(1.0)
+        top is the y of the first line (None centers the block vertically);
+        the text is shown from `start` to `end` with optional alpha fades.
+        """
+        lines = _wrap_lines(text, font_size, max_width) if max_width else [text]
+        line_height = int(font_size * LINE_SPACING)
+        if top is None:
+            top = (self.size[1] - line_height * len(lines)) // 2
+        
+        options = [
+            f"font={DRAWTEXT_FONT}",
+            "expansion=none",
+            f"fontsize={font_size}",
+            f"fontcolor={_ffmpeg_color(color)}",
+            "x=(w-tw)/2",
+        ]
+        if border:
+            options += [f"borderw={border[0]}", f"bordercolor={_ffmpeg_color(border[1])}"]
         
-        subtitle = apply_fade_in(subtitle, 0.5)
+        fades = []
+        if fade_in:
+            fades.append(f"(t-{start:.3f})/{fade_in}")
+        if fade_out and end is not None:
+            fades.append(f"({end:.3f}-t)/{fade_out}")
+        if fades:
+            alpha = fades[0] if len(fades) == 1 else f"min({fades[0]},{fades[1]})"
+            options.append(f"alpha='clip({alpha},0,1)'")
         
-        clip = CompositeVideoClip([bg, title_clip, subtitle])
-        clip = apply_fade_out(clip, 0.5)
+        if end is not None:
+            options.append(f"enable='between(t,{start:.3f},{end:.3f})'")
+        elif start:
+            options.append(f"enable='gte(t,{start:.3f})'")
         
-        return clip
-    except Exception as e:
-        print(f"Error creating intro clip: {e}")
+        return [
+            "drawtext=" + ":".join(
+                options + [f"textfile={self._textfile(line)}", f"y={top + j * line_height}"]
+            )
+            for j, line in enumerate(lines)
+        ]
+    
+    def add_segment(
+        self,
+        duration: float,
+        bg_color: tuple,
+        overlays: List[str],
+        fade_in: float = 0.0,
+        fade_out: float = 0.0,
+        cache_key: Optional[tuple] = None,
+    ):
+        """
+        Append a solid-color segment with the given drawtext overlays.
+        
+        cache_key identifies the segment's content for reuse across videos
+        (it must cover everything the overlays depend on besides size/fps).
+        """
+        filters = [
+            f"color=c={_ffmpeg_color(bg_color)}:s={self.size[0]}x{self.size[1]}:d={duration}:r={self.fps}",
+            *overlays,
+        ]
+        self._append(duration, filters, fade_in, fade_out, cache_key)
+    
+    def add_image_segment(
+        self,
+        image_path: str,
+        duration: float,
+        fade_in: float = 0.0,
+        fade_out: float = 0.0,
+    ):
+        """Append a still image, stretched to the frame, as a segment."""
+        inputs = ["-loop", "1", "-framerate", str(self.fps), "-i", str(Path(image_path).resolve())]
+        filters = [f"[0:v]scale={self.size[0]}:{self.size[1]}", "setsar=1"]
+        self._append(duration, filters, fade_in, fade_out, None, inputs)
+    
+    def _append(self, duration, filters, fade_in, fade_out, cache_key, inputs=()):
+        if fade_in:
+            filters.append(f"fade=t=in:st=0:d={fade_in}")
+        if fade_out:
+            filters.append(f"fade=t=out:st={duration - fade_out}:d={fade_out}")
+        
+        self.segments.append({
+            "start": self.duration,
+            "duration": duration,
+            "filters": filters,
+            "cache_key": cache_key,
+            "inputs": list(inputs),
+        })
+        self.duration += duration
+    
+    def add_captions(self, captions: List[dict], **style):
+        """Draw timed captions (video-relative) onto the segments they overlap."""
+        for cap in captions:
+            cap_start = cap["start"]
+            cap_end = cap["start"] + cap["duration"]
+            for segment in self.segments:
+                seg_start = segment["start"]
+                seg_end = seg_start + segment["duration"]
+                if cap_end <= seg_start or cap_start >= seg_end:
+                    continue
+                segment["cache_key"] = None  # Captions make it video-specific
+                segment["filters"] += self.drawtext(
+                    cap["text"],
+                    start=max(cap_start, seg_start) - seg_start,
+                    end=min(cap_end, seg_end) - seg_start,
+                    **style
+                )
+    
+    def write_scripts(self) -> List[str]:
+        """Write one filtergraph script per segment and return their names."""
+        names = []
+        for i, segment in enumerate(self.segments):
+            name = f"segment{i}.txt"
+            script = ",".join(segment["filters"]) + ",format=yuv420p[v]"
+            (self.workdir / name).write_text(script, encoding="utf-8")
+            names.append(name)
+        return names
+
+
+def _render_segment(
+    workdir: str,
+    script_name: str,
+    duration: float,
+    output_name: str,
+    codec_args: List[str],
+    inputs: List[str] = (),
+) -> subprocess.CompletedProcess:
+    """Encode one segment's filtergraph to an MP4 in workdir."""
+    return subprocess.run(
+        [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            *inputs,
+            "-filter_complex_script", script_name,
+            "-map", "[v]",
+            *codec_args,
+            "-t", f"{duration:.3f}",
+            output_name,
+        ],
+        cwd=workdir, capture_output=True, text=True,
+    )
+
+
+def _segment_cache_path(graph: _FilterGraph, segment: dict, codec_args: List[str]) -> Optional[Path]:
+    """Where a reusable segment's encode is kept, or None if it isn't reusable."""
+    if segment["cache_key"] is None:
         return None
+    key = (segment["cache_key"], graph.size, graph.fps, segment["duration"], DRAWTEXT_FONT, codec_args)
+    return SEGMENT_CACHE_DIR / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.mp4"
+
+
+def _render_segments(graph: _FilterGraph, codec_args: Optional[List[str]] = None) -> List[str]:
+    """
+    Render every segment concurrently and return the MP4 names in order.
+    
+    The encoding happens in the ffmpeg child processes, so a thread per
+    segment is enough to keep them all running. All segments share the same
+    encoder settings, so they can be joined without re-encoding - which
+    also lets a cached subscribe encode be dropped in as it is. If a
+    hardware encoder fails, the whole set is re-rendered with libx264 so
+    the segments still match.
+    """
+    scripts = graph.write_scripts()
+    outputs = [f"segment{i}.mp4" for i in range(len(scripts))]
+    codec_args = codec_args or _video_codec_args()
+    cache_paths = [_segment_cache_path(graph, s, codec_args) for s in graph.segments]
+    
+    pending = []
+    for i, cache_path in enumerate(cache_paths):
+        if cache_path is not None and cache_path.exists():
+            shutil.copyfile(cache_path, graph.workdir / outputs[i])
+        else:
+            pending.append(i)
+    
+    if pending:
+        hardware = codec_args[1] != SOFTWARE_ENCODER
+        workers = min(
+            len(pending), os.cpu_count() or 2,
+            MAX_PARALLEL_HW_SEGMENTS if hardware else MAX_PARALLEL_SEGMENTS,
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda i: _render_segment(
+                    str(graph.workdir), scripts[i], graph.segments[i]["duration"],
+                    outputs[i], codec_args, graph.segments[i]["inputs"],
+                ),
+                pending,
+            ))
+        
+        failed = [r for r in results if r.returncode != 0]
+        if failed and hardware:
+            print(f"Hardware encode failed, re-rendering with {SOFTWARE_ENCODER}: "
+                  f"{failed[0].stderr.strip()[-500:]}")
+            return _render_segments(graph, _software_codec_args())
+        
+        for i, result in zip(pending, results):
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+            if cache_paths[i] is not None:
+                # Copy then rename so a concurrent request never sees a partial file
+                tmp_path = cache_paths[i].with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+                shutil.copyfile(graph.workdir / outputs[i], tmp_path)
+                os.replace(tmp_path, cache_paths[i])
+    
+    return outputs
+
+
+def _add_intro_segment(graph: _FilterGraph, title: str, duration: float = 6.0):
+    width, height = graph.size
+    overlays = graph.drawtext(title, 70, "white", max_width=width - 200)
+    overlays += graph.drawtext(
+        "Let's Learn Together!", 35, "#00D4FF",
+        top=height // 2 + 100, start=1.0, fade_in=0.5,
+    )
+    graph.add_segment(duration, (10, 15, 30), overlays, fade_in=1.0, fade_out=0.5)
+
+
+def _add_section_segment(
+    graph: _FilterGraph,
+    title: str,
+    content: str,
+    bg_color: tuple,
+    title_duration: float = 4.0,
+    content_duration: float = 8.0,
+):
+    """
+    A section's title card followed by its content, as one segment.
+    
+    Both share the background, so drawing each over its own time window
+    gives the same frames as two separate slides with one encode and no cut.
+    """
+    max_width = graph.size[0] - 100
+    overlays = graph.drawtext(
+        title, 70, "white",
+        max_width=max_width, end=title_duration, fade_in=0.5, fade_out=0.5,
+    )
+    duration = title_duration
+    if content:
+        duration += content_duration
+        overlays += graph.drawtext(
+            content, 45, "white",
+            max_width=max_width, start=title_duration, end=duration, fade_in=0.5, fade_out=0.5,
+        )
+    graph.add_segment(duration, bg_color, overlays)
+
+
+def _add_subscribe_segment(graph: _FilterGraph, duration: float = 6.0):
+    height = graph.size[1]
+    overlays = graph.drawtext(
+        "Like & Subscribe!", 80, "#FF0000",
+        top=height // 2 - 80, border=(3, "white"), fade_in=0.8,
+    )
+    overlays += graph.drawtext(
+        "Turn on notifications to never miss an update!", 40, "white",
+        top=height // 2 + 30, fade_in=0.5,
+    )
+    overlays += graph.drawtext(
+        "Thank you for watching!", 50, "#00BFFF",
+        top=height // 2 + 120, fade_in=0.5,
+    )
+    graph.add_segment(duration, (20, 20, 40), overlays, fade_out=1.0, cache_key=("subscribe",))
+
+
+def _render_video_segments(
+    workdir: Path,
+    title: str,
+    sections: List[dict],
+    caption_text: str,
+    size: tuple,
+    fps: int,
+) -> _FilterGraph:
+    """
+    Build every segment's filtergraph, render them, and write the concat
+    list (SEGMENT_LIST) in workdir. Blocking; run it in a worker thread.
+    """
+    graph = _FilterGraph(workdir, size, fps)
+    
+    # 1. Intro segment
+    _add_intro_segment(graph, title)
+    
+    # 2. Content section segments (title card, then content)
+    for i, section in enumerate(sections):
+        section_title = section.get("title", f"Section {i+1}")
+        section_content = section.get("content", "")
+        color = SECTION_COLORS[i % len(SECTION_COLORS)]
+        
+        display_content = section_content[:300]
+        if len(section_content) > 300:
+            display_content += "..."
+        _add_section_segment(graph, section_title, display_content, color)
+    
+    # 3. Subscribe ending
+    _add_subscribe_segment(graph)
+    
+    # 4. Captions, timed against the whole video
+    if caption_text:
+        graph.add_captions(
+            generate_captions_from_text(caption_text, graph.duration),
+            font_size=48,
+            color="white",
+            top=size[1] - 150,
+            max_width=size[0] - 200,
+            border=(2, "black"),
+        )
+    
+    # 5. Render all segments in parallel
+    _write_segment_list(workdir, _render_segments(graph))
+    return graph
+
+
+def _write_segment_list(workdir: Path, segment_files: List[str]):
+    (workdir / SEGMENT_LIST).write_text(
+        "".join(f"file '{name}'\n" for name in segment_files), encoding="utf-8"
+    )
+
+
+def _mux_command(
+    duration: float,
+    audio_path: Optional[str],
+    bgm_path: Optional[str],
+    filepath: Path,
+) -> List[str]:
+    """
+    ffmpeg command (run in the work directory) that joins SEGMENT_LIST by
+    stream copy and mixes in the narration and looped background music.
+    """
+    inputs = ["-f", "concat", "-safe", "0", "-i", SEGMENT_LIST]
+    audio_filters = []
+    audio_map = None
+    if audio_path:
+        inputs += ["-i", str(Path(audio_path).resolve())]
+        audio_map = "1:a"
+    
+    if bgm_path:
+        inputs += ["-stream_loop", "-1", "-i", str(Path(bgm_path).resolve())]
+        audio_filters.append(f"[{2 if audio_path else 1}:a]volume=0.1[bgm]")
+        audio_map = "[bgm]"
+        if audio_path:
+            audio_filters.append(
+                "[1:a][bgm]amix=inputs=2:duration=longest:normalize=0[a]"
+            )
+            audio_map = "[a]"
+    
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", *inputs]
+    if audio_filters:
+        cmd += ["-filter_complex", ";".join(audio_filters)]
+    cmd += ["-map", "0:v", "-c:v", "copy"]
+    if audio_map:
+        cmd += ["-map", audio_map, "-c:a", "aac", "-b:a", "192k"]
+    cmd += [
+        "-t", f"{duration:.3f}",
+        "-movflags", "+faststart",
+        str(filepath),
+    ]
+    return cmd
 
 
 async def generate_complete_video(
@@ -355,173 +986,86 @@ async def generate_complete_video(
     - Captions/subtitles
     - Subscribe ending
     
+    Each segment (color source plus drawtext overlays and captions) is
+    encoded by its own ffmpeg process, in parallel; the segments are then
+    joined by the concat demuxer with stream copy while the voice and BGM
+    are mixed in. No frames pass through Python and video is encoded once.
+    
     Returns:
         dict with video path and metadata
     """
-    if not MOVIEPY_AVAILABLE:
+    if not shutil.which("ffmpeg"):
         return {
             "success": False,
-            "error": "MoviePy not installed. Install with: pip install moviepy",
+            "error": "FFmpeg not found. Install FFmpeg and add to PATH",
             "filepath": None,
         }
     
+    voice_task = None
     try:
-        clips = []
-        total_duration = 0
+        # Voice narration is a network call independent of the rendering,
+        # so it runs while the segments are being encoded
+        narration_text = voice_text or extract_narration_text(script)
+        if narration_text:
+            from app.services.voice_service import generate_speech
+            # Uncompressed PCM: the narration is decoded once and encoded
+            # to AAC once, with no MP3 generation in between
+            voice_task = asyncio.create_task(generate_speech(
+                text=narration_text[:5000],
+                voice_id=voice_id,
+                output_format="pcm_24000",
+            ))
         
         # Parse script into sections
         sections = parse_script_sections(script)
         
-        # 1. Create Intro Clip
-        intro = create_intro_clip(title, duration=6.0, size=size)
-        if intro:
-            intro = apply_fade_in(intro, 1.0)
-            clips.append(intro)
-            total_duration += 6.0
-        
-        # 2. Create Content Section Clips
-        section_colors = [
-            (25, 35, 55),   # Dark blue
-            (35, 25, 45),   # Dark purple
-            (25, 45, 35),   # Dark green
-            (45, 35, 25),   # Dark orange/brown
-            (35, 35, 55),   # Blue-purple
-        ]
-        
-        animations = ["fade", "fade", "fade", "fade", "fade"]
-        
-        for i, section in enumerate(sections):
-            section_title = section.get("title", f"Section {i+1}")
-            section_content = section.get("content", "")
-            
-            color = section_colors[i % len(section_colors)]
-            animation = animations[i % len(animations)]
-            
-            # Title slide for section
-            title_clip = create_animated_text_clip(
-                section_title,
-                duration=4.0,
-                size=size,
-                font_size=70,
-                bg_color=color,
-                animation=animation
+        # Filtergraphs, text files and segments are written in a worker
+        # thread so no file I/O blocks the event loop
+        workdir = await asyncio.to_thread(tempfile.mkdtemp, prefix="video_")
+        try:
+            # 1-5. Build and render all segments
+            graph = await asyncio.to_thread(
+                _render_video_segments,
+                Path(workdir), title, sections,
+                narration_text if include_captions else "",
+                size, fps,
             )
             
-            if title_clip:
-                clips.append(title_clip)
-                total_duration += 4.0
+            # 6. Voice narration (usually finished by now) and looped
+            # background music, cut to the video length
+            audio_path = None
+            if voice_task:
+                voice_result = await voice_task
+                if voice_result.get("success") and Path(voice_result["filepath"]).exists():
+                    audio_path = voice_result["filepath"]
             
-            # Content slide
-            if section_content:
-                display_content = section_content[:300]
-                if len(section_content) > 300:
-                    display_content += "..."
-                
-                content_clip = create_animated_text_clip(
-                    display_content,
-                    duration=8.0,
-                    size=size,
-                    font_size=45,
-                    bg_color=color,
-                    animation="fade"
-                )
-                
-                if content_clip:
-                    clips.append(content_clip)
-                    total_duration += 8.0
-        
-        # 3. Create Subscribe Ending
-        subscribe = create_subscribe_clip(duration=6.0, size=size)
-        if subscribe:
-            clips.append(subscribe)
-            total_duration += 6.0
-        
-        if not clips:
-            return {
-                "success": False,
-                "error": "No valid clips created",
-                "filepath": None,
-            }
-        
-        # 4. Concatenate all clips
-        video = concatenate_videoclips(clips, method="compose")
-        
-        # 5. Generate Voice Narration
-        audio_path = None
-        narration_text = voice_text or extract_narration_text(script)
-        
-        if narration_text:
-            from app.services.voice_service import generate_speech
-            voice_result = await generate_speech(
-                text=narration_text[:5000],
-                voice_id=voice_id
-            )
-            if voice_result.get("success"):
-                audio_path = voice_result["filepath"]
-        
-        # 6. Add Voice Audio
-        if audio_path and Path(audio_path).exists():
-            try:
-                voice_audio = AudioFileClip(audio_path)
-                if voice_audio.duration > video.duration:
-                    voice_audio = voice_audio.subclipped(0, video.duration)
-                video = video.with_audio(voice_audio)
-            except Exception as e:
-                print(f"Error adding voice: {e}")
-        
-        # 7. Add Background Music
-        if include_bgm:
-            bgm_path = get_default_bgm_path()
-            if bgm_path:
-                video = add_background_music(video, bgm_path, volume=0.1)
-        
-        # 8. Generate Captions
-        if include_captions and narration_text:
-            captions = generate_captions_from_text(narration_text, video.duration)
-            caption_clips = []
+            bgm_path = await asyncio.to_thread(get_default_bgm_path) if include_bgm else None
             
-            for cap in captions:
-                cap_clip = create_caption_clip(
-                    cap["text"],
-                    cap["duration"],
-                    size=size
-                )
-                if cap_clip:
-                    cap_clip = cap_clip.with_start(cap["start"])
-                    caption_clips.append(cap_clip)
+            # 7. Generate output filename
+            if not output_filename:
+                output_filename = f"video_{uuid.uuid4().hex[:8]}.mp4"
             
-            if caption_clips:
-                video = CompositeVideoClip([video] + caption_clips)
-        
-        # 9. Generate output filename
-        if not output_filename:
-            output_filename = f"video_{uuid.uuid4().hex[:8]}.mp4"
-        
-        filepath = VIDEO_DIR / output_filename
-        
-        # 10. Export video
-        video.write_videofile(
-            str(filepath),
-            fps=fps,
-            codec='libx264',
-            audio_codec='aac',
-            bitrate='5000k',
-            logger=None
-        )
-        
-        # Cleanup
-        video.close()
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
+            filepath = (VIDEO_DIR / output_filename).resolve()
+            
+            # 8. Join the segments (stream copy) and mux in the audio
+            cmd = _mux_command(graph.duration, audio_path, bgm_path, filepath)
+            result = await asyncio.to_thread(
+                subprocess.run, cmd, cwd=workdir, capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                return {
+                    "success": False,
+                    "error": f"ffmpeg failed: {result.stderr.strip()[-500:]}",
+                    "filepath": None,
+                }
+        finally:
+            await asyncio.to_thread(shutil.rmtree, workdir, ignore_errors=True)
         
         return {
             "success": True,
             "filename": output_filename,
             "filepath": str(filepath),
-            "duration_seconds": total_duration,
+            "duration_seconds": graph.duration,
             "resolution": f"{size[0]}x{size[1]}",
             "sections_count": len(sections),
             "has_voice": audio_path is not None,
@@ -530,6 +1074,8 @@ async def generate_complete_video(
         }
         
     except Exception as e:
+        if voice_task and not voice_task.done():
+            voice_task.cancel()
         return {
             "success": False,
             "error": f"Error generating video: {str(e)}",
@@ -540,31 +1086,22 @@ async def generate_complete_video(
 def parse_script_sections(script: str) -> List[dict]:
     """Parse a script into sections with titles and content."""
     sections = []
-    lines = script.split('\n')
-    current_section = {"title": "", "content": ""}
-    
-    for line in lines:
-        line = line.strip()
-        
-        if line.startswith('## ') or line.startswith('# '):
-            if current_section["title"] or current_section["content"]:
-                sections.append(current_section)
-            current_section = {
-                "title": line.lstrip('#').strip(),
-                "content": ""
-            }
-        elif line.startswith('**') and line.endswith('**'):
-            if current_section["content"]:
-                sections.append(current_section)
-            current_section = {
-                "title": line.strip('*').strip(),
-                "content": ""
-            }
+    title, content = "", []
+    
+    for line in map(str.strip, script.split('\n')):
+        heading = _HEADING_RE.match(line)
+        
+        if heading:
+            # A bold line only closes a section that has content
+            if content or (title and heading.group(1)):
+                sections.append({"title": title, "content": "".join(content)})
+            title = line.lstrip('#').strip() if heading.group(1) else line.strip('*').strip()
+            content = []
         elif line:
-            current_section["content"] += line + " "
+            content.append(line + " ")
     
-    if current_section["title"] or current_section["content"]:
-        sections.append(current_section)
+    if title or content:
+        sections.append({"title": title, "content": "".join(content)})
     
     if not sections:
         sections = [{"title": "Content", "content": script[:500]}]
@@ -574,26 +1111,21 @@ def parse_script_sections(script: str) -> List[dict]:
 
 def extract_narration_text(script: str) -> str:
     """Extract clean text suitable for voice narration from script."""
-    text = script.replace('#', '').replace('*', '').replace('_', '')
-    text = re.sub(r'\[.*?\]', '', text)
-    text = ' '.join(text.split())
-    return text
+    return ' '.join(_BRACKET_RE.sub('', script.translate(_NARRATION_STRIP)).split())
 
 
 def get_video_status() -> dict:
     """Get status of video generation capabilities."""
     status = check_moviepy()
     
-    is_available = status["moviepy_available"] and status["ffmpeg_available"]
+    # generate_complete_video only needs ffmpeg; MoviePy is used by the
+    # legacy slideshow path
+    is_available = status["ffmpeg_available"]
     
     if is_available:
         message = "Video generation ready"
-    elif status["moviepy_available"] and not status["ffmpeg_available"]:
-        message = "FFmpeg not found. Install FFmpeg and add to PATH"
-    elif not status["moviepy_available"]:
-        message = "MoviePy not installed. Run: pip install moviepy"
     else:
-        message = "Install moviepy and ffmpeg for video generation"
+        message = "FFmpeg not found. Install FFmpeg and add to PATH"
     
     return {
         "available": is_available,
@@ -620,9 +1152,43 @@ def generate_slideshow_video(
     output_filename: str = None,
     slide_duration: float = 5.0,
     size: tuple = (1920, 1080),
-    fps: int = 24
+    fps: int = 24,
+    hwaccel: str = "auto",
+    gpu_codec: Optional[str] = None,
+    threads: Optional[int] = None,
+    preset: str = "veryfast",
+    crf: int = 23,
 ) -> dict:
-    """Legacy function - Generate a video from slides with optional audio."""
+    """
+    Legacy function - Generate a video from slides with optional audio.
+    
+    hwaccel="auto" encodes with the probed hardware encoder when there is
+    one, "none" forces libx264; gpu_codec names a specific encoder instead.
+    threads/preset/crf tune the libx264 encode (pass preset="ultrafast"
+    for drafts).
+    
+    With ffmpeg on PATH the slides are rendered by ffmpeg directly (text
+    via drawtext, images from their files); MoviePy is only the fallback.
+    """
+    if not output_filename:
+        output_filename = f"video_{uuid.uuid4().hex[:8]}.mp4"
+    
+    encoder = gpu_codec or (get_hw_encoder() if hwaccel != "none" else None)
+    
+    if shutil.which("ffmpeg"):
+        if encoder:
+            codec_args = ["-c:v", encoder, *HW_ENCODERS.get(encoder, []), "-b:v", VIDEO_BITRATE]
+        else:
+            codec_args = [
+                "-c:v", SOFTWARE_ENCODER, "-preset", preset,
+                "-threads", str(threads or os.cpu_count() or 0),
+                "-crf", str(crf), "-tune", "stillimage",
+            ]
+        return _generate_slideshow_ffmpeg(
+            slides, audio_path, VIDEO_DIR / output_filename,
+            slide_duration, tuple(size), fps, codec_args,
+        )
+    
     if not MOVIEPY_AVAILABLE:
         return {
             "success": False,
@@ -631,96 +1197,220 @@ def generate_slideshow_video(
         }
     
     try:
-        clips = []
+        # Every clip (and the audio readers) is closed when the block exits,
+        # including when building or encoding fails part way
+        output_size = tuple(size)
+        scale_params = []
+        if output_size[1] > COMPOSE_HEIGHT:
+            # Same aspect ratio, even width for yuv420p
+            size = (round(output_size[0] * COMPOSE_HEIGHT / output_size[1] / 2) * 2, COMPOSE_HEIGHT)
+            scale_params = ['-vf', f'scale={output_size[0]}:{output_size[1]}:flags=lanczos']
         
-        for i, slide in enumerate(slides):
-            slide_type = slide.get("type", "text")
-            content = slide.get("content", "")
-            duration = slide.get("duration", slide_duration)
+        with ExitStack() as stack:
+            clips = []
+            for clip in _build_slide_clips(slides, slide_duration, size):
+                stack.callback(_close_quietly, clip)
+                clips.append(clip)
             
-            if slide_type == "text":
-                clip = create_animated_text_clip(
-                    content,
-                    duration=duration,
-                    size=size,
-                    animation="fade"
-                )
-            elif slide_type == "image":
-                clip = create_image_clip(
-                    content,
-                    duration=duration,
-                    size=size
+            if not clips:
+                return {
+                    "success": False,
+                    "error": "No valid clips created",
+                    "filepath": None,
+                }
+            
+            # Every slide is already full-frame, so the frames can simply be
+            # chained instead of composited onto a canvas one by one
+            method = "chain" if all(tuple(getattr(c, 'size', size)) == tuple(size) for c in clips) else "compose"
+            video = concatenate_videoclips(clips, method=method)
+            stack.callback(_close_quietly, video)
+            
+            # Add audio
+            if audio_path and Path(audio_path).exists():
+                try:
+                    audio_duration = _audio_duration(audio_path)
+                    if audio_duration is None:
+                        raise ValueError(f"unreadable audio file {audio_path}")
+                    audio = AudioFileClip(audio_path)
+                    stack.callback(_close_quietly, audio)
+                    if audio_duration > video.duration:
+                        audio = audio.subclipped(0, video.duration)
+                    video = video.with_audio(audio)
+                except Exception as e:
+                    print(f"Error adding audio: {e}")
+            
+            # Add BGM
+            bgm_path = get_default_bgm_path()
+            if bgm_path:
+                video = add_background_music(video, bgm_path, volume=0.1)
+            
+            filepath = VIDEO_DIR / output_filename
+            
+            if encoder:
+                video.write_videofile(
+                    str(filepath),
+                    fps=fps,
+                    codec=encoder,
+                    audio_codec='aac',
+                    ffmpeg_params=HW_ENCODERS.get(encoder, []) + scale_params,
+                    logger=None
                 )
             else:
-                continue
+                video.write_videofile(
+                    str(filepath),
+                    fps=fps,
+                    codec=SOFTWARE_ENCODER,
+                    audio_codec='aac',
+                    threads=threads or os.cpu_count(),
+                    preset=preset,
+                    # Slides are near-static, so x264's still-image tuning
+                    # fits them better than the film defaults
+                    ffmpeg_params=['-crf', str(crf), '-tune', 'stillimage'] + scale_params,
+                    logger=None
+                )
             
-            if clip:
-                clips.append(clip)
-        
-        # Add subscribe ending
-        subscribe = create_subscribe_clip(duration=5.0, size=size)
-        if subscribe:
-            clips.append(subscribe)
-        
-        if not clips:
             return {
-                "success": False,
-                "error": "No valid clips created",
-                "filepath": None,
+                "success": True,
+                "filename": output_filename,
+                "filepath": str(filepath),
+                "duration_seconds": video.duration,
+                "resolution": f"{output_size[0]}x{output_size[1]}",
+                "slides_count": len(clips),
             }
         
-        video = concatenate_videoclips(clips, method="compose")
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error generating video: {str(e)}",
+            "filepath": None,
+        }
+
+
+def _generate_slideshow_ffmpeg(
+    slides: List[dict],
+    audio_path: Optional[str],
+    filepath: Path,
+    slide_duration: float,
+    size: tuple,
+    fps: int,
+    codec_args: List[str],
+) -> dict:
+    """
+    Slideshow rendered entirely by ffmpeg, matching the MoviePy slides.
+    
+    Text slides are drawtext over a solid background and images are looped
+    from their files; each is encoded as its own segment, followed by the
+    (cached) subscribe segment. The segments are then joined by stream copy
+    with the narration and BGM mixed in, the same way generate_complete_video
+    assembles its output. Unknown slide types and missing images are skipped.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="slideshow_"))
+    try:
+        graph = _FilterGraph(workdir, size, fps)
+        for slide in slides:
+            slide_type = slide.get("type", "text")
+            content = slide.get("content", "")
+            duration = slide.get("duration", slide_duration)
+            
+            if slide_type == "text":
+                overlays = graph.drawtext(
+                    content, _px(60, size), "white",
+                    max_width=size[0] - _px(100, size), end=duration, fade_in=0.5, fade_out=0.5,
+                )
+                graph.add_segment(duration, (15, 23, 42), overlays)
+            elif slide_type == "image" and Path(content).is_file():
+                graph.add_image_segment(content, duration, fade_in=0.5, fade_out=0.5)
         
-        # Add audio
-        if audio_path and Path(audio_path).exists():
-            try:
-                audio = AudioFileClip(audio_path)
-                if audio.duration > video.duration:
-                    audio = audio.subclipped(0, video.duration)
-                video = video.with_audio(audio)
-            except Exception as e:
-                print(f"Error adding audio: {e}")
-        
-        # Add BGM
-        bgm_path = get_default_bgm_path()
-        if bgm_path:
-            video = add_background_music(video, bgm_path, volume=0.1)
-        
-        if not output_filename:
-            output_filename = f"video_{uuid.uuid4().hex[:8]}.mp4"
-        
-        filepath = VIDEO_DIR / output_filename
-        
-        video.write_videofile(
-            str(filepath),
-            fps=fps,
-            codec='libx264',
-            audio_codec='aac',
-            logger=None
-        )
+        _add_subscribe_segment(graph, duration=5.0)
+        _write_segment_list(workdir, _render_segments(graph, codec_args))
         
-        video.close()
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
+        if not (audio_path and Path(audio_path).exists()):
+            audio_path = None
+        cmd = _mux_command(graph.duration, audio_path, get_default_bgm_path(), filepath.resolve())
+        result = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
         
         return {
             "success": True,
-            "filename": output_filename,
+            "filename": filepath.name,
             "filepath": str(filepath),
-            "duration_seconds": video.duration,
+            "duration_seconds": graph.duration,
             "resolution": f"{size[0]}x{size[1]}",
-            "slides_count": len(clips),
+            "slides_count": len(graph.segments),
         }
-        
     except Exception as e:
         return {
             "success": False,
             "error": f"Error generating video: {str(e)}",
             "filepath": None,
         }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _build_slide_clips(slides: List[dict], slide_duration: float, size: tuple):
+    """Yield the slideshow's clips one at a time, ending with the subscribe clip."""
+    for slide in slides:
+        slide_type = slide.get("type", "text")
+        content = slide.get("content", "")
+        duration = slide.get("duration", slide_duration)
+        
+        if slide_type == "text":
+            clip = create_animated_text_clip(
+                content,
+                duration=duration,
+                size=size,
+                animation="fade"
+            )
+        elif slide_type == "image":
+            clip = create_image_clip(
+                content,
+                duration=duration,
+                size=size
+            )
+        else:
+            continue
+        
+        if clip:
+            yield clip
+    
+    # Add subscribe ending
+    subscribe = create_subscribe_clip(duration=5.0, size=size)
+    if subscribe:
+        yield subscribe
+
+
+def _audio_duration(path: str) -> Optional[float]:
+    """Audio duration in seconds from the container header (ffprobe), or None if unreadable."""
+    file = Path(path)
+    return _probe_duration(str(file.resolve()), file.stat().st_mtime)
+
+
+@lru_cache(maxsize=64)
+def _probe_duration(path: str, mtime: float) -> Optional[float]:
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=10
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def _close_quietly(clip):
+    try:
+        clip.close()
+    except Exception:
+        pass
+
+
+def _load_image_frame(image_path: str, size: tuple) -> np.ndarray:
+    """Decode an image and scale it to the frame size once, with Pillow."""
+    with Image.open(image_path) as image:
+        return np.asarray(image.convert("RGB").resize(size, Image.Resampling.LANCZOS))
 
 
 def create_image_clip(
@@ -733,8 +1423,7 @@ def create_image_clip(
         return None
     
     try:
-        clip = ImageClip(image_path, duration=duration)
-        clip = clip.resized(newsize=size)
+        clip = ImageClip(_load_image_frame(image_path, tuple(size)), duration=duration)
         clip = apply_fade_in(clip, 0.5)
         clip = apply_fade_out(clip, 0.5)
         return clip
@@ -1,6 +1,11 @@
 """Voice Service - Text-to-Speech using ElevenLabs API."""
 
+import asyncio
+import aiofiles
 import httpx
+import re
+import struct
+import textwrap
 from pathlib import Path
 from typing import Optional, List
 import uuid
@@ -9,6 +14,55 @@ from app.config import settings
 
 ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
 
+# Chunk requests in flight at once for a script (ElevenLabs rate limits
+# concurrent requests per key)
+MAX_CONCURRENT_TTS = 4
+
+# Sentence end: terminal punctuation, whitespace, then something that can
+# start a sentence - so "e.g. this" and "3.5" stay in one piece
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9])')
+_ABBREVIATION_RE = re.compile(r'\b(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|St|vs|No|Fig)\.$')
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _wav_header(data_size: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """44-byte RIFF/WAVE header for little-endian PCM (what ElevenLabs' pcm_* formats return)."""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client (Singleton pattern).
+    
+    One pooled HTTP/2 client keeps the TLS connection to ElevenLabs alive
+    across requests and multiplexes a script's concurrent chunk requests.
+    """
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            http2=True,
+        )
+    
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 # Output directory for audio files
 AUDIO_DIR = settings.OUTPUT_DIR / "audio"
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
@@ -37,29 +91,29 @@ async def get_available_voices() -> List[dict]:
         ]
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{ELEVENLABS_API_URL}/voices",
-                headers={"xi-api-key": api_key},
-                timeout=10.0
-            )
-            
-            if response.status_code != 200:
-                return []
-            
-            data = response.json()
-            voices = []
-            for voice in data.get("voices", []):
-                voices.append({
-                    "voice_id": voice["voice_id"],
-                    "name": voice["name"],
-                    "category": voice.get("category", ""),
-                    "description": voice.get("description", ""),
-                    "labels": voice.get("labels", {}),
-                    "available": True,
-                })
-            
-            return voices
+        client = get_http_client()
+        response = await client.get(
+            f"{ELEVENLABS_API_URL}/voices",
+            headers={"xi-api-key": api_key},
+            timeout=10.0
+        )
+        
+        if response.status_code != 200:
+            return []
+        
+        data = response.json()
+        voices = []
+        for voice in data.get("voices", []):
+            voices.append({
+                "voice_id": voice["voice_id"],
+                "name": voice["name"],
+                "category": voice.get("category", ""),
+                "description": voice.get("description", ""),
+                "labels": voice.get("labels", {}),
+                "available": True,
+            })
+        
+        return voices
     except Exception as e:
         print(f"Error fetching voices: {e}")
         return []
@@ -81,7 +135,7 @@ async def generate_speech(
         model_id: TTS model to use
         stability: Voice stability (0-1)
         similarity_boost: Voice clarity (0-1)
-        output_format: Audio format
+        output_format: Audio format; pcm_* (e.g. "pcm_24000") is saved as WAV
     
     Returns:
         dict with audio file path and metadata
@@ -100,26 +154,34 @@ async def generate_speech(
         voice_id = DEFAULT_VOICES["rachel"]
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{ELEVENLABS_API_URL}/text-to-speech/{voice_id}",
-                headers={
-                    "xi-api-key": api_key,
-                    "Content-Type": "application/json",
-                    "Accept": "audio/mpeg",
-                },
-                json={
-                    "text": text,
-                    "model_id": model_id,
-                    "voice_settings": {
-                        "stability": stability,
-                        "similarity_boost": similarity_boost,
-                    }
-                },
-                timeout=60.0  # Longer timeout for audio generation
-            )
-            
+        # Raw PCM is wrapped in a WAV header so players and ffmpeg can open it
+        pcm_rate = int(output_format.split("_")[1]) if output_format.startswith("pcm_") else None
+        extension = "wav" if pcm_rate else output_format.split("_")[0]
+        filename = f"speech_{uuid.uuid4().hex[:8]}.{extension}"
+        filepath = AUDIO_DIR / filename
+        
+        client = get_http_client()
+        async with client.stream(
+            "POST",
+            f"{ELEVENLABS_API_URL}/text-to-speech/{voice_id}",
+            params={"output_format": output_format},
+            headers={
+                "xi-api-key": api_key,
+                "Content-Type": "application/json",
+                "Accept": "audio/wav" if pcm_rate else "audio/mpeg",
+            },
+            json={
+                "text": text,
+                "model_id": model_id,
+                "voice_settings": {
+                    "stability": stability,
+                    "similarity_boost": similarity_boost,
+                }
+            },
+            timeout=60.0  # Longer timeout for audio generation
+        ) as response:
             if response.status_code != 200:
+                await response.aread()
                 error_msg = response.text
                 try:
                     error_data = response.json()
@@ -133,26 +195,36 @@ async def generate_speech(
                     "filepath": None,
                 }
             
-            # Save audio file
-            filename = f"speech_{uuid.uuid4().hex[:8]}.mp3"
-            filepath = AUDIO_DIR / filename
-            
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
-            # Estimate duration (rough: ~150 words per minute)
-            word_count = len(text.split())
-            estimated_duration = (word_count / 150) * 60  # seconds
-            
-            return {
-                "success": True,
-                "filename": filename,
-                "filepath": str(filepath),
-                "word_count": word_count,
-                "estimated_duration_seconds": round(estimated_duration, 1),
-                "voice_id": voice_id,
-            }
-            
+            # Save audio file as it arrives instead of buffering the whole MP3
+            try:
+                async with aiofiles.open(filepath, 'wb') as f:
+                    if pcm_rate:
+                        await f.write(_wav_header(0, pcm_rate))
+                    data_size = 0
+                    async for data in response.aiter_bytes(chunk_size=65536):
+                        await f.write(data)
+                        data_size += len(data)
+                    if pcm_rate:
+                        # Sizes are only known once the stream has ended
+                        await f.seek(0)
+                        await f.write(_wav_header(data_size, pcm_rate))
+            except BaseException:
+                filepath.unlink(missing_ok=True)
+                raise
+        
+        # Estimate duration (rough: ~150 words per minute)
+        word_count = len(text.split())
+        estimated_duration = (word_count / 150) * 60  # seconds
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "filepath": str(filepath),
+            "word_count": word_count,
+            "estimated_duration_seconds": round(estimated_duration, 1),
+            "voice_id": voice_id,
+        }
+        
     except httpx.TimeoutException:
         return {
             "success": False,
@@ -185,28 +257,23 @@ async def generate_script_audio(
             "audio_files": [],
         }
     
-    # Split script into chunks
-    chunks = []
-    current_chunk = ""
+    chunks = split_into_chunks(script, chunk_size)
     
-    sentences = script.replace('\n', ' ').split('. ')
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) < chunk_size:
-            current_chunk += sentence + ". "
-        else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + ". "
+    # Generate audio for all chunks concurrently; gather keeps chunk order
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TTS)
     
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    async def _speak(chunk: str) -> dict:
+        async with semaphore:
+            return await generate_speech(chunk, voice_id=voice_id)
+    
+    results = await asyncio.gather(*(_speak(chunk) for chunk in chunks), return_exceptions=True)
     
-    # Generate audio for each chunk
     audio_files = []
     total_duration = 0
     
-    for i, chunk in enumerate(chunks):
-        result = await generate_speech(chunk, voice_id=voice_id)
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            result = {"success": False, "error": str(result)}
         
         if result["success"]:
             audio_files.append({
@@ -230,6 +297,42 @@ async def generate_script_audio(
     }
 
 
+def _split_sentences(text: str) -> List[str]:
+    sentences = []
+    for part in _SENTENCE_END_RE.split(" ".join(text.split())):
+        # "Dr. Smith" is not a sentence break
+        if sentences and _ABBREVIATION_RE.search(sentences[-1]):
+            sentences[-1] += " " + part
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def split_into_chunks(text: str, chunk_size: int) -> List[str]:
+    """Pack whole sentences greedily into chunks of at most chunk_size characters.
+    
+    ElevenLabs bills and limits requests by character, and each request has
+    a fixed latency cost, so chunks are filled as close to the limit as
+    sentence boundaries allow. A sentence longer than the limit is split
+    at word boundaries.
+    """
+    chunks = []
+    current = ""
+    
+    for sentence in _split_sentences(text):
+        pieces = textwrap.wrap(sentence, chunk_size) if len(sentence) > chunk_size else [sentence]
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > chunk_size:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 def get_character_count(text: str) -> dict:
     """Get character count info for cost estimation."""
     char_count = len(text)
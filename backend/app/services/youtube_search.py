@@ -1,12 +1,61 @@
 """YouTube search service using YouTube Data API v3."""
 
+import asyncio
+import threading
+
 from googleapiclient.discovery import build
 from app.config import settings
 
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+
+# videos.list accepts at most 50 ids per call
+VIDEOS_LIST_MAX_IDS = 50
+
+# One client per worker thread: build() is slow (discovery document), and
+# the httplib2 transport underneath a client is not thread-safe
+_local = threading.local()
+
+
+def get_youtube_client():
+    """Get or create this thread's YouTube API client."""
+    client = getattr(_local, "youtube", None)
+
+    if client is None:
+        client = _local.youtube = build(
+            "youtube", "v3",
+            developerKey=settings.YOUTUBE_API_KEY,
+            cache_discovery=False,
+        )
+
+    return client
+
+
+_search_cache = None
+
+
+def get_search_cache():
+    """Get or create the on-disk search results cache (Singleton pattern). None without diskcache."""
+    global _search_cache
+
+    if _search_cache is None and DISKCACHE_AVAILABLE:
+        _search_cache = diskcache.Cache(str(settings.OUTPUT_DIR / "youtube_search_cache"))
 
-def search_videos(query: str, max_results: int = 15) -> list[dict]:
+    return _search_cache
+
+
+async def search_videos(query: str, max_results: int = 15) -> list[dict]:
     """Search YouTube videos by query.
     
+    The client library is blocking, so the API calls run in a worker
+    thread and don't stall the event loop. Results are cached on disk for
+    YT_SEARCH_CACHE_TTL per (query, max_results); a search costs 100 quota
+    units, a repeat within the hour costs none.
+    
     Args:
         query: Search term
         max_results: Maximum number of results to return
@@ -15,7 +64,18 @@ def search_videos(query: str, max_results: int = 15) -> list[dict]:
         List of video dictionaries with video_id, title, channel_name,
         description, thumbnail_url, and published_at fields
     """
-    youtube = build("youtube", "v3", developerKey=settings.YOUTUBE_API_KEY)
+    return await asyncio.to_thread(_search_videos, query, max_results)
+
+
+def _search_videos(query: str, max_results: int) -> list[dict]:
+    cache = get_search_cache()
+    key = f"{max_results}:{query.strip().lower()}"
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    youtube = get_youtube_client()
 
     search_response = youtube.search().list(
         q=query,
@@ -37,4 +97,40 @@ def search_videos(query: str, max_results: int = 15) -> list[dict]:
             "published_at": snippet["publishedAt"],
         })
 
+    _add_video_details(youtube, videos)
+
+    if cache is not None:
+        cache.set(key, videos, expire=settings.YT_SEARCH_CACHE_TTL)
     return videos
+
+
+def _add_video_details(youtube, videos: list[dict]):
+    """Merge statistics, duration and the full description into the results.
+    
+    One videos.list call (1 quota unit) covers up to 50 results, instead of
+    a lookup per video; search.list snippets truncate the description.
+    """
+    ids = [v["video_id"] for v in videos]
+    items = {}
+    try:
+        for start in range(0, len(ids), VIDEOS_LIST_MAX_IDS):
+            batch = ids[start:start + VIDEOS_LIST_MAX_IDS]
+            response = youtube.videos().list(
+                id=",".join(batch),
+                part="snippet,statistics,contentDetails",
+                maxResults=len(batch),
+            ).execute()
+            items.update((item["id"], item) for item in response.get("items", []))
+    except Exception as e:
+        # Details are optional; the search results are still usable
+        print(f"YouTube video details lookup failed: {e}")
+
+    for video in videos:
+        item = items.get(video["video_id"])
+        if not item:
+            continue
+        statistics = item.get("statistics", {})
+        video["view_count"] = int(statistics["viewCount"]) if "viewCount" in statistics else None
+        video["like_count"] = int(statistics["likeCount"]) if "likeCount" in statistics else None
+        video["duration"] = item.get("contentDetails", {}).get("duration")
+        video["description"] = item.get("snippet", {}).get("description", video["description"])
@@ -1,20 +1,27 @@
 """YouTube Upload Service - Upload videos using YouTube Data API v3."""
 
+import asyncio
+import io
 import os
-import pickle
-import json
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, List
 import httplib2
+import orjson
 
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 
 try:
     from google_auth_oauthlib.flow import InstalledAppFlow
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
     OAUTH_AVAILABLE = True
 except ImportError:
     OAUTH_AVAILABLE = False
@@ -28,62 +35,205 @@ SCOPES = ['https://www.googleapis.com/auth/youtube.upload',
 # Token storage
 TOKEN_DIR = settings.OUTPUT_DIR / "tokens"
 TOKEN_DIR.mkdir(parents=True, exist_ok=True)
-TOKEN_FILE = TOKEN_DIR / "youtube_token.pickle"
+TOKEN_FILE = TOKEN_DIR / "youtube_token.json"
+LEGACY_TOKEN_FILE = TOKEN_DIR / "youtube_token.pickle"  # Older format; never loaded
 CREDENTIALS_FILE = TOKEN_DIR / "client_secrets.json"
 
 # Valid privacy statuses
-VALID_PRIVACY_STATUSES = ("public", "private", "unlisted")
+VALID_PRIVACY_STATUSES = frozenset({"public", "private", "unlisted"})
+
+# Resource parts written by videos().insert
+_UPLOAD_PARTS = 'snippet,status'
+
+# The status endpoints are polled by the frontend; bursts within this window
+# share one pair of stat() calls
+STATUS_CACHE_SECONDS = 2
+
+# Retries per chunk on 5xx/429 or a dropped connection, with exponential
+# backoff; a retried chunk resumes from the offset the server acknowledged
+UPLOAD_CHUNK_RETRIES = 5
+
+# Socket timeout for YouTube API connections
+HTTP_TIMEOUT = 60
+
+# Credentials are loaded once and shared; the service built from them is
+# kept per thread, since its httplib2 transport is not thread-safe
+_credentials = None
+_credentials_lock = threading.Lock()
+_local = threading.local()
+
+# Access tokens are refreshed this long before they expire, in the
+# background, so an upload never waits on the refresh round trip
+TOKEN_REFRESH_MARGIN = 300  # seconds
+_refresh_timer: Optional[threading.Timer] = None
+_scheduled_expiry = None
+
+# The authenticated channel's uploads playlist never changes, so it is looked
+# up once per set of credentials
+_uploads_playlist_id: Optional[str] = None
+
+# Thumbnail uploads still running after upload_video has returned
+_background_tasks: set = set()
+
+# playlistItems.list returns at most this many items per page
+PLAYLIST_PAGE_MAX = 50
+
+# Shared (never mutated) default for missing nested fields
+_EMPTY: dict = {}
 
 
 def check_upload_available() -> dict:
     """Check if YouTube upload is available."""
+    credentials_configured, authenticated = _auth_files_status()
     return {
         "oauth_available": OAUTH_AVAILABLE,
-        "credentials_configured": CREDENTIALS_FILE.exists(),
-        "authenticated": TOKEN_FILE.exists(),
+        "credentials_configured": credentials_configured,
+        "authenticated": authenticated,
         "message": get_status_message()
     }
 
 
 def get_status_message() -> str:
     """Get human-readable status message."""
+    credentials_configured, authenticated = _auth_files_status()
     if not OAUTH_AVAILABLE:
         return "Install google-auth-oauthlib: pip install google-auth-oauthlib"
-    if not CREDENTIALS_FILE.exists():
+    if not credentials_configured:
         return f"Place client_secrets.json in {TOKEN_DIR}"
-    if not TOKEN_FILE.exists():
+    if not authenticated:
         return "Authentication required. Call /api/publish/auth to authenticate."
     return "Ready to upload"
 
 
+def _auth_files_status() -> tuple:
+    """(client_secrets.json exists, token exists), cached for STATUS_CACHE_SECONDS."""
+    return _stat_auth_files(int(time.monotonic() // STATUS_CACHE_SECONDS))
+
+
+@lru_cache(maxsize=1)
+def _stat_auth_files(time_bucket: int) -> tuple:
+    return CREDENTIALS_FILE.exists(), TOKEN_FILE.exists()
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that encodes request bodies and decodes responses with orjson."""
+    
+    def serialize(self, body_value):
+        if isinstance(body_value, dict) and "data" not in body_value and self._data_wrapper:
+            body_value = {"data": body_value}
+        return orjson.dumps(body_value).decode()
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
+
 def get_authenticated_service():
-    """Get authenticated YouTube service."""
+    """
+    Get authenticated YouTube service.
+    
+    build() parses the discovery document, so each thread reuses its
+    service until the credentials are replaced. The thread's httplib2
+    connection pool outlives that, so keep-alive connections (and their
+    TLS sessions) are reused across uploads, listings and re-auths.
+    """
+    credentials = _get_credentials()
+    
+    if getattr(_local, "credentials", None) is not credentials:
+        if getattr(_local, "http", None) is None:
+            _local.http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        authed_http = AuthorizedHttp(credentials, http=_local.http)
+        _local.youtube = build(
+            'youtube', 'v3', http=authed_http, model=_OrjsonModel(), cache_discovery=False
+        )
+        _local.credentials = credentials
+    
+    return _local.youtube
+
+
+def _get_credentials():
+    """Load, refresh or obtain the OAuth credentials, reusing them across calls."""
+    global _credentials
+    
     if not OAUTH_AVAILABLE:
         raise Exception("OAuth libraries not installed")
     
-    credentials = None
+    with _credentials_lock:
+        _credentials = _load_credentials(_credentials)
+        _schedule_refresh(_credentials)
+        return _credentials
+
+
+def _schedule_refresh(credentials):
+    """(Re)arm the background refresh for these credentials' expiry. Caller holds the lock."""
+    global _refresh_timer, _scheduled_expiry
+    
+    if credentials.expiry == _scheduled_expiry or not credentials.refresh_token:
+        return
+    if _refresh_timer is not None:
+        _refresh_timer.cancel()
+    
+    _scheduled_expiry = credentials.expiry
+    if credentials.expiry is None:
+        _refresh_timer = None
+        return
     
+    # google-auth keeps expiry as naive UTC
+    delay = (credentials.expiry - datetime.utcnow()).total_seconds() - TOKEN_REFRESH_MARGIN
+    _refresh_timer = threading.Timer(max(delay, 0.0), _refresh_in_background)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+
+def _refresh_in_background():
+    try:
+        with _credentials_lock:
+            if _credentials is None:
+                return
+            _credentials.refresh(Request())
+            _save_credentials(_credentials)
+            _schedule_refresh(_credentials)
+    except Exception as e:
+        # The next call refreshes on demand instead
+        print(f"Background YouTube token refresh failed: {e}")
+
+
+def _save_credentials(credentials):
+    TOKEN_FILE.write_text(credentials.to_json(), encoding="utf-8")
+
+
+# Unpickling the old token could run arbitrary code, so it is not migrated
+if LEGACY_TOKEN_FILE.exists() and not TOKEN_FILE.exists():
+    print(f"Found a YouTube token in the old pickle format ({LEGACY_TOKEN_FILE}); "
+          f"tokens are now stored as JSON - re-authenticate via /api/publish/auth")
+
+
+def _load_credentials(credentials):
     # Load existing token
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, 'rb') as token:
-            credentials = pickle.load(token)
+    if credentials is None and TOKEN_FILE.exists():
+        credentials = Credentials.from_authorized_user_info(
+            orjson.loads(TOKEN_FILE.read_bytes()), SCOPES
+        )
     
-    # Refresh or get new credentials
+    # Refresh credentials; new ones only come from the get_auth_url /
+    # complete_auth flow, never from an interactive flow inside a request
     if not credentials or not credentials.valid:
         if credentials and credentials.expired and credentials.refresh_token:
             credentials.refresh(Request())
-        elif CREDENTIALS_FILE.exists():
-            flow = InstalledAppFlow.from_client_secrets_file(
-                str(CREDENTIALS_FILE), SCOPES)
-            credentials = flow.run_local_server(port=8090)
-        else:
+        elif not CREDENTIALS_FILE.exists():
             raise Exception(f"No client_secrets.json found at {CREDENTIALS_FILE}")
+        else:
+            raise Exception("YouTube authentication required. Call /api/publish/auth first.")
         
         # Save credentials
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(credentials, token)
+        _save_credentials(credentials)
     
-    return build('youtube', 'v3', credentials=credentials)
+    return credentials
 
 
 def get_auth_url() -> dict:
@@ -111,6 +261,8 @@ def get_auth_url() -> dict:
 
 def complete_auth(code: str) -> dict:
     """Complete OAuth flow with authorization code."""
+    global _credentials, _uploads_playlist_id
+    
     if not OAUTH_AVAILABLE:
         return {"success": False, "error": "OAuth libraries not installed"}
     
@@ -123,8 +275,13 @@ def complete_auth(code: str) -> dict:
         credentials = flow.credentials
         
         # Save credentials
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(credentials, token)
+        _save_credentials(credentials)
+        
+        # Services built from the old credentials are rebuilt on next use
+        with _credentials_lock:
+            _credentials = credentials
+            _schedule_refresh(credentials)
+        _uploads_playlist_id = None
         
         return {"success": True, "message": "Authentication successful!"}
     except Exception as e:
@@ -163,72 +320,106 @@ async def upload_video(
     if privacy_status not in VALID_PRIVACY_STATUSES:
         return {"success": False, "error": f"Invalid privacy status: {privacy_status}"}
     
+    # Prepare video metadata
+    body = {
+        'snippet': {
+            'title': title[:100],
+            'description': description[:5000],
+            'tags': tags or [],
+            'categoryId': category_id
+        },
+        'status': {
+            'privacyStatus': privacy_status,
+            'selfDeclaredMadeForKids': False,
+        },
+    }
+    
     try:
-        youtube = get_authenticated_service()
+        # The client library blocks for the whole transfer, so the upload
+        # runs in a worker thread and the event loop keeps serving requests
+        video_id = await asyncio.to_thread(_upload_video_sync, video_path, body, notify_subscribers)
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        
+        # The thumbnail only needs the video ID; it is set in the background
+        # rather than holding the response for a second upload
+        if thumbnail_path and Path(thumbnail_path).exists():
+            task = asyncio.create_task(asyncio.to_thread(_set_thumbnail, video_id, thumbnail_path))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
         
-        # Prepare video metadata
-        body = {
-            'snippet': {
-                'title': title[:100],
-                'description': description[:5000],
-                'tags': tags or [],
-                'categoryId': category_id
-            },
-            'status': {
-                'privacyStatus': privacy_status,
-                'selfDeclaredMadeForKids': False,
-            },
-            'notifySubscribers': notify_subscribers
+        return {
+            "success": True,
+            "video_id": video_id,
+            "video_url": video_url,
+            "title": title,
+            "privacy_status": privacy_status
         }
         
-        # Create media upload
-        media = MediaFileUpload(
-            video_path,
-            chunksize=1024*1024,  # 1MB chunks
-            resumable=True,
-            mimetype='video/*'
+    except HttpError as e:
+        return {"success": False, "error": f"YouTube API error: {_http_error_message(e)}"}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def _http_error_message(e: HttpError) -> str:
+    """
+    The API's error message, falling back to the HTTP reason.
+    
+    Gateway failures come back as HTML pages rather than JSON errors.
+    """
+    try:
+        message = orjson.loads(e.content)['error']['message']
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        message = None
+    return message or getattr(e, 'reason', None) or str(e)
+
+
+def _upload_video_sync(video_path: str, body: dict, notify_subscribers: bool) -> str:
+    """Resumable upload of the video; returns the video ID."""
+    youtube = get_authenticated_service()
+    chunksize = settings.YOUTUBE_UPLOAD_CHUNK_SIZE
+    
+    # Read through one chunk-sized buffer and tell the kernel the file is
+    # read front to back, so readahead overlaps disk reads with the network
+    fh = io.BufferedReader(io.FileIO(video_path, 'rb'), buffer_size=chunksize)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        media = MediaIoBaseUpload(
+            fh,
+            mimetype='video/*',
+            chunksize=chunksize,
+            resumable=True
         )
         
         # Execute upload
         request = youtube.videos().insert(
-            part=','.join(body.keys()),
+            part=_UPLOAD_PARTS,
             body=body,
+            notifySubscribers=notify_subscribers,
             media_body=media
         )
         
         response = None
         while response is None:
-            status, response = request.next_chunk()
+            status, response = request.next_chunk(num_retries=UPLOAD_CHUNK_RETRIES)
             if status:
                 print(f"Upload progress: {int(status.progress() * 100)}%")
-        
-        video_id = response['id']
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Upload thumbnail if provided
-        if thumbnail_path and Path(thumbnail_path).exists():
-            try:
-                youtube.thumbnails().set(
-                    videoId=video_id,
-                    media_body=MediaFileUpload(thumbnail_path)
-                ).execute()
-            except Exception as e:
-                print(f"Thumbnail upload failed: {e}")
-        
-        return {
-            "success": True,
-            "video_id": video_id,
-            "video_url": video_url,
-            "title": title,
-            "privacy_status": privacy_status
-        }
-        
-    except HttpError as e:
-        error_content = json.loads(e.content.decode('utf-8'))
-        error_message = error_content.get('error', {}).get('message', str(e))
-        return {"success": False, "error": f"YouTube API error: {error_message}"}
+    finally:
+        fh.close()
+    
+    return response['id']
+
+
+def _set_thumbnail(video_id: str, thumbnail_path: str):
+    try:
+        get_authenticated_service().thumbnails().set(
+            videoId=video_id,
+            media_body=MediaFileUpload(thumbnail_path)
+        ).execute()
     except Exception as e:
-        return {"success": False, "error": str(e)}
+        print(f"Thumbnail upload failed: {e}")
 
 
 async def update_video_metadata(
@@ -241,89 +432,115 @@ async def update_video_metadata(
 ) -> dict:
     """Update metadata for an existing YouTube video."""
     try:
-        youtube = get_authenticated_service()
-        
-        # Get current video data
-        video_response = youtube.videos().list(
-            part='snippet,status',
-            id=video_id
-        ).execute()
-        
-        if not video_response.get('items'):
-            return {"success": False, "error": "Video not found"}
-        
-        current = video_response['items'][0]
-        snippet = current['snippet']
-        status = current['status']
-        
-        # Update fields
-        if title:
-            snippet['title'] = title[:100]
-        if description:
-            snippet['description'] = description[:5000]
-        if tags is not None:
-            snippet['tags'] = tags
-        if category_id:
-            snippet['categoryId'] = category_id
-        if privacy_status and privacy_status in VALID_PRIVACY_STATUSES:
-            status['privacyStatus'] = privacy_status
-        
-        # Execute update
-        youtube.videos().update(
-            part='snippet,status',
-            body={
-                'id': video_id,
-                'snippet': snippet,
-                'status': status
-            }
-        ).execute()
-        
-        return {
-            "success": True,
-            "video_id": video_id,
-            "message": "Video metadata updated"
-        }
-        
+        return await asyncio.to_thread(
+            _update_video_metadata_sync,
+            video_id, title, description, tags, category_id, privacy_status,
+        )
     except HttpError as e:
         return {"success": False, "error": str(e)}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def _update_video_metadata_sync(
+    video_id: str,
+    title: Optional[str],
+    description: Optional[str],
+    tags: Optional[List[str]],
+    category_id: Optional[str],
+    privacy_status: Optional[str],
+) -> dict:
+    youtube = get_authenticated_service()
+    
+    # videos.update replaces whole parts, so start from the current values
+    video_response = youtube.videos().list(
+        part='snippet,status',
+        id=video_id
+    ).execute()
+    
+    if not video_response.get('items'):
+        return {"success": False, "error": "Video not found"}
+    
+    current = video_response['items'][0]
+    snippet = current['snippet']
+    status = current['status']
+    
+    # Update fields
+    if title:
+        snippet['title'] = title[:100]
+    if description:
+        snippet['description'] = description[:5000]
+    if tags is not None:
+        snippet['tags'] = tags
+    if category_id:
+        snippet['categoryId'] = category_id
+    if privacy_status and privacy_status in VALID_PRIVACY_STATUSES:
+        status['privacyStatus'] = privacy_status
+    
+    # Execute update
+    youtube.videos().update(
+        part='snippet,status',
+        body={
+            'id': video_id,
+            'snippet': snippet,
+            'status': status
+        }
+    ).execute()
+    
+    return {
+        "success": True,
+        "video_id": video_id,
+        "message": "Video metadata updated"
+    }
+
+
 def get_my_videos(max_results: int = 25) -> dict:
     """Get list of uploaded videos."""
+    global _uploads_playlist_id
+    
     try:
         youtube = get_authenticated_service()
         
         # Get channel uploads playlist
-        channels_response = youtube.channels().list(
-            part='contentDetails',
-            mine=True
-        ).execute()
-        
-        if not channels_response.get('items'):
-            return {"success": False, "error": "No channel found"}
-        
-        uploads_playlist_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        
-        # Get videos from playlist
-        videos_response = youtube.playlistItems().list(
-            part='snippet,status',
-            playlistId=uploads_playlist_id,
-            maxResults=max_results
-        ).execute()
+        uploads_playlist_id = _uploads_playlist_id
+        if uploads_playlist_id is None:
+            channels_response = youtube.channels().list(
+                part='contentDetails',
+                mine=True
+            ).execute()
+            
+            if not channels_response.get('items'):
+                return {"success": False, "error": "No channel found"}
+            
+            uploads_playlist_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+            _uploads_playlist_id = uploads_playlist_id
         
+        # Get videos from playlist, a page at a time
         videos = []
-        for item in videos_response.get('items', []):
-            snippet = item['snippet']
-            videos.append({
-                'video_id': snippet['resourceId']['videoId'],
-                'title': snippet['title'],
-                'description': snippet['description'][:200],
-                'thumbnail_url': snippet['thumbnails'].get('high', {}).get('url', ''),
-                'published_at': snippet['publishedAt'],
-                'privacy_status': item.get('status', {}).get('privacyStatus', 'unknown')
-            })
+        page_token = None
+        while len(videos) < max_results:
+            videos_response = youtube.playlistItems().list(
+                part='snippet,status',
+                playlistId=uploads_playlist_id,
+                maxResults=min(max_results - len(videos), PLAYLIST_PAGE_MAX),
+                pageToken=page_token
+            ).execute()
+            
+            for item in videos_response.get('items', []):
+                snippet = item['snippet']
+                thumbnails = snippet.get('thumbnails') or _EMPTY
+                videos.append({
+                    'video_id': snippet['resourceId']['videoId'],
+                    'title': snippet['title'],
+                    'description': snippet['description'][:200],
+                    'thumbnail_url': (thumbnails.get('high') or _EMPTY).get('url', ''),
+                    'published_at': snippet['publishedAt'],
+                    'privacy_status': (item.get('status') or _EMPTY).get('privacyStatus', 'unknown')
+                })
+            
+            page_token = videos_response.get('nextPageToken')
+            if not page_token:
+                break
         
         return {
             "success": True,